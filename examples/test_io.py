@@ -19,9 +19,9 @@ def test_ensemble():
     experiment = ensemble._experiments[experiment_name]
     timestep = experiment._timesteps[timestep_name]
 
-    structure = timestep._structures[chromosome_name]
-    peak_track = timestep._peak_tracks[peak_track_name][chromosome_name]
-    point_track = timestep._point_tracks[point_track_name][chromosome_name]
+    structure = timestep.get_structures()[chromosome_name]
+    peak_track = timestep.get_peak_track(peak_track_name)[chromosome_name]
+    point_track = timestep.get_point_track(point_track_name)[chromosome_name]
 
     ensemble, experiment, timestep, structure, peak_track, point_track  # noqa: B018
 
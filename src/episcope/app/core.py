@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from functools import partial
 
 import numpy as np
 import plotly.graph_objects as plotly_go
 import plotly.subplots as plotly_subplots
 from paraview import simple
-from trame.app import get_server
+from trame.app import asynchronous, get_server
 from trame.decorators import TrameApp
 from trame.ui.vuetify3 import SinglePageLayout
 from trame.widgets import client as client_widgets
@@ -16,6 +17,13 @@ from trame.widgets import vuetify3 as vuetify
 
 from episcope.app.state import Display as DisplayState
 from episcope.app.state import DisplayOption, EpiscopeState, StateAdapterQuadrant3D
+from episcope.library.io import BaseSourceProvider
+from episcope.library.io.cache import DEFAULT_MAX_BYTES, ParseCache
+from episcope.library.io.container import ContainerSourceProvider, is_container
+from episcope.library.io.database import DatabaseSourceProvider, is_database
+from episcope.library.io.prefetch import Prefetcher
+from episcope.library.io.remote import RemoteContainerSourceProvider, is_remote
+from episcope.library.io.shared import attach
 from episcope.library.io.v1_2 import Ensemble, SourceProvider
 from episcope.library.viz.visualization import Visualization
 
@@ -28,10 +36,17 @@ class App:
         self.server.cli.add_argument(
             "-d",
             "--data",
-            help="Data directory to explore.",
+            help="Data directory, container file written by episcope-pack (local or HTTP(S) URL), or database written by episcope-import, to explore.",
             dest="data",
             required=True,
         )
+        self.server.cli.add_argument(
+            "--workers",
+            help="Number of processes used to load the data directory.",
+            dest="workers",
+            type=int,
+            default=1,
+        )
         self.server.cli.add_argument(
             "-n",
             "--num-quadrants",
@@ -47,9 +62,88 @@ class App:
             dest="display_options",
             default="",
         )
+        self.server.cli.add_argument(
+            "--lazy",
+            help="Only parse the structure and track files of a timestep when they are first displayed.",
+            dest="lazy",
+            action="store_true",
+        )
+        self.server.cli.add_argument(
+            "--cache-dir",
+            help="Directory where parsed data files are cached, to speed up later loads.",
+            dest="cache_dir",
+            default=None,
+        )
+        self.server.cli.add_argument(
+            "--cache-size",
+            help="Maximum size of the cache directory, in megabytes.",
+            dest="cache_size",
+            type=int,
+            default=DEFAULT_MAX_BYTES // 1024**2,
+        )
+        self.server.cli.add_argument(
+            "--shared",
+            help="Directory published with episcope-publish, from which the parsed data is memory-mapped instead of parsed.",
+            dest="shared",
+            default=None,
+        )
+        self.server.cli.add_argument(
+            "--refresh-interval",
+            help="Interval in seconds at which the data directory is checked for new or modified timesteps (0 to disable).",
+            dest="refresh_interval",
+            type=float,
+            default=0,
+        )
+        self.server.cli.add_argument(
+            "--memory-budget",
+            help="Maximum size of the parsed data kept in memory, in megabytes.",
+            dest="memory_budget",
+            type=int,
+            default=None,
+        )
+        self.server.cli.add_argument(
+            "--prefetch",
+            help="Number of neighbouring timesteps loaded in the background after a chromosome is displayed (disabled by default).",
+            dest="prefetch",
+            type=int,
+            default=0,
+        )
+        self.server.cli.add_argument(
+            "--structure-tolerance",
+            help="Resample the structure tubes adaptively, densely where they bend and sparsely where they are straight, staying within this fraction of the size of the structure from the spline.",
+            dest="structure_tolerance",
+            type=float,
+            default=None,
+        )
+        self.server.cli.add_argument(
+            "--structure-points",
+            help="Resample the structure tubes adaptively with at most this number of points.",
+            dest="structure_points",
+            type=int,
+            default=None,
+        )
+        self.server.cli.add_argument(
+            "--peak-spacing",
+            help="Distance in base pairs between the points sampled along the spline for each peak (0 to draw peaks as straight start, summit and end chords).",
+            dest="peak_spacing",
+            type=int,
+            default=0,
+        )
         known_args, _ = self.server.cli.parse_known_args()
         self.context.data_directory = known_args.data
+        self.context.workers = known_args.workers
         self.context.display_options = known_args.display_options
+        self.context.lazy = known_args.lazy
+        self.context.cache_dir = known_args.cache_dir
+        self.context.cache_size = known_args.cache_size
+        self.context.shared = known_args.shared
+        self.context.refresh_interval = known_args.refresh_interval
+        self.context.memory_budget = known_args.memory_budget
+        self.context.prefetch = known_args.prefetch
+        self.context.structure_tolerance = known_args.structure_tolerance
+        self.context.structure_points = known_args.structure_points
+        self.context.peak_spacing = known_args.peak_spacing
+        self.context.prefetcher = None
 
         self.N_QUADRANTS_3D = known_args.num_quadrants
         self.N_QUADRANTS_2D = self.N_QUADRANTS_3D
@@ -105,6 +199,7 @@ class App:
         self.state.quadrants_2d = quadrants_2d
         self.state.link_cameras = False
         self.state.show_labels = True
+        self.state.refreshing = False
 
         self._build_ui()
 
@@ -194,6 +289,9 @@ class App:
             self.state.dirty(quadrant.displays_key)
             return
 
+        if self.context.prefetcher is not None:
+            self.context.prefetcher.cancel()
+
         visualization: Visualization = self.context.visualizations[quadrant_id]
         # Clear the 3D view
         visualization.remove_all_displays()
@@ -295,6 +393,11 @@ class App:
 
         self.on_camera_reset(quadrant_id)
 
+        if self.context.prefetcher is not None:
+            self.context.prefetcher.request(
+                quadrant.chromosome, quadrant.experiment, quadrant.timestep
+            )
+
     def _add_display_to_state(
         self, quadrant_id, display_id, name, type, representation
     ):
@@ -345,7 +448,9 @@ class App:
         )
 
     def on_add_peak_track_display(self, quadrant_id, track_name, representation):
-        self.on_add_display_to_viz(quadrant_id, track_name, "peak", representation, -1)
+        self.on_add_display_to_viz(
+            quadrant_id, track_name, "peak", representation, self.context.peak_spacing
+        )
 
     def on_add_point_track_display(self, quadrant_id, track_name, representation):
         self.on_add_display_to_viz(quadrant_id, track_name, "point", representation, -1)
@@ -354,23 +459,16 @@ class App:
         visualization: Visualization = self.context.visualizations[quadrant_id]
         figure: plotly_go.Figure = self.context.plot_figures[quadrant_id]
 
-        point_track = visualization._source.get_peak_track(
-            visualization._chromosome,
-            visualization._experiment,
-            visualization._timestep,
-            track_name,
-        )
+        peak_track = visualization.get_peak_track(track_name)
 
-        x = np.zeros(len(point_track) * 3)
-        y = np.zeros(len(point_track) * 3)
+        n_peaks = len(peak_track["start"])
+        x = np.zeros(n_peaks * 3)
+        y = np.zeros(n_peaks * 3)
 
-        for i, p in enumerate(point_track):
-            x[i * 3] = p["start"]
-            x[i * 3 + 1] = p["summit"]
-            x[i * 3 + 2] = p["end"]
-            y[i * 3] = 0
-            y[i * 3 + 1] = p["value"]
-            y[i * 3 + 2] = 0
+        x[0::3] = peak_track["start"]
+        x[1::3] = peak_track["summit"]
+        x[2::3] = peak_track["end"]
+        y[1::3] = peak_track["value"]
 
         figure.add_trace(plotly_go.Scatter(x=x, y=y, name=track_name), secondary_y=True)
 
@@ -378,19 +476,10 @@ class App:
         visualization: Visualization = self.context.visualizations[quadrant_id]
         figure: plotly_go.Figure = self.context.plot_figures[quadrant_id]
 
-        point_track = visualization._source.get_point_track(
-            visualization._chromosome,
-            visualization._experiment,
-            visualization._timestep,
-            track_name,
-        )
-
-        x = np.zeros(len(point_track))
-        y = np.zeros(len(point_track))
+        point_track = visualization.get_point_track(track_name)
 
-        for i, p in enumerate(point_track):
-            x[i] = p["start"]
-            y[i] = p["value"]
+        x = np.asarray(point_track["start"], dtype=np.float64)
+        y = np.asarray(point_track["value"], dtype=np.float64)
 
         figure.add_trace(
             plotly_go.Scatter(x=x, y=y, name=track_name), secondary_y=False
@@ -416,6 +505,8 @@ class App:
         interpolation = -1
         if track_type == "structure" and representation == "tube":
             interpolation = 10_000
+        elif track_type == "peak":
+            interpolation = self.context.peak_spacing
 
         if display_id == Visualization.TEMP_DISPLAY_ID:
             self.on_add_display_to_viz(
@@ -436,23 +527,106 @@ class App:
         self.on_camera_reset(quadrant_id, reset=False)
 
     def on_server_ready(self, *_args, **_kwargs):
-        ensemble = Ensemble(self.context.data_directory, self.context.display_options)
-        source = SourceProvider(ensemble)
+        if is_remote(self.context.data_directory):
+            source = RemoteContainerSourceProvider(
+                self.context.data_directory,
+                self.context.display_options,
+                cache_dir=self.context.cache_dir,
+                cache_size=self.context.cache_size * 1024**2,
+            )
+        elif is_container(self.context.data_directory):
+            source = ContainerSourceProvider(
+                self.context.data_directory, self.context.display_options
+            )
+        elif is_database(self.context.data_directory):
+            source = DatabaseSourceProvider(
+                self.context.data_directory, self.context.display_options
+            )
+        else:
+            source = self._create_directory_source()
         self.context.source = source
 
-        chromosomes = source.get_chromosomes()
-        experiments = source.get_experiments()
-        timesteps = source.get_timesteps()
+        if self.context.prefetch > 0:
+            self.context.prefetcher = Prefetcher(
+                source, max_targets=self.context.prefetch
+            )
 
-        self.state.chromosomes = sorted(chromosomes)
-        self.state.experiments = sorted(experiments)
-        self.state.timesteps = sorted(timesteps)
+        self._update_catalogue()
 
         for i in range(self.N_QUADRANTS_3D):
             render_view = self.context.render_views[i]
-            visualization = Visualization(source, render_view)
+            visualization = Visualization(
+                source,
+                render_view,
+                self.context.structure_tolerance,
+                self.context.structure_points,
+            )
             self.context.visualizations[i] = visualization
 
+        if self.context.refresh_interval > 0:
+            asynchronous.create_task(self._poll_refresh())
+
+    def _create_directory_source(self):
+        cache = None
+        lazy = self.context.lazy
+        if self.context.shared is not None:
+            cache = attach(self.context.shared)
+            lazy = True
+        elif self.context.cache_dir is not None:
+            cache = ParseCache(
+                self.context.cache_dir, max_bytes=self.context.cache_size * 1024**2
+            )
+
+        ensemble = Ensemble(
+            self.context.data_directory,
+            self.context.display_options,
+            lazy=lazy,
+            cache=cache,
+            workers=self.context.workers,
+        )
+
+        return SourceProvider(
+            ensemble,
+            max_bytes=None
+            if self.context.memory_budget is None
+            else self.context.memory_budget * 1024**2,
+        )
+
+    def _update_catalogue(self):
+        source: BaseSourceProvider = self.context.source
+
+        self.state.chromosomes = sorted(source.get_chromosomes())
+        self.state.experiments = sorted(source.get_experiments())
+        self.state.timesteps = sorted(source.get_timesteps())
+
+    async def _refresh(self):
+        if self.state.refreshing:
+            return
+
+        with self.state:
+            self.state.refreshing = True
+
+        try:
+            # parse the changed timesteps without blocking the event loop
+            changes = await asyncio.get_running_loop().run_in_executor(
+                None, self.context.source.refresh
+            )
+        finally:
+            with self.state:
+                self.state.refreshing = False
+
+        if any(changes.values()):
+            with self.state:
+                self._update_catalogue()
+
+    async def _poll_refresh(self):
+        while True:
+            await asyncio.sleep(self.context.refresh_interval)
+            await self._refresh()
+
+    async def on_refresh(self, *_args):
+        await self._refresh()
+
     def on_camera_reset(self, quadrant_id=None, reset=True):
         quadrant_ids = (
             range(self.N_QUADRANTS_3D) if quadrant_id is None else [quadrant_id]
@@ -512,6 +686,11 @@ class App:
                     variant=("link_cameras ? 'tonal' : ''",),
                     click=self.on_link_cameras,
                 )
+                vuetify.VBtn(
+                    icon="mdi-refresh",
+                    loading=("refreshing",),
+                    click=self.on_refresh,
+                )
 
             with layout.content:
                 with html.Div(style="width:100%; height: 100%; position: relative;"):
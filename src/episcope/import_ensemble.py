@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+
+from episcope.library.io.database import import_ensemble
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="episcope-import",
+        description="Import a data directory into a SQLite database, which episcope opens with --data.",
+    )
+    parser.add_argument(
+        "-d",
+        "--data",
+        help="Data directory to import.",
+        dest="data",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Path of the database file to write, e.g. ensemble.sqlite.",
+        dest="output",
+        required=True,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of processes used to parse the data directory.",
+        dest="workers",
+        type=int,
+        default=1,
+    )
+    args = parser.parse_args(argv)
+
+    import_ensemble(args.data, args.output, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
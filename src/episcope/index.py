@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+
+from episcope.library.io.v1_2 import Ensemble
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="episcope-index",
+        description="Index the byte offsets of the chromosomes of the files of a data directory, so that episcope only reads the lines of the displayed chromosomes.",
+    )
+    parser.add_argument(
+        "data",
+        help="Data directory to index.",
+    )
+    args = parser.parse_args(argv)
+
+    ensemble = Ensemble(args.data, "", lazy=True)
+
+    for _experiment in ensemble._experiments.values():
+        for _timestep in _experiment._timesteps.values():
+            _timestep.build_manifest().write()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import TypedDict
 
+import numpy as np
+
+from episcope.library.io.columnar import (
+    ChromosomeTable,
+    peak_track_points,
+    point_track_points,
+    structure_points,
+)
+from episcope.library.io.pyramid import TrackPyramid
+
 
 class StructurePoint(TypedDict):
     """A typed dictionary representing a point in 3D space on a chromosome.
@@ -58,6 +69,84 @@ class LabelPoint(TypedDict):
     text: str
 
 
+class StructureArrays(TypedDict):
+    """A typed dictionary holding the structure of a chromosome in columnar form.
+
+    Attributes:
+        index: The base pair indices of the points, with shape (N,).
+        position: The 3D coordinates of the points, with shape (N, 3).
+    """
+
+    index: np.ndarray
+    position: np.ndarray
+
+
+class PeakTrackArrays(TypedDict):
+    """A typed dictionary holding the peaks of a chromosome in columnar form.
+
+    Attributes:
+        start: The start base pair positions of the peaks, with shape (N,).
+        end: The end base pair positions of the peaks, with shape (N,).
+        summit: The base pair positions at the peaks, with shape (N,).
+        value: The scalar values at the peaks, with shape (N,).
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    summit: np.ndarray
+    value: np.ndarray
+
+
+class PointTrackArrays(TypedDict):
+    """A typed dictionary holding the points of a chromosome in columnar form.
+
+    Attributes:
+        start: The start base pair positions of the points, with shape (N,).
+        end: The end base pair positions of the points, with shape (N,).
+        value: The scalar values of the points, with shape (N,).
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    value: np.ndarray
+
+
+class TrackSummaryArrays(TypedDict):
+    """A typed dictionary holding the summary of a track in bins, in columnar form.
+
+    Attributes:
+        start: The start base pair positions of the bins, with shape (N,).
+        end: The end base pair positions of the bins, with shape (N,).
+        min: The minimum value of the intervals overlapping each bin, with shape (N,).
+        max: The maximum value of the intervals overlapping each bin, with shape (N,).
+        mean: The mean value in each bin, weighted by the overlap of the intervals
+            with the bin, with shape (N,).
+        covered: The number of base pairs of the intervals inside each bin, with
+            shape (N,).
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    mean: np.ndarray
+    covered: np.ndarray
+
+
+class EnsembleChanges(TypedDict):
+    """A typed dictionary holding the timesteps changed by a refresh.
+
+    Attributes:
+        added: The (experiment, timestep) names of the added timesteps.
+        modified: The (experiment, timestep) names of the modified timesteps.
+        removed: The (experiment, timestep) names of the removed timesteps.
+    """
+
+    added: list[tuple[str, str]]
+    modified: list[tuple[str, str]]
+    removed: list[tuple[str, str]]
+
+
 class BaseSourceProvider(ABC):
     """Abstract base class for providing genomic data from various sources.
 
@@ -215,6 +304,261 @@ class BaseSourceProvider(ABC):
         """
         raise NotImplementedError
 
+    def get_structure_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> StructureArrays:
+        """Get the structure data for a specific chromosome, experiment, and timestep as arrays.
+
+        The default implementation converts the points of get_structure.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+
+        Returns:
+            A StructureArrays dictionary. The arrays may be views into shared
+            storage and must not be modified.
+        """
+        points = self.get_structure(chromosome, experiment, timestep)
+
+        return {
+            "index": np.array([point["index"] for point in points], dtype=np.int64),
+            "position": np.array(
+                [point["position"] for point in points], dtype=np.float64
+            ).reshape(-1, 3),
+        }
+
+    def get_peak_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PeakTrackArrays:
+        """Get the peak track data for a specific chromosome, experiment, timestep, and track as arrays.
+
+        The default implementation converts the points of get_peak_track.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+
+        Returns:
+            A PeakTrackArrays dictionary. The arrays may be views into shared
+            storage and must not be modified.
+        """
+        return _track_arrays(
+            self.get_peak_track(chromosome, experiment, timestep, track),
+            {
+                "start": np.int64,
+                "end": np.int64,
+                "summit": np.int64,
+                "value": np.float64,
+            },
+        )
+
+    def get_point_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PointTrackArrays:
+        """Get the point track data for a specific chromosome, experiment, timestep, and track as arrays.
+
+        The default implementation converts the points of get_point_track.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+
+        Returns:
+            A PointTrackArrays dictionary. The arrays may be views into shared
+            storage and must not be modified.
+        """
+        return _track_arrays(
+            self.get_point_track(chromosome, experiment, timestep, track),
+            {"start": np.int64, "end": np.int64, "value": np.float64},
+        )
+
+    def get_peak_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        """Get the number of intervals of a peak track, ideally without reading them.
+
+        The default implementation counts the arrays of get_peak_track_arrays.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+
+        Returns:
+            The number of rows that get_peak_track_arrays returns.
+        """
+        arrays = self.get_peak_track_arrays(chromosome, experiment, timestep, track)
+
+        return len(arrays["start"])
+
+    def get_point_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        """Get the number of intervals of a point track, ideally without reading them.
+
+        The default implementation counts the arrays of get_point_track_arrays.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+
+        Returns:
+            The number of rows that get_point_track_arrays returns.
+        """
+        arrays = self.get_point_track_arrays(chromosome, experiment, timestep, track)
+
+        return len(arrays["start"])
+
+    def get_peak_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PeakTrackArrays:
+        """Get the peaks of a track overlapping a genomic range.
+
+        The default implementation filters the arrays of get_peak_track_arrays.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+            start: The first base pair of the range.
+            end: The base pair following the range.
+
+        Returns:
+            A PeakTrackArrays dictionary with the peaks overlapping [start, end),
+            sorted by start.
+        """
+        return _select_range(
+            self.get_peak_track_arrays(chromosome, experiment, timestep, track),
+            start,
+            end,
+        )
+
+    def get_point_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PointTrackArrays:
+        """Get the points of a track overlapping a genomic range.
+
+        The default implementation filters the arrays of get_point_track_arrays.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+            start: The first base pair of the range.
+            end: The base pair following the range.
+
+        Returns:
+            A PointTrackArrays dictionary with the points overlapping [start, end),
+            sorted by start.
+        """
+        return _select_range(
+            self.get_point_track_arrays(chromosome, experiment, timestep, track),
+            start,
+            end,
+        )
+
+    def get_peak_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        """Get the summary of a peak track in bins, at a resolution close to a bin size.
+
+        The default implementation bins the arrays of get_peak_track_arrays on
+        every call.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+            bin_size: The requested size of the bins, in base pairs. The summary
+                uses the finest precomputed bins at least as large, if any.
+
+        Returns:
+            A TrackSummaryArrays dictionary with the non empty bins, sorted by start.
+        """
+        return _summarize(
+            chromosome,
+            self.get_peak_track_arrays(chromosome, experiment, timestep, track),
+            bin_size,
+        )
+
+    def get_point_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        """Get the summary of a point track in bins, at a resolution close to a bin size.
+
+        The default implementation bins the arrays of get_point_track_arrays on
+        every call.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            track: The track name.
+            bin_size: The requested size of the bins, in base pairs. The summary
+                uses the finest precomputed bins at least as large, if any.
+
+        Returns:
+            A TrackSummaryArrays dictionary with the non empty bins, sorted by start.
+        """
+        return _summarize(
+            chromosome,
+            self.get_point_track_arrays(chromosome, experiment, timestep, track),
+            bin_size,
+        )
+
     @abstractmethod
     def get_labels(
         self,
@@ -245,3 +589,141 @@ class BaseSourceProvider(ABC):
             A dictionary with the display options overrides, if any.
         """
         raise NotImplementedError
+
+    def refresh(self) -> EnsembleChanges:
+        """Load the experiments and timesteps that changed since they were read.
+
+        The default implementation reports no changes, for the providers whose
+        data cannot change.
+
+        Returns:
+            The (experiment, timestep) names of the added, modified and removed
+            timesteps.
+        """
+        return {"added": [], "modified": [], "removed": []}
+
+    def prefetch(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Load the data of a chromosome ahead of its display.
+
+        Providers that do not keep any data in memory have nothing to load. The
+        default implementation loads nothing.
+
+        Args:
+            chromosome: The chromosome name.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            cancelled: An optional callable checked between loading steps; the
+                prefetch stops as soon as it returns True.
+
+        Returns:
+            True if all the data was loaded, False if the prefetch was cancelled
+            or stopped early (e.g. to stay within a memory budget).
+        """
+        del chromosome, experiment, timestep
+
+        return cancelled is None or not cancelled()
+
+
+class ArraySourceProvider(BaseSourceProvider):
+    """Base class for the providers that hold their data in columnar arrays.
+
+    Subclasses implement the array methods, from which the points of
+    get_structure, get_peak_track and get_point_track are built.
+    """
+
+    def get_structure(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> list[StructurePoint]:
+        return structure_points(
+            self.get_structure_arrays(chromosome, experiment, timestep)
+        )
+
+    def get_peak_track(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> list[PeakTrackPoint]:
+        return peak_track_points(
+            self.get_peak_track_arrays(chromosome, experiment, timestep, track)
+        )
+
+    def get_point_track(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> list[PointTrackPoint]:
+        return point_track_points(
+            self.get_point_track_arrays(chromosome, experiment, timestep, track)
+        )
+
+    @abstractmethod
+    def get_structure_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> StructureArrays:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_peak_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PeakTrackArrays:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_point_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PointTrackArrays:
+        raise NotImplementedError
+
+
+def _track_arrays(
+    points: list[PeakTrackPoint] | list[PointTrackPoint],
+    dtypes: dict[str, type],
+) -> dict[str, np.ndarray]:
+    return {
+        name: np.array([point[name] for point in points], dtype=dtype)
+        for name, dtype in dtypes.items()
+    }
+
+
+def _select_range(
+    arrays: dict[str, np.ndarray], start: int, end: int
+) -> dict[str, np.ndarray]:
+    """Select the intervals overlapping [start, end), sorted by start."""
+    rows = np.flatnonzero((arrays["start"] < end) & (arrays["end"] > start))
+    rows = rows[np.argsort(arrays["start"][rows], kind="stable")]
+
+    return {name: column[rows] for name, column in arrays.items()}
+
+
+def _summarize(
+    chromosome: str, arrays: dict[str, np.ndarray], bin_size: int
+) -> TrackSummaryArrays:
+    table = ChromosomeTable(
+        [chromosome], np.array([0, len(arrays["start"])]), dict(arrays)
+    )
+
+    return TrackPyramid.build(table).summary(chromosome, bin_size)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from episcope.library.io.columnar import ChromosomeTable
+
+MAGIC = b"EPISCOPE"
+VERSION = 1
+
+# Arrays are stored at offsets that are multiples of this value, so that they
+# can be viewed directly from a memory mapping of the file.
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sIQ")
+
+# The size of the fixed part of the file, followed by the JSON header.
+PREAMBLE_SIZE = _PREAMBLE.size
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_arrays(
+    path: Path, arrays: dict[str, np.ndarray], meta: dict[str, Any] | None = None
+) -> None:
+    """Write named arrays and JSON metadata to a single binary file.
+
+    The file starts with a small preamble and a JSON header describing the dtype,
+    shape and offset of every array, followed by the raw array data. The file is
+    written to a temporary path first and moved in place, so readers never see a
+    partially written file.
+
+    Args:
+        path: The path of the file to write.
+        arrays: The arrays to store, indexed by name.
+        meta: Additional JSON serializable metadata.
+    """
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        stored = np.asarray(array)
+        entries[name] = {
+            "dtype": stored.dtype.str,
+            "shape": list(stored.shape),
+            "offset": offset,
+        }
+        offset = _aligned(offset + stored.nbytes)
+
+    header = json.dumps(
+        {"arrays": entries, "meta": meta or {}}, separators=(",", ":")
+    ).encode()
+    data_offset = _aligned(_PREAMBLE.size + len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+            file.write(header)
+            for name, array in arrays.items():
+                file.seek(data_offset + entries[name]["offset"])
+                file.write(np.ascontiguousarray(array).tobytes())
+            file.truncate(data_offset + offset)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def read_header(file: BinaryIO) -> tuple[dict[str, Any], int]:
+    """Read the header of a file written by write_arrays.
+
+    Args:
+        file: A binary file object positioned at the start of the file.
+
+    Returns:
+        The decoded JSON header, and the offset of the array data in the file.
+
+    Raises:
+        ValueError: If the file is not a valid array file.
+    """
+    preamble = file.read(_PREAMBLE.size)
+    return parse_header(preamble, file.read)
+
+
+def parse_header(preamble: bytes, read: Any) -> tuple[dict[str, Any], int]:
+    """Decode the preamble of an array file and read its JSON header.
+
+    Args:
+        preamble: The first bytes of the file.
+        read: A callable returning the given number of bytes following the preamble.
+
+    Returns:
+        The decoded JSON header, and the offset of the array data in the file.
+
+    Raises:
+        ValueError: If the file is not a valid array file.
+    """
+    if len(preamble) < _PREAMBLE.size:
+        msg = "The file is too short to be an array file."
+        raise ValueError(msg)
+
+    magic, version, header_length = _PREAMBLE.unpack(preamble[: _PREAMBLE.size])
+    if magic != MAGIC or version != VERSION:
+        msg = "The file is not a supported array file."
+        raise ValueError(msg)
+
+    header = json.loads(read(header_length))
+
+    return header, _aligned(_PREAMBLE.size + header_length)
+
+
+def array_from_buffer(
+    buffer: Any, entry: dict[str, Any], data_offset: int
+) -> np.ndarray:
+    """View one array described by a header entry in a buffer holding the whole file."""
+    dtype = np.dtype(entry["dtype"])
+    shape = tuple(entry["shape"])
+    count = int(np.prod(shape, dtype=np.int64))
+
+    return np.frombuffer(
+        buffer, dtype=dtype, count=count, offset=data_offset + entry["offset"]
+    ).reshape(shape)
+
+
+def read_arrays(path: Path) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """Memory-map a file written by write_arrays.
+
+    Args:
+        path: The path of the file to read.
+
+    Returns:
+        Read-only views of the stored arrays, indexed by name, and the metadata.
+
+    Raises:
+        ValueError: If the file is not a valid array file.
+    """
+    with path.open("rb") as file:
+        header, data_offset = read_header(file)
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {
+        name: array_from_buffer(buffer, entry, data_offset)
+        for name, entry in header["arrays"].items()
+    }
+
+    return arrays, header["meta"]
+
+
+def table_to_arrays(
+    table: ChromosomeTable, prefix: str = ""
+) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """Flatten a ChromosomeTable into named arrays and JSON metadata."""
+    arrays = {f"{prefix}offsets": table.offsets}
+    for name, column in table.columns.items():
+        arrays[f"{prefix}column/{name}"] = column
+
+    meta = {"chromosomes": table.chromosomes, "columns": list(table.columns)}
+
+    return arrays, meta
+
+
+def table_from_arrays(
+    arrays: dict[str, np.ndarray], meta: dict[str, Any], prefix: str = ""
+) -> ChromosomeTable:
+    """Rebuild a ChromosomeTable from the output of table_to_arrays."""
+    return ChromosomeTable(
+        meta["chromosomes"],
+        arrays[f"{prefix}offsets"],
+        {name: arrays[f"{prefix}column/{name}"] for name in meta["columns"]},
+    )
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from episcope.library.io.binary import (
+    read_arrays,
+    table_from_arrays,
+    table_to_arrays,
+    write_arrays,
+)
+from episcope.library.io.columnar import ChromosomeTable
+
+# Bump whenever the content produced by the readers changes, so that entries
+# written by older versions are treated as stale.
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 8 * 1024**3
+
+ENTRY_SUFFIX = ".epc"
+
+
+class ParseCache:
+    """A persistent cache of parsed files, stored as memory-mappable binary sidecars.
+
+    Each entry holds the ChromosomeTable obtained by parsing one source file,
+    along with the fingerprint (path, size and modification time) of the source
+    at the time it was parsed. An entry whose fingerprint does not match the
+    source anymore is stale, and is removed when it is looked up.
+
+    The total size of the entries is kept under a cap, by evicting the least
+    recently used entries. The modification time of an entry is updated on every
+    hit and used as its last access time, so that the cache also works on
+    filesystems mounted without access times.
+
+    The size and access order of the entries are read from the directory once,
+    then kept in memory, so that storing an entry does not list the directory.
+    Entries written by other processes sharing the directory are only accounted
+    for after a call to rescan().
+
+    Attributes:
+        directory: The directory holding the cache entries.
+        max_bytes: The maximum total size of the entries, in bytes.
+        read_only: If True, entries are only looked up, never written or removed.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        read_only: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+
+        self._lock = threading.Lock()
+        # entry path -> size in bytes, from least to most recently used
+        self._entries: OrderedDict[Path, int] | None = None
+        self._total_bytes = 0
+
+        if not self.read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, path: Path, kind: str) -> Path:
+        key = f"{kind}\0{path.resolve()}".encode()
+        return self.directory / f"{hashlib.sha256(key).hexdigest()[:32]}{ENTRY_SUFFIX}"
+
+    @staticmethod
+    def fingerprint(path: Path) -> dict[str, str | int]:
+        """The fingerprint used to detect that a source file changed."""
+        stat = path.stat()
+
+        return {
+            "path": str(path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "version": CACHE_VERSION,
+        }
+
+    def get(self, path: Path, kind: str) -> ChromosomeTable | None:
+        """Look up the parsed content of a file.
+
+        Args:
+            path: The path of the source file.
+            kind: The kind of content the source file was parsed as (e.g. 'peak').
+
+        Returns:
+            The memory-mapped ChromosomeTable, or None if there is no valid entry.
+        """
+        entry = self._load(path, kind)
+        if entry is None:
+            return None
+
+        return table_from_arrays(*entry)
+
+    def put(self, path: Path, kind: str, table: ChromosomeTable) -> None:
+        """Store the parsed content of a file, then evict entries above the size cap.
+
+        Args:
+            path: The path of the source file.
+            kind: The kind of content the source file was parsed as (e.g. 'peak').
+            table: The parsed content.
+        """
+        self._store(path, kind, *table_to_arrays(table))
+
+    def get_tables(self, path: Path, kind: str) -> dict[str, ChromosomeTable] | None:
+        """Look up several tables derived from a file.
+
+        Args:
+            path: The path of the source file.
+            kind: The kind of content derived from the source file (e.g. 'peak-pyramid').
+
+        Returns:
+            The memory-mapped tables indexed by name, or None if there is no valid entry.
+        """
+        entry = self._load(path, kind)
+        if entry is None:
+            return None
+
+        arrays, meta = entry
+
+        return {
+            name: table_from_arrays(arrays, table_meta, prefix=f"{name}/")
+            for name, table_meta in meta["tables"].items()
+        }
+
+    def put_tables(
+        self, path: Path, kind: str, tables: dict[str, ChromosomeTable]
+    ) -> None:
+        """Store several tables derived from a file in a single entry.
+
+        Args:
+            path: The path of the source file.
+            kind: The kind of content derived from the source file (e.g. 'peak-pyramid').
+            tables: The tables to store, indexed by name.
+        """
+        arrays = {}
+        meta: dict[str, Any] = {"tables": {}}
+        for name, table in tables.items():
+            table_arrays, table_meta = table_to_arrays(table, prefix=f"{name}/")
+            arrays.update(table_arrays)
+            meta["tables"][name] = table_meta
+
+        self._store(path, kind, arrays, meta)
+
+    def _load(
+        self, path: Path, kind: str
+    ) -> tuple[dict[str, np.ndarray], dict[str, Any]] | None:
+        entry_path = self._entry_path(path, kind)
+        if not entry_path.is_file():
+            return None
+
+        try:
+            arrays, meta = read_arrays(entry_path)
+        except (OSError, ValueError, KeyError):
+            self._remove(entry_path)
+            return None
+
+        if meta.get("fingerprint") != self.fingerprint(path):
+            self._remove(entry_path)
+            return None
+
+        if not self.read_only:
+            with contextlib.suppress(OSError):
+                os.utime(entry_path)
+            with self._lock:
+                if self._entries is not None and entry_path in self._entries:
+                    self._entries.move_to_end(entry_path)
+
+        return arrays, meta
+
+    def _store(
+        self,
+        path: Path,
+        kind: str,
+        arrays: dict[str, np.ndarray],
+        meta: dict[str, Any],
+    ) -> None:
+        if self.read_only:
+            return
+
+        meta["fingerprint"] = self.fingerprint(path)
+        meta["kind"] = kind
+
+        entry_path = self._entry_path(path, kind)
+        write_arrays(entry_path, arrays, meta)
+
+        with self._lock:
+            entries = self._index()
+            self._total_bytes -= entries.pop(entry_path, 0)
+            with contextlib.suppress(OSError):
+                entries[entry_path] = entry_path.stat().st_size
+                self._total_bytes += entries[entry_path]
+
+        self.evict()
+
+    @property
+    def total_bytes(self) -> int:
+        """The total size of the entries, in bytes."""
+        with self._lock:
+            self._index()
+            return self._total_bytes
+
+    def rescan(self) -> None:
+        """Read the size and access order of the entries from the directory again."""
+        with self._lock:
+            self._entries = None
+            self._index()
+
+    def _index(self) -> OrderedDict[Path, int]:
+        # Must be called with the lock held.
+        if self._entries is not None:
+            return self._entries
+
+        entries = []
+        for entry_path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+
+        entries.sort()
+
+        self._entries = OrderedDict((path, size) for _, size, path in entries)
+        self._total_bytes = sum(self._entries.values())
+
+        return self._entries
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits its size cap."""
+        if self.read_only:
+            return
+
+        with self._lock:
+            entries = self._index()
+            while self._total_bytes > self.max_bytes and entries:
+                entry_path, size = entries.popitem(last=False)
+                self._total_bytes -= size
+                entry_path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove every entry of the cache."""
+        for entry_path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            self._remove(entry_path)
+
+    def _remove(self, entry_path: Path) -> None:
+        if self.read_only:
+            return
+
+        entry_path.unlink(missing_ok=True)
+
+        with self._lock:
+            if self._entries is not None:
+                self._total_bytes -= self._entries.pop(entry_path, 0)
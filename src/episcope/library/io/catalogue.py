@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+_Key = tuple[str | None, str | None]
+
+
+class CatalogueIndex:
+    """An inverted index of the chromosomes, experiments and timesteps of a source.
+
+    For every combination of filters of a catalogue query (e.g. the chromosomes
+    of an experiment at any timestep), the index stores the matching values
+    along with the number of timesteps providing each of them. Queries are then
+    a single dictionary lookup, and timesteps can be added or removed without
+    rebuilding the index.
+
+    The names of the tracks available for each chromosome of a timestep are
+    stored separately, since finding them may require parsing the track files.
+    """
+
+    def __init__(self) -> None:
+        self._timesteps: dict[tuple[str, str], frozenset[str]] = {}
+        self._chromosomes: dict[_Key, dict[str, int]] = {}
+        self._experiments: dict[_Key, dict[str, int]] = {}
+        self._timestep_names: dict[_Key, dict[str, int]] = {}
+        self._tracks: dict[tuple[str, str, str], dict[str, frozenset[str]]] = {}
+
+    def add(self, experiment: str, timestep: str, chromosomes: Iterable[str]) -> None:
+        """Add a timestep and its chromosomes to the index, replacing any previous entry.
+
+        Args:
+            experiment: The experiment name.
+            timestep: The timestep name.
+            chromosomes: The chromosomes with a structure in the timestep.
+        """
+        self.remove(experiment, timestep)
+
+        chromosomes = frozenset(chromosomes)
+        self._timesteps[(experiment, timestep)] = chromosomes
+
+        for chromosome in chromosomes:
+            self._update(experiment, timestep, chromosome, 1)
+
+    def remove(self, experiment: str, timestep: str) -> None:
+        """Remove a timestep from the index, if present.
+
+        Args:
+            experiment: The experiment name.
+            timestep: The timestep name.
+        """
+        chromosomes = self._timesteps.pop((experiment, timestep), None)
+        if chromosomes is None:
+            return
+
+        for chromosome in chromosomes:
+            self._update(experiment, timestep, chromosome, -1)
+
+        for kind in ("peak", "point"):
+            self._tracks.pop((experiment, timestep, kind), None)
+
+    def get_chromosomes(
+        self, experiment: str | None = None, timestep: str | None = None
+    ) -> set[str]:
+        return set(self._chromosomes.get((experiment, timestep), ()))
+
+    def get_experiments(
+        self, chromosome: str | None = None, timestep: str | None = None
+    ) -> set[str]:
+        return set(self._experiments.get((chromosome, timestep), ()))
+
+    def get_timesteps(
+        self, chromosome: str | None = None, experiment: str | None = None
+    ) -> set[str]:
+        return set(self._timestep_names.get((chromosome, experiment), ()))
+
+    def has_tracks(self, experiment: str, timestep: str, kind: str) -> bool:
+        """Whether the tracks of the given kind of a timestep have been indexed."""
+        return (experiment, timestep, kind) in self._tracks
+
+    def set_tracks(
+        self,
+        experiment: str,
+        timestep: str,
+        kind: str,
+        tracks: dict[str, Iterable[str]],
+    ) -> None:
+        """Index the tracks of a timestep by chromosome.
+
+        Args:
+            experiment: The experiment name.
+            timestep: The timestep name.
+            kind: The kind of the tracks ('peak' or 'point').
+            tracks: The chromosomes of each track, indexed by track name.
+        """
+        by_chromosome: dict[str, set[str]] = {}
+        for track_name, chromosomes in tracks.items():
+            for chromosome in chromosomes:
+                by_chromosome.setdefault(chromosome, set()).add(track_name)
+
+        self._tracks[(experiment, timestep, kind)] = {
+            chromosome: frozenset(names) for chromosome, names in by_chromosome.items()
+        }
+
+    def get_tracks(
+        self, chromosome: str, experiment: str, timestep: str, kind: str
+    ) -> set[str]:
+        """The names of the tracks of the given kind available for a chromosome.
+
+        Raises:
+            KeyError: If the tracks of the timestep have not been indexed.
+        """
+        return set(self._tracks[(experiment, timestep, kind)].get(chromosome, ()))
+
+    def _update(
+        self, experiment: str, timestep: str, chromosome: str, delta: int
+    ) -> None:
+        for experiment_key in (experiment, None):
+            for timestep_key in (timestep, None):
+                _count(
+                    self._chromosomes, (experiment_key, timestep_key), chromosome, delta
+                )
+
+        for chromosome_key in (chromosome, None):
+            for timestep_key in (timestep, None):
+                _count(
+                    self._experiments, (chromosome_key, timestep_key), experiment, delta
+                )
+
+            for experiment_key in (experiment, None):
+                _count(
+                    self._timestep_names,
+                    (chromosome_key, experiment_key),
+                    timestep,
+                    delta,
+                )
+
+
+def _count(
+    index: dict[_Key, dict[str, int]], key: _Key, value: str, delta: int
+) -> None:
+    counts = index.setdefault(key, {})
+    count = counts.get(value, 0) + delta
+
+    if count > 0:
+        counts[value] = count
+    else:
+        counts.pop(value, None)
+        if not counts:
+            del index[key]
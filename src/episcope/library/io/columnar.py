@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # only used in annotations: the package imports this module
+    from episcope.library.io import (
+        LabelPoint,
+        PeakTrackArrays,
+        PeakTrackPoint,
+        PointTrackArrays,
+        PointTrackPoint,
+        StructureArrays,
+        StructurePoint,
+    )
+
+
+class ChromosomeTable(Mapping[str, dict[str, np.ndarray]]):
+    """Columns of a genomic file, with the rows of each chromosome stored contiguously.
+
+    Every column is a single array holding the rows of all chromosomes. The rows
+    of the chromosome ``chromosomes[i]`` are ``offsets[i]:offsets[i + 1]``, so
+    looking up a chromosome returns views into the columns without copying.
+
+    Attributes:
+        chromosomes: The chromosome names, in storage order.
+        offsets: The row offset of each chromosome, with shape (len(chromosomes) + 1,).
+        columns: The column arrays, indexed by column name.
+    """
+
+    def __init__(
+        self,
+        chromosomes: list[str],
+        offsets: np.ndarray,
+        columns: dict[str, np.ndarray],
+    ) -> None:
+        if len(offsets) != len(chromosomes) + 1:
+            msg = "There should be exactly one more offset than chromosomes."
+            raise ValueError(msg)
+
+        self.chromosomes = list(chromosomes)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.columns = columns
+        self._rows = {
+            chromosome: (int(self.offsets[i]), int(self.offsets[i + 1]))
+            for i, chromosome in enumerate(self.chromosomes)
+        }
+
+    @classmethod
+    def from_groups(
+        cls,
+        groups: dict[str, dict[str, list]],
+        dtypes: dict[str, np.dtype | type],
+    ) -> ChromosomeTable:
+        """Build a table from per-chromosome lists of values.
+
+        Args:
+            groups: The values of each column, indexed by chromosome and column name.
+            dtypes: The dtype of each column.
+
+        Returns:
+            A ChromosomeTable holding the values of all the chromosomes.
+        """
+        chromosomes = list(groups)
+        offsets = np.zeros(len(chromosomes) + 1, dtype=np.int64)
+
+        for i, chromosome in enumerate(chromosomes):
+            first_column = next(iter(groups[chromosome].values()), [])
+            offsets[i + 1] = offsets[i] + len(first_column)
+
+        columns = {}
+        for name, dtype in dtypes.items():
+            if chromosomes:
+                columns[name] = np.concatenate(
+                    [np.asarray(groups[c][name], dtype=dtype) for c in chromosomes]
+                )
+            else:
+                columns[name] = np.zeros(0, dtype=dtype)
+
+        return cls(chromosomes, offsets, columns)
+
+    def __getitem__(self, chromosome: str) -> dict[str, np.ndarray]:
+        start, end = self.row_range(chromosome)
+
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.chromosomes)
+
+    def __len__(self) -> int:
+        return len(self.chromosomes)
+
+    def __contains__(self, chromosome: object) -> bool:
+        return chromosome in self._rows
+
+    def row_range(self, chromosome: str) -> tuple[int, int]:
+        """The first and past-the-end rows of a chromosome in the columns."""
+        return self._rows[chromosome]
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes held by the column and offset arrays."""
+        return self.offsets.nbytes + sum(c.nbytes for c in self.columns.values())
+
+
+LABELS_DTYPES: dict[str, np.dtype | type] = {
+    "index": np.int64,
+    "text": np.str_,
+}
+
+
+def structure_points(arrays: StructureArrays) -> list[StructurePoint]:
+    """Convert columnar structure data to a list of StructurePoint."""
+    return [
+        {"index": index, "position": tuple(position)}
+        for index, position in zip(
+            arrays["index"].tolist(), arrays["position"].tolist(), strict=True
+        )
+    ]
+
+
+def peak_track_points(arrays: PeakTrackArrays) -> list[PeakTrackPoint]:
+    """Convert columnar peak track data to a list of PeakTrackPoint."""
+    return [
+        {"start": start, "end": end, "summit": summit, "value": value}
+        for start, end, summit, value in zip(
+            arrays["start"].tolist(),
+            arrays["end"].tolist(),
+            arrays["summit"].tolist(),
+            arrays["value"].tolist(),
+            strict=True,
+        )
+    ]
+
+
+def point_track_points(arrays: PointTrackArrays) -> list[PointTrackPoint]:
+    """Convert columnar point track data to a list of PointTrackPoint."""
+    return [
+        {"start": start, "end": end, "value": value}
+        for start, end, value in zip(
+            arrays["start"].tolist(),
+            arrays["end"].tolist(),
+            arrays["value"].tolist(),
+            strict=True,
+        )
+    ]
+
+
+def label_points(arrays: dict[str, np.ndarray]) -> list[LabelPoint]:
+    """Convert columnar labels data to a list of LabelPoint."""
+    return [
+        {"index": index, "text": text}
+        for index, text in zip(
+            arrays["index"].tolist(), arrays["text"].tolist(), strict=True
+        )
+    ]
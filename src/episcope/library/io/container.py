@@ -0,0 +1,555 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from episcope.library.io import (
+    ArraySourceProvider,
+    EnsembleChanges,
+    PeakTrackArrays,
+    PointTrackArrays,
+    StructureArrays,
+    TrackSummaryArrays,
+)
+from episcope.library.io.binary import (
+    read_arrays,
+    read_header,
+    table_from_arrays,
+    table_to_arrays,
+    write_arrays,
+)
+from episcope.library.io.catalogue import CatalogueIndex
+from episcope.library.io.columnar import ChromosomeTable, label_points
+from episcope.library.io.intervals import IntervalIndex
+from episcope.library.io.pyramid import TrackPyramid
+from episcope.library.io.singleflight import SingleFlight
+from episcope.library.io.v1_2.ensemble import Ensemble, read_display_options
+
+CONTAINER_FORMAT = "episcope-container"
+
+# Bump whenever the layout of the tables in the container changes.
+CONTAINER_VERSION = 2
+
+CONTAINER_SUFFIX = ".episcope"
+
+
+def pack(
+    data_directory: str | Path,
+    path: str | Path,
+    workers: int = 1,
+) -> None:
+    """Pack an ensemble directory into a single container file.
+
+    Every structure, labels and track file of the ensemble is parsed, and
+    stored in the container as the contiguous arrays of its ChromosomeTable,
+    along with the zoom levels of the tracks. The JSON header of the container
+    holds the metadata of the ensemble and of its experiments, and the table of
+    contents of every timestep: the offsets of its arrays, and the rows of each
+    chromosome in them. A container is opened with ContainerSourceProvider,
+    which memory-maps it instead of parsing anything.
+
+    Args:
+        data_directory: The directory of the ensemble.
+        path: The path of the container file to write.
+        workers: The number of processes parsing the timesteps in parallel.
+    """
+    ensemble = Ensemble(data_directory, "", workers=workers)
+
+    arrays: dict[str, np.ndarray] = {}
+    experiments: dict[str, Any] = {}
+
+    for _experiment_name, _experiment in sorted(ensemble._experiments.items()):
+        timesteps: dict[str, Any] = {}
+
+        for _timestep_name, _timestep in sorted(_experiment._timesteps.items()):
+            tables = {
+                "structure": _timestep.get_structures(),
+                "labels": _timestep.get_labels(),
+            }
+            for _track_name in _timestep.peak_track_names:
+                tables[f"peak/{_track_name}"] = _timestep.get_peak_track(_track_name)
+                _pyramid = _timestep.get_peak_track_pyramid(_track_name)
+                for shift, level in _pyramid.levels.items():
+                    tables[f"peak-pyramid/{_track_name}/{shift}"] = level
+            for _track_name in _timestep.point_track_names:
+                tables[f"point/{_track_name}"] = _timestep.get_point_track(_track_name)
+                _pyramid = _timestep.get_point_track_pyramid(_track_name)
+                for shift, level in _pyramid.levels.items():
+                    tables[f"point-pyramid/{_track_name}/{shift}"] = level
+
+            tables_meta = {}
+            for table_name, table in tables.items():
+                table_arrays, table_meta = table_to_arrays(
+                    table, prefix=f"{_experiment_name}/{_timestep_name}/{table_name}/"
+                )
+                arrays.update(table_arrays)
+                # the rows of the chromosomes, to locate them without reading the data
+                table_meta["offsets"] = table.offsets.tolist()
+                tables_meta[table_name] = table_meta
+
+            timesteps[_timestep_name] = {
+                "chromosomes": sorted(_timestep.chromosomes),
+                "fingerprint": _timestep._fingerprint,
+                "peak_tracks": sorted(_timestep.peak_track_names),
+                "point_tracks": sorted(_timestep.point_track_names),
+                "tables": tables_meta,
+            }
+
+        experiments[_experiment_name] = {
+            "meta": _jsonable(_experiment._meta),
+            "timesteps": timesteps,
+        }
+
+    meta = {
+        "format": CONTAINER_FORMAT,
+        "version": CONTAINER_VERSION,
+        "chromosomes": sorted(ensemble._chromosomes),
+        "meta": _jsonable(ensemble._meta),
+        "experiments_meta": _jsonable(ensemble._experiments_meta),
+        "experiments": experiments,
+    }
+
+    write_arrays(Path(path), arrays, meta)
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert the YAML values that JSON has no type for (e.g. dates) to strings."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def check_container(meta: dict[str, Any], location: str | Path) -> None:
+    """Check that the metadata of an array file is the one of a supported container.
+
+    Raises:
+        ValueError: If the file is not a container file, or an unsupported version.
+    """
+    if (
+        meta.get("format") != CONTAINER_FORMAT
+        or meta.get("version") != CONTAINER_VERSION
+    ):
+        msg = f"'{location}' is not a supported container file."
+        raise ValueError(msg)
+
+
+def is_container(path: str | Path) -> bool:
+    """Whether a path is a container file written by pack()."""
+    path = Path(path)
+    if not path.is_file():
+        return False
+
+    try:
+        with path.open("rb") as file:
+            header, _ = read_header(file)
+    except (OSError, ValueError):
+        return False
+
+    return header["meta"].get("format") == CONTAINER_FORMAT
+
+
+class _Timestep:
+    """The tables of a timestep of a container, read on their first use."""
+
+    def __init__(
+        self,
+        meta: dict[str, Any],
+        read_table: Callable[[str, dict[str, Any]], ChromosomeTable],
+    ) -> None:
+        self.chromosomes: list[str] = meta["chromosomes"]
+        self.fingerprint: dict[str, Any] = meta["fingerprint"]
+        self.peak_track_names: list[str] = meta["peak_tracks"]
+        self.point_track_names: list[str] = meta["point_tracks"]
+
+        self._tables_meta: dict[str, dict[str, Any]] = meta["tables"]
+        self._read_table = read_table
+        self._tables: dict[str, ChromosomeTable] = {}
+        self._indexes: dict[tuple[str, str, str], IntervalIndex] = {}
+        self._pyramids: dict[tuple[str, str], TrackPyramid] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def get_table(self, name: str) -> ChromosomeTable:
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None:
+                table = self._read_table(name, self._tables_meta[name])
+                self._tables[name] = table
+
+        return table
+
+    def get_track(self, kind: str, track_name: str) -> ChromosomeTable:
+        return self.get_table(f"{kind}/{track_name}")
+
+    def get_track_chromosomes(self, kind: str, track_name: str) -> list[str]:
+        """The chromosomes of a track, from the header of the container."""
+        return self._tables_meta[f"{kind}/{track_name}"]["chromosomes"]
+
+    def get_track_index(
+        self, kind: str, track_name: str, chromosome: str
+    ) -> IntervalIndex:
+        """The IntervalIndex of a chromosome of a track, built on its first use.
+
+        Only the rows of the chromosome are read to build the index.
+        """
+        key = (kind, track_name, chromosome)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is not None:
+            return index
+
+        def build() -> IntervalIndex:
+            track = self.get_track(kind, track_name)
+            if chromosome in track:
+                columns = track[chromosome]
+            else:
+                columns = {name: column[:0] for name, column in track.columns.items()}
+
+            n_rows = len(columns["start"])
+            index = IntervalIndex(ChromosomeTable([chromosome], [0, n_rows], columns))
+            with self._lock:
+                self._indexes[key] = index
+            return index
+
+        return self._flights.do(key, build)
+
+    def get_track_pyramid(self, kind: str, track_name: str) -> TrackPyramid:
+        """The TrackPyramid of a track, gathered from its stored levels."""
+        key = (kind, track_name)
+        with self._lock:
+            pyramid = self._pyramids.get(key)
+        if pyramid is not None:
+            return pyramid
+
+        prefix = f"{kind}-pyramid/{track_name}/"
+        pyramid = TrackPyramid(
+            {
+                int(table_name[len(prefix) :]): self.get_table(table_name)
+                for table_name in self._tables_meta
+                if table_name.startswith(prefix)
+            }
+        )
+        with self._lock:
+            return self._pyramids.setdefault(key, pyramid)
+
+
+class ContainerSourceProvider(ArraySourceProvider):
+    def __init__(self, path: str | Path, display_options_path: str | Path = ""):
+        """Initializes the ContainerSourceProvider with a container file.
+
+        Args:
+            path: The path of a container file written by pack().
+            display_options_path: The path of a file that has overrides to the
+                appearance of the 3D visualization.
+
+        The container is memory-mapped: every request returns views into the
+        mapping, so only the pages of the requested chromosomes are read from
+        disk, and nothing is parsed. The interval indexes of the tracks are the
+        only data built in memory, on their first use.
+
+        Raises:
+            ValueError: If the file is not a container file.
+        """
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._index = CatalogueIndex()
+        self._timesteps: dict[tuple[str, str], _Timestep] = {}
+        self._display_options = read_display_options(Path(display_options_path))
+
+        self._open()
+
+    def _version(self) -> tuple[Any, ...]:
+        """A value that changes whenever the container is replaced."""
+        stat = self.path.stat()
+
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _read(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Map the container.
+
+        Returns:
+            The arrays of the container, as used by _read_table(), and its metadata.
+        """
+        arrays, meta = read_arrays(self.path)
+        check_container(meta, self.path)
+
+        return arrays, meta
+
+    def _read_table(
+        self,
+        arrays: dict[str, Any],
+        prefix: str,
+        table_name: str,
+        table_meta: dict[str, Any],
+    ) -> ChromosomeTable:
+        """Get a table of a timestep from the arrays returned by _read()."""
+        return table_from_arrays(arrays, table_meta, prefix=f"{prefix}{table_name}/")
+
+    def _open(self) -> dict[tuple[str, str], _Timestep]:
+        """Read the container, and replace the timesteps and the catalogue with its content.
+
+        Returns:
+            The previous timesteps.
+        """
+        self._opened_version = self._version()
+        arrays, meta = self._read()
+
+        self._meta = meta["meta"]
+        self._experiments_meta = meta["experiments_meta"]
+
+        timesteps = {}
+        for experiment, experiment_meta in meta["experiments"].items():
+            for timestep, timestep_meta in experiment_meta["timesteps"].items():
+                timesteps[(experiment, timestep)] = _Timestep(
+                    timestep_meta,
+                    partial(self._read_table, arrays, f"{experiment}/{timestep}/"),
+                )
+
+        previous_timesteps = self._timesteps
+        self._timesteps = timesteps
+        self._index = CatalogueIndex()
+
+        for (experiment, timestep), _timestep in timesteps.items():
+            self._index.add(experiment, timestep, _timestep.chromosomes)
+            for kind in ("peak", "point"):
+                self._index.set_tracks(
+                    experiment,
+                    timestep,
+                    kind,
+                    {
+                        _track_name: _timestep.get_track_chromosomes(kind, _track_name)
+                        for _track_name in getattr(_timestep, f"{kind}_track_names")
+                    },
+                )
+
+        return previous_timesteps
+
+    def refresh(self) -> EnsembleChanges:
+        """Read the container again if it was replaced, e.g. packed again.
+
+        Returns:
+            The (experiment, timestep) names of the added, modified and removed
+            timesteps, the modified ones being those whose files changed
+            between the two packs.
+        """
+        changes: EnsembleChanges = {"added": [], "modified": [], "removed": []}
+
+        with self._lock:
+            if self._version() == self._opened_version:
+                return changes
+
+            previous_timesteps = self._open()
+
+            for key in sorted(previous_timesteps.keys() - self._timesteps.keys()):
+                changes["removed"].append(key)
+
+            for key, _timestep in sorted(self._timesteps.items()):
+                previous_timestep = previous_timesteps.get(key)
+                if previous_timestep is None:
+                    changes["added"].append(key)
+                elif previous_timestep.fingerprint != _timestep.fingerprint:
+                    changes["modified"].append(key)
+
+        return changes
+
+    def _get_timestep(self, experiment: str, timestep: str) -> _Timestep:
+        with self._lock:
+            return self._timesteps[(experiment, timestep)]
+
+    def prefetch(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Build the interval indexes of the tracks of a chromosome ahead of its display.
+
+        The rest of the data is read on demand.
+        """
+        with self._lock:
+            if chromosome not in self._index.get_chromosomes(experiment, timestep):
+                return True
+
+        _timestep = self._get_timestep(experiment, timestep)
+        for kind in ("peak", "point"):
+            for _track_name in getattr(_timestep, f"{kind}_track_names"):
+                if cancelled is not None and cancelled():
+                    return False
+
+                _timestep.get_track_index(kind, _track_name, chromosome)
+
+        return True
+
+    def get_chromosomes(
+        self,
+        experiment: str | None = None,
+        timestep: str | None = None,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_chromosomes(experiment, timestep)
+
+    def get_experiments(
+        self,
+        chromosome: str | None = None,
+        timestep: str | None = None,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_experiments(chromosome, timestep)
+
+    def get_timesteps(
+        self,
+        chromosome: str | None = None,
+        experiment: str | None = None,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_timesteps(chromosome, experiment)
+
+    def get_peak_tracks(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_tracks(chromosome, experiment, timestep, "peak")
+
+    def get_point_tracks(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_tracks(chromosome, experiment, timestep, "point")
+
+    def get_structure_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> StructureArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+
+        return _timestep.get_table("structure")[chromosome]
+
+    def get_peak_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PeakTrackArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+
+        return _timestep.get_track("peak", track)[chromosome]
+
+    def get_point_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PointTrackArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+
+        return _timestep.get_track("point", track)[chromosome]
+
+    def get_peak_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        _timestep = self._get_timestep(experiment, timestep)
+        start, end = _timestep.get_track("peak", track).row_range(chromosome)
+
+        return end - start
+
+    def get_point_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        _timestep = self._get_timestep(experiment, timestep)
+        start, end = _timestep.get_track("point", track).row_range(chromosome)
+
+        return end - start
+
+    def get_peak_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PeakTrackArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+        _index = _timestep.get_track_index("peak", track, chromosome)
+
+        return _index.select(chromosome, start, end)
+
+    def get_point_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PointTrackArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+        _index = _timestep.get_track_index("point", track, chromosome)
+
+        return _index.select(chromosome, start, end)
+
+    def get_peak_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+        _pyramid = _timestep.get_track_pyramid("peak", track)
+
+        return _pyramid.summary(chromosome, bin_size)
+
+    def get_point_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        _timestep = self._get_timestep(experiment, timestep)
+        _pyramid = _timestep.get_track_pyramid("point", track)
+
+        return _pyramid.summary(chromosome, bin_size)
+
+    def get_labels(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ):
+        _timestep = self._get_timestep(experiment, timestep)
+        _labels = _timestep.get_table("labels")
+
+        if chromosome not in _labels:
+            return []
+
+        return label_points(_labels[chromosome])
+
+    def get_display_options(self, display_type: str):
+        return self._display_options.get(display_type, {})
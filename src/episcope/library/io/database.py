@@ -0,0 +1,932 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from episcope.library.io import (
+    ArraySourceProvider,
+    EnsembleChanges,
+    PeakTrackArrays,
+    PointTrackArrays,
+    StructureArrays,
+    TrackSummaryArrays,
+)
+from episcope.library.io.catalogue import CatalogueIndex
+from episcope.library.io.columnar import LABELS_DTYPES, ChromosomeTable, label_points
+from episcope.library.io.pyramid import SUMMARY_DTYPES
+from episcope.library.io.v1_2.ensemble import Ensemble, read_display_options
+
+DATABASE_FORMAT = "episcope-database"
+
+# Bump whenever the schema of the database changes.
+DATABASE_VERSION = 1
+
+# Number of rows fetched from the database at a time when building arrays.
+FETCH_BATCH_SIZE = 64 * 1024
+
+_SQLITE_MAGIC = b"SQLite format 3\0"
+
+_TRACK_DTYPES: dict[str, dict[str, np.dtype | type]] = {
+    "peak": {
+        "start": np.int64,
+        "end": np.int64,
+        "summit": np.int64,
+        "value": np.float64,
+    },
+    "point": {
+        "start": np.int64,
+        "end": np.int64,
+        "value": np.float64,
+    },
+}
+
+_STRUCTURE_DTYPES: dict[str, np.dtype | type] = {
+    "index": np.int64,
+    "x": np.float64,
+    "y": np.float64,
+    "z": np.float64,
+}
+
+# The rows of each chromosome are clustered on their (table, chromosome, row)
+# primary key, so that reading a chromosome is a single range scan. The tracks
+# are also indexed by start: together with the maximum length of the intervals
+# of each chromosome, the intervals overlapping a range are found with a
+# single range scan of that index.
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE timesteps (
+    id INTEGER PRIMARY KEY,
+    experiment TEXT NOT NULL,
+    timestep TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    UNIQUE (experiment, timestep)
+);
+CREATE TABLE chromosomes (
+    timestep_id INTEGER NOT NULL REFERENCES timesteps (id),
+    chromosome TEXT NOT NULL,
+    PRIMARY KEY (timestep_id, chromosome)
+) WITHOUT ROWID;
+CREATE TABLE tracks (
+    id INTEGER PRIMARY KEY,
+    timestep_id INTEGER NOT NULL REFERENCES timesteps (id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (timestep_id, kind, name)
+);
+CREATE TABLE track_chromosomes (
+    track_id INTEGER NOT NULL REFERENCES tracks (id),
+    chromosome TEXT NOT NULL,
+    max_length INTEGER NOT NULL,
+    PRIMARY KEY (track_id, chromosome)
+) WITHOUT ROWID;
+CREATE TABLE structures (
+    timestep_id INTEGER NOT NULL REFERENCES timesteps (id),
+    chromosome TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    "index" INTEGER NOT NULL,
+    x REAL,
+    y REAL,
+    z REAL,
+    PRIMARY KEY (timestep_id, chromosome, row)
+) WITHOUT ROWID;
+CREATE TABLE labels (
+    timestep_id INTEGER NOT NULL REFERENCES timesteps (id),
+    chromosome TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    "index" INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (timestep_id, chromosome, row)
+) WITHOUT ROWID;
+CREATE TABLE peaks (
+    track_id INTEGER NOT NULL REFERENCES tracks (id),
+    chromosome TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    "end" INTEGER NOT NULL,
+    summit INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (track_id, chromosome, row)
+) WITHOUT ROWID;
+CREATE TABLE points (
+    track_id INTEGER NOT NULL REFERENCES tracks (id),
+    chromosome TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    "end" INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (track_id, chromosome, row)
+) WITHOUT ROWID;
+CREATE TABLE summaries (
+    track_id INTEGER NOT NULL REFERENCES tracks (id),
+    shift INTEGER NOT NULL,
+    chromosome TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    "end" INTEGER NOT NULL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    covered INTEGER NOT NULL,
+    PRIMARY KEY (track_id, shift, chromosome, row)
+) WITHOUT ROWID;
+"""
+
+_INDEXES = """
+CREATE INDEX peaks_start ON peaks (track_id, chromosome, start);
+CREATE INDEX points_start ON points (track_id, chromosome, start);
+"""
+
+_TRACK_TABLES = {"peak": "peaks", "point": "points"}
+
+
+def import_ensemble(
+    data_directory: str | Path,
+    path: str | Path,
+    workers: int = 1,
+) -> None:
+    """Import an ensemble directory into a SQLite database.
+
+    Every structure, labels and track file of the ensemble is parsed and
+    inserted in the database, along with the zoom levels of the tracks and the
+    metadata of the ensemble. The database is written to a temporary file
+    first and moved in place, so readers never see a partially written
+    database. It is opened with DatabaseSourceProvider.
+
+    Args:
+        data_directory: The directory of the ensemble.
+        path: The path of the database file to write.
+        workers: The number of processes parsing the timesteps in parallel.
+    """
+    path = Path(path)
+    ensemble = Ensemble(data_directory, "", workers=workers)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=path.parent, prefix=f".{path.name}.") as tmp:
+        tmp_path = Path(tmp) / path.name
+
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.executescript(_SCHEMA)
+
+            with connection:
+                _insert_ensemble(connection, ensemble)
+
+            connection.executescript(_INDEXES)
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+
+        tmp_path.replace(path)
+
+
+def _insert_ensemble(connection: sqlite3.Connection, ensemble: Ensemble) -> None:
+    meta = {
+        "format": DATABASE_FORMAT,
+        "version": DATABASE_VERSION,
+        "chromosomes": sorted(ensemble._chromosomes),
+        "meta": ensemble._meta,
+        "experiments_meta": ensemble._experiments_meta,
+        "experiments": {
+            _experiment_name: _experiment._meta
+            for _experiment_name, _experiment in ensemble._experiments.items()
+        },
+    }
+    connection.executemany(
+        "INSERT INTO meta (key, value) VALUES (?, ?)",
+        [(key, json.dumps(value, default=str)) for key, value in meta.items()],
+    )
+
+    for _experiment_name, _experiment in sorted(ensemble._experiments.items()):
+        for _timestep_name, _timestep in sorted(_experiment._timesteps.items()):
+            timestep_id = connection.execute(
+                "INSERT INTO timesteps (experiment, timestep, fingerprint) VALUES (?, ?, ?)",
+                (
+                    _experiment_name,
+                    _timestep_name,
+                    json.dumps(_timestep._fingerprint, sort_keys=True),
+                ),
+            ).lastrowid
+
+            connection.executemany(
+                "INSERT INTO chromosomes (timestep_id, chromosome) VALUES (?, ?)",
+                [(timestep_id, chromosome) for chromosome in _timestep.chromosomes],
+            )
+
+            structures = _timestep.get_structures()
+            position = structures.columns["position"]
+            _insert_table(
+                connection,
+                "structures",
+                {"timestep_id": timestep_id},
+                structures,
+                {
+                    "index": structures.columns["index"],
+                    "x": position[:, 0],
+                    "y": position[:, 1],
+                    "z": position[:, 2],
+                },
+            )
+
+            labels = _timestep.get_labels()
+            _insert_table(
+                connection,
+                "labels",
+                {"timestep_id": timestep_id},
+                labels,
+                labels.columns,
+            )
+
+            for kind in ("peak", "point"):
+                for _track_name in sorted(getattr(_timestep, f"{kind}_track_names")):
+                    _track = getattr(_timestep, f"get_{kind}_track")(_track_name)
+                    _pyramid = getattr(_timestep, f"get_{kind}_track_pyramid")(
+                        _track_name
+                    )
+                    _insert_track(
+                        connection, timestep_id, kind, _track_name, _track, _pyramid
+                    )
+
+
+def _insert_track(
+    connection: sqlite3.Connection,
+    timestep_id: int,
+    kind: str,
+    track_name: str,
+    track: ChromosomeTable,
+    pyramid,
+) -> None:
+    track_id = connection.execute(
+        "INSERT INTO tracks (timestep_id, kind, name) VALUES (?, ?, ?)",
+        (timestep_id, kind, track_name),
+    ).lastrowid
+
+    lengths = track.columns["end"] - track.columns["start"]
+    connection.executemany(
+        "INSERT INTO track_chromosomes (track_id, chromosome, max_length) VALUES (?, ?, ?)",
+        [
+            (track_id, chromosome, max(int(lengths[first:last].max(initial=0)), 0))
+            for chromosome, (first, last) in (
+                (chromosome, track.row_range(chromosome)) for chromosome in track
+            )
+        ],
+    )
+
+    _insert_table(
+        connection,
+        _TRACK_TABLES[kind],
+        {"track_id": track_id},
+        track,
+        {name: track.columns[name] for name in _TRACK_DTYPES[kind]},
+    )
+
+    for shift, level in pyramid.levels.items():
+        _insert_table(
+            connection,
+            "summaries",
+            {"track_id": track_id, "shift": shift},
+            level,
+            {name: level.columns[name] for name in SUMMARY_DTYPES},
+        )
+
+
+def _insert_table(
+    connection: sqlite3.Connection,
+    table_name: str,
+    keys: dict[str, int],
+    table: ChromosomeTable,
+    columns: dict[str, np.ndarray],
+) -> None:
+    """Insert the rows of a ChromosomeTable, numbered from 0 in each chromosome.
+
+    Args:
+        connection: The connection to the database.
+        table_name: The name of the SQL table.
+        keys: The values of the key columns preceding the chromosome, e.g. the
+            id of the track.
+        table: The ChromosomeTable.
+        columns: The columns to insert, indexed by SQL column name.
+    """
+    names = [*keys, "chromosome", "row", *columns]
+    statement = (
+        f"INSERT INTO {table_name} ({_quoted(names)}) "
+        f"VALUES ({', '.join('?' * len(names))})"
+    )
+    key_values = tuple(keys.values())
+
+    for chromosome in table:
+        first, last = table.row_range(chromosome)
+        connection.executemany(
+            statement,
+            (
+                (*key_values, chromosome, row, *values)
+                for row, values in enumerate(
+                    zip(
+                        *(column[first:last].tolist() for column in columns.values()),
+                        strict=True,
+                    )
+                )
+            ),
+        )
+
+
+def is_database(path: str | Path) -> bool:
+    """Whether a path is a database written by import_ensemble()."""
+    path = Path(path)
+    if not path.is_file():
+        return False
+
+    try:
+        with path.open("rb") as file:
+            if file.read(len(_SQLITE_MAGIC)) != _SQLITE_MAGIC:
+                return False
+
+        connection = _connect(path)
+        try:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'format'"
+            ).fetchone()
+        finally:
+            connection.close()
+    except (OSError, sqlite3.Error):
+        return False
+
+    return row is not None and json.loads(row[0]) == DATABASE_FORMAT
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(
+        f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+    )
+
+
+def _fetch_arrays(
+    cursor: sqlite3.Cursor, dtypes: dict[str, np.dtype | type]
+) -> dict[str, np.ndarray]:
+    """Fetch the rows of a query into one array per column, a batch of rows at a time.
+
+    The columns of the query must be in the order of the dtypes. NULL values,
+    which SQLite stores instead of NaN, are fetched as NaN.
+    """
+    batches: list[list[np.ndarray]] = []
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        if not rows:
+            break
+
+        columns = zip(*rows, strict=True)
+        batches.append(
+            [
+                np.array(column, dtype=dtype)
+                for column, dtype in zip(columns, dtypes.values(), strict=True)
+            ]
+        )
+
+    return {
+        name: np.concatenate([batch[i] for batch in batches])
+        if batches
+        else np.zeros(0, dtype=dtype)
+        for i, (name, dtype) in enumerate(dtypes.items())
+    }
+
+
+def _quoted(names: Iterable[str], alias: str | None = None) -> str:
+    """Join quoted column names, optionally qualified by a table alias."""
+    prefix = "" if alias is None else f"{alias}."
+
+    return ", ".join(f'{prefix}"{name}"' for name in names)
+
+
+class DatabaseSourceProvider(ArraySourceProvider):
+    def __init__(self, path: str | Path, display_options_path: str | Path = ""):
+        """Initializes the DatabaseSourceProvider with a database file.
+
+        Args:
+            path: The path of a database written by import_ensemble().
+            display_options_path: The path of a file that has overrides to the
+                appearance of the 3D visualization.
+
+        The catalogue of the ensemble is read at startup, while the structures,
+        tracks and labels are queried on each request, so that nothing else is
+        kept in memory. Each thread uses its own read-only connection.
+
+        Raises:
+            ValueError: If the file is not a database written by import_ensemble().
+        """
+        self.path = Path(path)
+        if not is_database(self.path):
+            msg = f"'{self.path}' is not a supported database file."
+            raise ValueError(msg)
+
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._generation = 0
+        self._index = CatalogueIndex()
+        self._timesteps: dict[tuple[str, str], tuple[int, str]] = {}
+        self._display_options = read_display_options(Path(display_options_path))
+
+        self._open()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The connection of the current thread, opened again if the file was replaced."""
+        with self._lock:
+            generation = self._generation
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.generation != generation:
+            if connection is not None:
+                connection.close()
+            connection = _connect(self.path)
+            self._local.connection = connection
+            self._local.generation = generation
+
+        return connection
+
+    def _query(self, statement: str, parameters: Iterable[Any] = ()) -> sqlite3.Cursor:
+        return self._connection().execute(statement, tuple(parameters))
+
+    def _open(self) -> dict[tuple[str, str], tuple[int, str]]:
+        """Read the catalogue of the database, replacing the previous one.
+
+        Returns:
+            The id and fingerprint of the previous timesteps.
+        """
+        with self._lock:
+            self._generation += 1
+            stat = self.path.stat()
+            self._stat = (stat.st_size, stat.st_mtime_ns)
+
+            version = self._query("SELECT value FROM meta WHERE key = 'version'")
+            if json.loads(version.fetchone()[0]) != DATABASE_VERSION:
+                msg = f"'{self.path}' is not a supported database file."
+                raise ValueError(msg)
+
+            timesteps = {
+                (experiment, timestep): (timestep_id, fingerprint)
+                for timestep_id, experiment, timestep, fingerprint in self._query(
+                    "SELECT id, experiment, timestep, fingerprint FROM timesteps"
+                )
+            }
+            chromosomes: dict[int, list[str]] = {}
+            for timestep_id, chromosome in self._query(
+                "SELECT timestep_id, chromosome FROM chromosomes"
+            ):
+                chromosomes.setdefault(timestep_id, []).append(chromosome)
+            tracks: dict[tuple[int, str], dict[str, list[str]]] = {}
+            for timestep_id, kind, name, chromosome in self._query(
+                "SELECT t.timestep_id, t.kind, t.name, c.chromosome FROM tracks AS t "
+                "LEFT JOIN track_chromosomes AS c ON c.track_id = t.id"
+            ):
+                track_chromosomes = tracks.setdefault((timestep_id, kind), {})
+                track_chromosomes.setdefault(name, [])
+                if chromosome is not None:
+                    track_chromosomes[name].append(chromosome)
+
+            previous_timesteps = self._timesteps
+            self._timesteps = timesteps
+            self._index = CatalogueIndex()
+
+            for (experiment, timestep), (timestep_id, _) in timesteps.items():
+                self._index.add(experiment, timestep, chromosomes.get(timestep_id, ()))
+                for kind in ("peak", "point"):
+                    self._index.set_tracks(
+                        experiment, timestep, kind, tracks.get((timestep_id, kind), {})
+                    )
+
+        return previous_timesteps
+
+    def refresh(self) -> EnsembleChanges:
+        """Open the database again if it was replaced, e.g. imported again.
+
+        Returns:
+            The (experiment, timestep) names of the added, modified and removed
+            timesteps, the modified ones being those whose files changed
+            between the two imports.
+        """
+        changes: EnsembleChanges = {"added": [], "modified": [], "removed": []}
+
+        with self._lock:
+            stat = self.path.stat()
+            if (stat.st_size, stat.st_mtime_ns) == self._stat:
+                return changes
+
+            previous_timesteps = self._open()
+
+            for key in sorted(previous_timesteps.keys() - self._timesteps.keys()):
+                changes["removed"].append(key)
+
+            for key, (_, fingerprint) in sorted(self._timesteps.items()):
+                previous_timestep = previous_timesteps.get(key)
+                if previous_timestep is None:
+                    changes["added"].append(key)
+                elif previous_timestep[1] != fingerprint:
+                    changes["modified"].append(key)
+
+        return changes
+
+    def _timestep_id(self, experiment: str, timestep: str) -> int:
+        with self._lock:
+            return self._timesteps[(experiment, timestep)][0]
+
+    def _track_id(self, experiment: str, timestep: str, kind: str, track: str) -> int:
+        row = self._query(
+            "SELECT id FROM tracks WHERE timestep_id = ? AND kind = ? AND name = ?",
+            (self._timestep_id(experiment, timestep), kind, track),
+        ).fetchone()
+        if row is None:
+            raise KeyError(track)
+
+        return row[0]
+
+    def _get_track_arrays(
+        self, chromosome: str, experiment: str, timestep: str, kind: str, track: str
+    ) -> dict[str, np.ndarray]:
+        dtypes = _TRACK_DTYPES[kind]
+        cursor = self._query(
+            f"SELECT {_quoted(dtypes)} FROM {_TRACK_TABLES[kind]} "
+            "WHERE track_id = ? AND chromosome = ? ORDER BY row",
+            (self._track_id(experiment, timestep, kind, track), chromosome),
+        )
+
+        return _fetch_arrays(cursor, dtypes)
+
+    def _get_track_count(
+        self, chromosome: str, experiment: str, timestep: str, kind: str, track: str
+    ) -> int:
+        (count,) = self._query(
+            f"SELECT count(*) FROM {_TRACK_TABLES[kind]} "
+            "WHERE track_id = ? AND chromosome = ?",
+            (self._track_id(experiment, timestep, kind, track), chromosome),
+        ).fetchone()
+
+        return count
+
+    def _get_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        kind: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> dict[str, np.ndarray]:
+        dtypes = _TRACK_DTYPES[kind]
+        cursor = self._query(
+            f"SELECT {_quoted(dtypes, alias='i')} "
+            f"FROM {_TRACK_TABLES[kind]} AS i "
+            "JOIN track_chromosomes AS c "
+            "ON c.track_id = i.track_id AND c.chromosome = i.chromosome "
+            "WHERE i.track_id = ? AND i.chromosome = ? "
+            'AND i.start < ? AND i.start > ? - c.max_length AND i."end" > ? '
+            "ORDER BY i.start, i.row",
+            (
+                self._track_id(experiment, timestep, kind, track),
+                chromosome,
+                end,
+                start,
+                start,
+            ),
+        )
+
+        return _fetch_arrays(cursor, dtypes)
+
+    def _get_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        kind: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        track_id = self._track_id(experiment, timestep, kind, track)
+        shifts = [
+            shift
+            for (shift,) in self._query(
+                "SELECT DISTINCT shift FROM summaries WHERE track_id = ? ORDER BY shift",
+                (track_id,),
+            )
+        ]
+
+        # the finest level with bins at least as large, as in TrackPyramid.level_for
+        shift = next((shift for shift in shifts if 1 << shift >= bin_size), None)
+        if shift is None and shifts:
+            shift = shifts[-1]
+
+        cursor = self._query(
+            f"SELECT {_quoted(SUMMARY_DTYPES)} FROM summaries "
+            "WHERE track_id = ? AND shift = ? AND chromosome = ? ORDER BY row",
+            (track_id, shift, chromosome),
+        )
+
+        return _fetch_arrays(cursor, SUMMARY_DTYPES)
+
+    def find_peaks(
+        self,
+        chromosome: str,
+        start: int,
+        end: int,
+        min_value: float | None = None,
+        experiment: str | None = None,
+        timestep: str | None = None,
+        track: str | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Find the peaks overlapping a genomic range across the whole ensemble.
+
+        Args:
+            chromosome: The chromosome name.
+            start: The first base pair of the range.
+            end: The base pair following the range.
+            min_value: If given, only the peaks with at least this value are kept.
+            experiment: If given, only the peaks of this experiment are kept.
+            timestep: If given, only the peaks of this timestep are kept.
+            track: If given, only the peaks of this track are kept.
+
+        Returns:
+            The columns of a PeakTrackArrays dictionary, along with the
+            'experiment', 'timestep' and 'track' of every peak, sorted by
+            experiment, timestep, track and start.
+        """
+        return self._find(
+            "peak", chromosome, start, end, min_value, experiment, timestep, track
+        )
+
+    def find_points(
+        self,
+        chromosome: str,
+        start: int,
+        end: int,
+        min_value: float | None = None,
+        experiment: str | None = None,
+        timestep: str | None = None,
+        track: str | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Find the points overlapping a genomic range across the whole ensemble.
+
+        See find_peaks().
+        """
+        return self._find(
+            "point", chromosome, start, end, min_value, experiment, timestep, track
+        )
+
+    def _find(
+        self,
+        kind: str,
+        chromosome: str,
+        start: int,
+        end: int,
+        min_value: float | None,
+        experiment: str | None,
+        timestep: str | None,
+        track: str | None,
+    ) -> dict[str, np.ndarray]:
+        dtypes: dict[str, np.dtype | type] = {
+            "experiment": np.str_,
+            "timestep": np.str_,
+            "track": np.str_,
+            **_TRACK_DTYPES[kind],
+        }
+
+        conditions = [
+            "t.kind = ?",
+            "c.chromosome = ?",
+            "i.start < ?",
+            "i.start > ? - c.max_length",
+            'i."end" > ?',
+        ]
+        parameters: list[Any] = [kind, chromosome, end, start, start]
+        for condition, value in (
+            ("i.value >= ?", min_value),
+            ("s.experiment = ?", experiment),
+            ("s.timestep = ?", timestep),
+            ("t.name = ?", track),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+
+        cursor = self._query(
+            f"SELECT s.experiment, s.timestep, t.name, {_quoted(_TRACK_DTYPES[kind], alias='i')} "
+            "FROM timesteps AS s "
+            "JOIN tracks AS t ON t.timestep_id = s.id "
+            "JOIN track_chromosomes AS c ON c.track_id = t.id "
+            f"JOIN {_TRACK_TABLES[kind]} AS i "
+            "ON i.track_id = c.track_id AND i.chromosome = c.chromosome "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY s.experiment, s.timestep, t.name, i.start, i.row",
+            parameters,
+        )
+
+        return _fetch_arrays(cursor, dtypes)
+
+    def prefetch(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Read the rows of a chromosome ahead of its display, one table at a time.
+
+        Nothing is kept in memory: the rows are only read so that their pages
+        are in the page caches of SQLite and of the operating system when the
+        chromosome is displayed.
+        """
+        with self._lock:
+            if chromosome not in self._index.get_chromosomes(experiment, timestep):
+                return True
+
+        timestep_id = self._timestep_id(experiment, timestep)
+        statements = [
+            "SELECT count(*) FROM structures WHERE timestep_id = ? AND chromosome = ?",
+            "SELECT count(*) FROM labels WHERE timestep_id = ? AND chromosome = ?",
+            *(
+                f"SELECT count(*), sum(i.value) FROM {table_name} AS i "
+                "JOIN tracks AS t ON t.id = i.track_id "
+                "WHERE t.timestep_id = ? AND i.chromosome = ?"
+                for table_name in _TRACK_TABLES.values()
+            ),
+        ]
+
+        for statement in statements:
+            if cancelled is not None and cancelled():
+                return False
+
+            self._query(statement, (timestep_id, chromosome)).fetchone()
+
+        return True
+
+    def get_chromosomes(
+        self,
+        experiment: str | None = None,
+        timestep: str | None = None,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_chromosomes(experiment, timestep)
+
+    def get_experiments(
+        self,
+        chromosome: str | None = None,
+        timestep: str | None = None,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_experiments(chromosome, timestep)
+
+    def get_timesteps(
+        self,
+        chromosome: str | None = None,
+        experiment: str | None = None,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_timesteps(chromosome, experiment)
+
+    def get_peak_tracks(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_tracks(chromosome, experiment, timestep, "peak")
+
+    def get_point_tracks(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> set[str]:
+        with self._lock:
+            return self._index.get_tracks(chromosome, experiment, timestep, "point")
+
+    def get_structure_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> StructureArrays:
+        cursor = self._query(
+            f"SELECT {_quoted(_STRUCTURE_DTYPES)} FROM structures "
+            "WHERE timestep_id = ? AND chromosome = ? ORDER BY row",
+            (self._timestep_id(experiment, timestep), chromosome),
+        )
+        columns = _fetch_arrays(cursor, _STRUCTURE_DTYPES)
+
+        return {
+            "index": columns["index"],
+            "position": np.column_stack((columns["x"], columns["y"], columns["z"])),
+        }
+
+    def get_peak_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PeakTrackArrays:
+        return self._get_track_arrays(chromosome, experiment, timestep, "peak", track)
+
+    def get_point_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PointTrackArrays:
+        return self._get_track_arrays(chromosome, experiment, timestep, "point", track)
+
+    def get_peak_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        return self._get_track_count(chromosome, experiment, timestep, "peak", track)
+
+    def get_point_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        return self._get_track_count(chromosome, experiment, timestep, "point", track)
+
+    def get_peak_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PeakTrackArrays:
+        return self._get_track_range(
+            chromosome, experiment, timestep, "peak", track, start, end
+        )
+
+    def get_point_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PointTrackArrays:
+        return self._get_track_range(
+            chromosome, experiment, timestep, "point", track, start, end
+        )
+
+    def get_peak_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        return self._get_track_summary(
+            chromosome, experiment, timestep, "peak", track, bin_size
+        )
+
+    def get_point_track_summary(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        return self._get_track_summary(
+            chromosome, experiment, timestep, "point", track, bin_size
+        )
+
+    def get_labels(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ):
+        cursor = self._query(
+            'SELECT "index", text FROM labels '
+            "WHERE timestep_id = ? AND chromosome = ? ORDER BY row",
+            (self._timestep_id(experiment, timestep), chromosome),
+        )
+
+        return label_points(_fetch_arrays(cursor, LABELS_DTYPES))
+
+    def get_display_options(self, display_type: str):
+        return self._display_options.get(display_type, {})
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from itertools import pairwise
+
+import numpy as np
+
+from episcope.library.io.columnar import ChromosomeTable
+
+
+class IntervalIndex:
+    """An index of the intervals of a track, for overlap queries by genomic range.
+
+    For each chromosome, the intervals are sorted by start, and the maximum end
+    of all the intervals up to each position is stored. The intervals
+    overlapping a range are then all found between two binary searches: the
+    first interval whose running maximum end is past the start of the range,
+    and the first interval starting after the end of the range.
+
+    Tracks are usually already sorted by start, in which case the columns of
+    the table are used as they are and only the running maximum is stored.
+
+    Attributes:
+        table: The indexed track.
+    """
+
+    def __init__(self, table: ChromosomeTable) -> None:
+        self.table = table
+
+        starts = table.columns["start"]
+        ends = table.columns["end"]
+        offsets = table.offsets
+
+        order: np.ndarray | None = None
+        is_increasing = starts[1:] >= starts[:-1]
+        # the first row of a chromosome does not need to follow the previous row
+        is_increasing[offsets[1:-1] - 1] = True
+        if not is_increasing.all():
+            # sort by start within each chromosome
+            chromosome_ids = np.repeat(np.arange(len(table)), np.diff(offsets))
+            order = np.lexsort((starts, chromosome_ids))
+            starts = starts[order]
+            ends = ends[order]
+
+        max_ends = np.empty(len(ends), dtype=ends.dtype)
+        for first, last in pairwise(offsets):
+            np.maximum.accumulate(ends[first:last], out=max_ends[first:last])
+
+        self._order = order
+        self._starts = starts
+        self._ends = ends
+        self._max_ends = max_ends
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes held by the index, besides the columns of the table."""
+        if self._order is None:
+            return self._max_ends.nbytes
+
+        return (
+            self._order.nbytes
+            + self._starts.nbytes
+            + self._ends.nbytes
+            + self._max_ends.nbytes
+        )
+
+    def query(self, chromosome: str, start: int, end: int) -> np.ndarray:
+        """Find the intervals of a chromosome overlapping the range [start, end).
+
+        Intervals are half-open, as in BED files: an interval overlaps the range
+        if it starts before the end of the range and ends after its start.
+
+        Args:
+            chromosome: The chromosome name.
+            start: The first base pair of the range.
+            end: The base pair following the range.
+
+        Returns:
+            The indices of the overlapping rows in the chromosome, sorted by start.
+        """
+        if chromosome not in self.table:
+            return np.zeros(0, dtype=np.int64)
+
+        first_row, last_row = self.table.row_range(chromosome)
+
+        first = first_row + int(
+            np.searchsorted(self._max_ends[first_row:last_row], start, side="right")
+        )
+        last = first_row + int(
+            np.searchsorted(self._starts[first_row:last_row], end, side="left")
+        )
+
+        if last <= first:
+            return np.zeros(0, dtype=np.int64)
+
+        rows = first + np.flatnonzero(self._ends[first:last] > start)
+
+        if self._order is not None:
+            rows = self._order[rows]
+
+        return rows - first_row
+
+    def select(self, chromosome: str, start: int, end: int) -> dict[str, np.ndarray]:
+        """Get the columns of the intervals of a chromosome overlapping [start, end).
+
+        Returns:
+            The overlapping rows of every column of the track, sorted by start.
+        """
+        rows = self.query(chromosome, start, end)
+
+        if chromosome not in self.table:
+            return {name: column[:0] for name, column in self.table.columns.items()}
+
+        return {name: column[rows] for name, column in self.table[chromosome].items()}
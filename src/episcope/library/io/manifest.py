@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import warnings
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypedDict
+
+import numpy as np
+
+from episcope.library.io.columnar import ChromosomeTable
+from episcope.library.io.parser import map_file, scan_chromosome_blocks
+
+# Name of the manifest file written in each timestep directory.
+MANIFEST_NAME = "episcope-index.json"
+
+# Bump whenever the content of the manifest changes.
+MANIFEST_VERSION = 1
+
+# Files split in more runs of lines per chromosome than this are considered
+# unsorted, and are not indexed.
+MAX_BLOCKS_PER_CHROMOSOME = 4
+
+
+class ChromosomeEntry(TypedDict):
+    """The location and summary of the lines of a chromosome in a file.
+
+    Attributes:
+        blocks: The [offset, length] byte ranges of the lines, in file order.
+        rows: The number of rows of the chromosome.
+        ranges: The [min, max] of every numeric column, indexed by column name.
+    """
+
+    blocks: list[list[int]]
+    rows: int
+    ranges: dict[str, list[float | None]]
+
+
+class FileEntry(TypedDict):
+    """The index of a file, along with its size and modification time when indexed."""
+
+    size: int
+    mtime_ns: int
+    chromosomes: dict[str, ChromosomeEntry]
+
+
+def index_file(
+    path: Path,
+    read: Callable[[frozenset[str]], ChromosomeTable],
+    delimiter: str,
+    skip_header: bool = False,
+    quotechar: str | None = None,
+) -> FileEntry | None:
+    """Index the lines of each chromosome of a file, sorted by chromosome.
+
+    Args:
+        path: The path of the file.
+        read: A function parsing the rows of the given chromosomes of the file,
+            used to count the rows and find the range of the columns of each
+            chromosome.
+        delimiter: The character separating the fields of a line.
+        skip_header: If True, the first line of the file is not indexed.
+        quotechar: The character quoting the chromosome names, if any.
+
+    Returns:
+        The FileEntry of the file, or None if its lines are not sorted by chromosome.
+    """
+    stat = path.stat()
+    blocks = scan_chromosome_blocks(path, delimiter, skip_header)
+
+    chromosomes: dict[str, ChromosomeEntry] = {}
+    for name, offset, length in blocks:
+        chromosome = name.strip(quotechar) if quotechar else name
+        entry = chromosomes.setdefault(
+            chromosome, {"blocks": [], "rows": 0, "ranges": {}}
+        )
+        entry["blocks"].append([offset, length])
+
+    if len(blocks) > MAX_BLOCKS_PER_CHROMOSOME * max(len(chromosomes), 1):
+        return None
+
+    table = read(frozenset(chromosomes))
+    for chromosome, entry in chromosomes.items():
+        if chromosome not in table:
+            continue
+
+        columns = table[chromosome]
+        entry["rows"] = len(next(iter(columns.values())))
+        entry["ranges"] = {
+            name: _range(column)
+            for name, column in columns.items()
+            if column.ndim == 1 and np.issubdtype(column.dtype, np.number)
+        }
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "chromosomes": chromosomes,
+    }
+
+
+def _range(column: np.ndarray) -> list[float | None]:
+    finite = column[np.isfinite(column)] if column.dtype.kind == "f" else column
+    if len(finite) == 0:
+        return [None, None]
+
+    return [finite.min().item(), finite.max().item()]
+
+
+class Manifest:
+    """The index of the files of a timestep directory, stored in MANIFEST_NAME.
+
+    For every indexed file, the manifest holds the byte ranges of the lines of
+    each chromosome, so that the lines of some chromosomes can be read without
+    scanning the rest of the file. An entry is only used while the size and
+    modification time of the file match the ones it was indexed with: otherwise
+    the file is read in full.
+
+    Attributes:
+        directory: The timestep directory.
+        files: The entries of the indexed files, indexed by file name.
+    """
+
+    def __init__(self, directory: str | Path, files: dict[str, FileEntry]) -> None:
+        self.directory = Path(directory)
+        self.files = files
+        self._stale: set[str] = set()
+
+    @classmethod
+    def load(cls, directory: str | Path) -> Manifest | None:
+        """Read the manifest of a directory.
+
+        Returns:
+            The Manifest, or None if the directory has no valid manifest.
+        """
+        path = Path(directory) / MANIFEST_NAME
+        if not path.is_file():
+            return None
+
+        try:
+            content = json.loads(path.read_text())
+        except (OSError, ValueError):
+            msg = f"Invalid index '{path}', the files are read in full."
+            warnings.warn(msg, RuntimeWarning, stacklevel=2)
+            return None
+
+        if content.get("version") != MANIFEST_VERSION:
+            return None
+
+        return cls(directory, content["files"])
+
+    def write(self) -> None:
+        """Write the manifest in its directory, replacing any previous one."""
+        path = self.directory / MANIFEST_NAME
+        content = json.dumps({"version": MANIFEST_VERSION, "files": self.files})
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(content)
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def get(self, path: Path) -> FileEntry | None:
+        """Get the entry of a file, if it is indexed and did not change since.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            The FileEntry, or None if the file is not indexed or is stale.
+        """
+        entry = self.files.get(path.name)
+        if entry is None:
+            return None
+
+        stat = path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+            if path.name not in self._stale:
+                self._stale.add(path.name)
+                msg = f"The index of '{path}' is out of date, the file is read in full."
+                warnings.warn(msg, RuntimeWarning, stacklevel=2)
+            return None
+
+        return entry
+
+    def chromosomes(self, path: Path) -> set[str] | None:
+        """The chromosomes of an indexed file, or None if it is not indexed or stale."""
+        entry = self.get(path)
+        if entry is None:
+            return None
+
+        return set(entry["chromosomes"])
+
+    def read(
+        self, path: Path, chromosomes: set[str] | frozenset[str]
+    ) -> list[memoryview] | None:
+        """Read the lines of some chromosomes of an indexed file, seeking to each of them.
+
+        Args:
+            path: The path of the file.
+            chromosomes: The chromosomes to read.
+
+        Returns:
+            The lines of each run of the chromosomes, in file order, as views
+            into the memory-mapped file, or None if the file is not indexed or
+            is stale.
+        """
+        entry = self.get(path)
+        if entry is None:
+            return None
+
+        blocks = sorted(
+            (offset, length)
+            for chromosome, chromosome_entry in entry["chromosomes"].items()
+            if chromosome in chromosomes
+            for offset, length in chromosome_entry["blocks"]
+        )
+
+        content = map_file(path)
+        parts = []
+        for offset, length in blocks:
+            part = content[offset : offset + length]
+            parts.append(part)
+            if part[-1:] != b"\n":
+                parts.append(memoryview(b"\n"))
+
+        return parts
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Protocol
+
+
+class Unloadable(Protocol):
+    """An object holding data that can be released and loaded again on demand."""
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of data currently loaded."""
+        ...
+
+    def unload(self) -> None:
+        """Release the loaded data."""
+        ...
+
+
+class MemoryCache:
+    """Keeps the data loaded by a set of objects under a memory budget.
+
+    The objects are kept in least recently used order. Every time one of them is
+    used, the size of the data loaded by all of them is measured, and the least
+    recently used ones are unloaded until the total fits in the budget. The
+    object being used is never unloaded. Since using an object usually makes it
+    load more data, evict() should be called again once it has been loaded.
+
+    A use is a hit if the object had some data loaded, and a miss otherwise.
+
+    Attributes:
+        max_bytes: The memory budget in bytes, or None for no limit.
+        hits: The number of uses of objects with loaded data.
+        misses: The number of uses of objects without loaded data.
+        evictions: The number of times an object was unloaded to fit the budget.
+    """
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Unloadable] = OrderedDict()
+
+    def add(self, key: Hashable, entry: Unloadable) -> None:
+        """Start tracking an object, as the least recently used one."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key, last=False)
+
+    def remove(self, key: Hashable) -> None:
+        """Stop tracking an object, if tracked."""
+        self._entries.pop(key, None)
+
+    def use(self, key: Hashable, entry: Unloadable) -> None:
+        """Mark an object as the most recently used, then enforce the budget.
+
+        Args:
+            key: The key of the object.
+            entry: The object, which starts being tracked if it was not.
+        """
+        if entry.nbytes > 0:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        self.evict(keep=key)
+
+    def evict(self, keep: Hashable | None = None) -> None:
+        """Unload the least recently used objects until the loaded data fits the budget.
+
+        Args:
+            keep: The key of an object that must not be unloaded.
+        """
+        if self.max_bytes is None:
+            return
+
+        sizes = {key: entry.nbytes for key, entry in self._entries.items()}
+        total = sum(sizes.values())
+
+        for key, entry in self._entries.items():
+            if total <= self.max_bytes:
+                break
+
+            if key == keep or sizes[key] == 0:
+                continue
+
+            entry.unload()
+            total -= sizes[key]
+            self.evictions += 1
+
+    def unload(self, key: Hashable) -> None:
+        """Unload a tracked object to fit the budget, whatever its place in the order.
+
+        Args:
+            key: The key of the object.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.nbytes > 0:
+            entry.unload()
+            self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of data loaded by all the tracked objects."""
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the loaded data has reached the budget."""
+        return self.max_bytes is not None and self.nbytes >= self.max_bytes
+
+    @property
+    def is_over_budget(self) -> bool:
+        """Whether the loaded data exceeds the budget."""
+        return self.max_bytes is not None and self.nbytes > self.max_bytes
+
+    def stats(self) -> dict[str, int | None]:
+        """The counters of the cache, along with its current size and budget."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
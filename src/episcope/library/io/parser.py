@@ -0,0 +1,721 @@
+from __future__ import annotations
+
+import io
+import mmap
+from collections.abc import Collection, Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from episcope.library.io.columnar import ChromosomeTable
+
+# Initial width of the fixed size byte strings used to parse chromosome names.
+# The file is parsed again with a wider field if a name could have been truncated.
+CHROMOSOME_WIDTH = 16
+
+# Width of the byte strings used for numeric columns that may contain invalid values.
+TEXT_WIDTH = 64
+
+# Size of the blocks in which a file is scanned when selecting the lines of some
+# chromosomes.
+SCAN_BLOCK_SIZE = 16 * 1024**2
+
+# The number of lines sampled from a file to estimate the fraction of its lines
+# that belong to some chromosomes.
+SELECT_SAMPLES = 64
+
+# The file is only scanned for the lines of some chromosomes when less than this
+# fraction of the sampled lines belong to them. Otherwise every line is parsed,
+# which NumPy does faster straight from the file, and the rows of the other
+# chromosomes are dropped.
+SELECT_MAX_FRACTION = 0.5
+
+# The selected lines of a block are copied together, rather than returned as
+# views of each run, when they are split in more runs than this.
+SELECT_MAX_RUNS = 1024
+
+# The content of a file to parse: its path, its content, or the parts of its
+# content (e.g. views into the memory-mapped file) to be parsed one after the
+# other.
+Source = Path | bytes | Sequence[memoryview]
+
+
+class ColumnSpec:
+    """Describes a column to be extracted from a delimited file.
+
+    Attributes:
+        index: The position of the column in each row.
+        dtype: The dtype of the parsed column.
+        skip_invalid: If True, rows where this column is not a valid number are
+            skipped instead of raising an error.
+    """
+
+    def __init__(self, index: int, dtype: type, skip_invalid: bool = False) -> None:
+        self.index = index
+        self.dtype = np.dtype(dtype)
+        self.skip_invalid = skip_invalid
+
+
+def read_table(
+    source: Source,
+    delimiter: str,
+    n_columns: int,
+    chromosome_column: int,
+    columns: dict[str, ColumnSpec],
+    skip_header: bool = False,
+    quotechar: str | None = None,
+    chromosomes: Collection[str] | None = None,
+) -> ChromosomeTable:
+    """Parse a delimited genomic file into a ChromosomeTable in bulk.
+
+    The whole file is converted by NumPy's C parser in a single pass, keeping
+    only the requested columns. If integer columns are written in floating point
+    notation, they are parsed as floating point and truncated, which matches
+    ``int(float(value))``. Rows are then grouped by
+    chromosome using the boundaries between runs of equal chromosome names, so
+    files that are already sorted by chromosome are never reordered.
+
+    Args:
+        source: The path of the file to parse, or its content, possibly in parts.
+        delimiter: The character separating the fields of a row.
+        n_columns: The number of fields expected in every row.
+        chromosome_column: The position of the chromosome name in each row.
+        columns: The columns to extract, indexed by name.
+        skip_header: If True, the first line of the file is ignored.
+        quotechar: The character used to quote fields, if any.
+        chromosomes: If given, only the rows of these chromosomes are kept. When
+            the chromosome is the first unquoted field and a sample of the lines
+            shows that most of the file belongs to other chromosomes, the file
+            is memory-mapped and only the lines of these chromosomes are parsed,
+            straight from the mapping, so the memory used grows with the rows
+            kept rather than with the size of the file.
+
+    Returns:
+        A ChromosomeTable with one array per requested column.
+
+    Raises:
+        ValueError: If a row has fewer than n_columns fields, or if a value
+            cannot be converted.
+    """
+    allowed: set[bytes] | None = None
+
+    if chromosomes is not None:
+        if (
+            isinstance(source, Path)
+            and chromosome_column == 0
+            and quotechar is None
+            and _selected_fraction(source, delimiter, chromosomes, skip_header)
+            < SELECT_MAX_FRACTION
+        ):
+            source = _select_lines(source, delimiter, chromosomes, skip_header)
+            skip_header = False
+        else:
+            allowed = {chromosome.encode() for chromosome in chromosomes}
+
+    if _is_empty(source, skip_header):
+        return _empty_table(columns)
+
+    width = CHROMOSOME_WIDTH
+    while True:
+        rows = _load_rows(
+            source,
+            delimiter,
+            n_columns,
+            chromosome_column,
+            columns,
+            width,
+            skip_header,
+            quotechar,
+        )
+        if len(rows) == 0 or int(np.char.str_len(rows["_chromosome"]).max()) < width:
+            break
+        width *= 4
+
+    return _group_rows(rows, columns, allowed)
+
+
+def map_file(path: Path) -> memoryview:
+    """Memory-map a file for reading.
+
+    The mapping stays open as long as the returned view, or a slice of it, is
+    referenced.
+    """
+    with path.open("rb") as file:
+        if path.stat().st_size == 0:
+            return memoryview(b"")
+
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _line_ranges(content: memoryview, start: int) -> Iterator[tuple[int, int]]:
+    """Split content[start:] in ranges of whole lines of about SCAN_BLOCK_SIZE.
+
+    Every range ends after a newline, except the last one if the last line of
+    the content has none.
+
+    Yields:
+        The start and end of each range in the content.
+    """
+    size = len(content)
+
+    while start < size:
+        end = min(start + SCAN_BLOCK_SIZE, size)
+        if end < size:
+            # leave the partial last line for the next range
+            last_newline = content.obj.rfind(b"\n", start, end)
+            if last_newline < 0:
+                last_newline = content.obj.find(b"\n", end)
+            end = size if last_newline < 0 else last_newline + 1
+
+        yield start, end
+        start = end
+
+
+def _line_blocks(content: memoryview, start: int) -> Iterator[tuple[int, bytes]]:
+    """Split content[start:] in blocks of whole lines of about SCAN_BLOCK_SIZE.
+
+    Every block ends with a newline, which is added to the last line of the
+    content if it has none.
+
+    Yields:
+        The offset of each block in the content, and a copy of the block.
+    """
+    for block_start, block_end in _line_ranges(content, start):
+        block = content[block_start:block_end].tobytes()
+        if not block.endswith(b"\n"):
+            block += b"\n"
+
+        yield block_start, block
+
+
+def _selected_fraction(
+    path: Path, delimiter: str, chromosomes: Collection[str], skip_header: bool
+) -> float:
+    """Estimate the fraction of the lines of a file whose first field is one of the chromosomes.
+
+    Only the lines following SELECT_SAMPLES evenly spaced offsets of the
+    memory-mapped file are read.
+    """
+    prefixes = {f"{chromosome}{delimiter}".encode() for chromosome in chromosomes}
+    if not prefixes:
+        return 0.0
+
+    content = map_file(path)
+    start = _header_end(content) if skip_header else 0
+    size = len(content)
+    if start >= size:
+        return 1.0
+
+    width = max(len(prefix) for prefix in prefixes)
+    encoded_delimiter = delimiter.encode()
+    n_selected = n_sampled = 0
+
+    for offset in np.linspace(start, size, SELECT_SAMPLES, endpoint=False):
+        line_start = int(offset)
+        if line_start > start:
+            line_start = content.obj.find(b"\n", line_start - 1) + 1
+            if line_start <= 0 or line_start >= size:
+                continue
+
+        head = content[line_start : line_start + width].tobytes()
+        end_of_name = head.find(encoded_delimiter)
+        n_sampled += 1
+        if end_of_name >= 0 and head[: end_of_name + 1] in prefixes:
+            n_selected += 1
+
+    return n_selected / n_sampled
+
+
+def _select_lines(
+    path: Path, delimiter: str, chromosomes: Collection[str], skip_header: bool
+) -> list[memoryview]:
+    """Select the lines of a file whose first field is one of the given chromosomes.
+
+    The memory-mapped file is scanned in blocks of whole lines, without copying
+    them, and the first bytes of all the lines of a block are compared with the
+    chromosomes at once. The runs of selected lines are returned as views into
+    the mapping, so the lines of the other chromosomes are never converted. The
+    selected lines of a block are only copied when they are scattered in more
+    than SELECT_MAX_RUNS runs, as in files that are not sorted by chromosome.
+
+    Returns:
+        The runs of selected lines, in file order. The last run may end with a
+        line without a newline, at the end of the file.
+    """
+    prefixes = {f"{chromosome}{delimiter}".encode() for chromosome in chromosomes}
+    if not prefixes:
+        return []
+
+    content = map_file(path)
+    start = _header_end(content) if skip_header else 0
+    matcher = _PrefixMatcher(prefixes, delimiter.encode())
+
+    parts: list[memoryview] = []
+    # the run of selected lines that may continue in the next block
+    run: tuple[int, int] | None = None
+
+    for range_start, range_end in _line_ranges(content, start):
+        block = np.frombuffer(
+            content, dtype=np.uint8, count=range_end - range_start, offset=range_start
+        )
+        line_ends, keep = matcher.select(block)
+        edges = np.flatnonzero(np.diff(keep.astype(np.int8), prepend=0, append=0))
+
+        if len(edges) > 2 * SELECT_MAX_RUNS:
+            if run is not None:
+                parts.append(content[run[0] : run[1]])
+                run = None
+            # copying the scattered lines at once is faster than slicing each run
+            line_lengths = np.diff(line_ends, prepend=0)
+            parts.append(memoryview(block[np.repeat(keep, line_lengths)]))
+            continue
+
+        line_starts = np.concatenate(([0], line_ends[:-1])) + range_start
+        for run_start, run_end in zip(
+            line_starts[edges[0::2]].tolist(),
+            (line_ends[edges[1::2] - 1] + range_start).tolist(),
+            strict=True,
+        ):
+            if run is not None and run[1] == run_start:
+                run = (run[0], run_end)
+                continue
+            if run is not None:
+                parts.append(content[run[0] : run[1]])
+            run = (run_start, run_end)
+
+    if run is not None:
+        parts.append(content[run[0] : run[1]])
+
+    return parts
+
+
+def _header_end(content: memoryview) -> int:
+    if len(content) == 0:
+        return 0
+
+    end = content.obj.find(b"\n")
+
+    return len(content) if end < 0 else end + 1
+
+
+def _find_runs(
+    block: bytes, end: int, delimiter: bytes
+) -> tuple[list[tuple[int, int, bytes]], int]:
+    """Find the runs of lines of the same chromosome in block[:end], made of whole lines.
+
+    Files are usually sorted by chromosome, so a block mostly holds a few runs of
+    lines of the same chromosome. Starting from the end of the block, each run is
+    found from the chromosome of its last line, and checked by counting the
+    lines starting with that chromosome.
+
+    Returns:
+        The (start, end, prefix) of the runs in block order, where the prefix is
+        the chromosome name followed by the delimiter, and the end of the lines
+        before the first run, which could not be split in runs this way.
+    """
+    runs: list[tuple[int, int, bytes]] = []
+
+    while end > 0:
+        last_line = block.rfind(b"\n", 0, end - 1) + 1
+        end_of_name = block.find(delimiter, last_line, end - 1)
+        if end_of_name < 0:
+            break
+
+        prefix = block[last_line : end_of_name + len(delimiter)]
+        if block.startswith(prefix):
+            start = 0
+        else:
+            start = block.find(b"\n" + prefix, 0, end) + 1
+
+        if (
+            not block.startswith(prefix, start)
+            or block.count(b"\n" + prefix, start, end)
+            != block.count(b"\n", start, end) - 1
+        ):
+            break
+
+        runs.append((start, end, prefix))
+        end = start
+
+    runs.reverse()
+
+    return runs, end
+
+
+def scan_chromosome_blocks(
+    path: Path, delimiter: str, skip_header: bool = False
+) -> list[tuple[str, int, int]]:
+    """Find the byte ranges of the runs of lines of the same chromosome in a file.
+
+    The chromosome name must be the first field of every line. Lines without a
+    delimiter (e.g. empty lines) are not part of any run.
+
+    Args:
+        path: The path of the file.
+        delimiter: The character separating the fields of a line.
+        skip_header: If True, the first line of the file is not part of any run.
+
+    Returns:
+        The (chromosome, offset, length) of every run, in file order. A file
+        sorted by chromosome has a single run per chromosome.
+    """
+    encoded_delimiter = delimiter.encode()
+    blocks: list[tuple[str, int, int]] = []
+
+    def add(prefix: bytes, start: int, end: int) -> None:
+        name = prefix[: -len(encoded_delimiter)].decode()
+        # the last block gets a newline if the file does not end with one
+        end = min(end, len(content))
+        if blocks and blocks[-1][0] == name and sum(blocks[-1][1:]) == start:
+            blocks[-1] = (name, blocks[-1][1], end - blocks[-1][1])
+        else:
+            blocks.append((name, start, end - start))
+
+    content = map_file(path)
+    start = _header_end(content) if skip_header else 0
+
+    for offset, block in _line_blocks(content, start):
+        runs, mixed_end = _find_runs(block, len(block), encoded_delimiter)
+
+        line_start = 0
+        for line in block[:mixed_end].splitlines(keepends=True):
+            end_of_name = line.find(encoded_delimiter)
+            if end_of_name >= 0:
+                add(
+                    line[: end_of_name + len(encoded_delimiter)],
+                    offset + line_start,
+                    offset + line_start + len(line),
+                )
+            line_start += len(line)
+
+        for run_start, run_end, prefix in runs:
+            add(prefix, offset + run_start, offset + run_end)
+
+    return blocks
+
+
+class _StringSet:
+    """A set of byte strings of the same width, in which many strings are looked up at once.
+
+    The strings are packed in 64-bit words and hashed, then looked up among the
+    hashes of the set with a binary search, and the candidates are compared word
+    by word. This is much faster than np.isin, which sorts the byte strings.
+    """
+
+    def __init__(self, strings: np.ndarray) -> None:
+        """Build the set.
+
+        Args:
+            strings: The strings of the set, as the rows of a 2D uint8 array
+                whose width is a multiple of 8.
+        """
+        words = np.ascontiguousarray(strings).view(np.uint64)
+        hashes = _hash_words(words)
+        order = np.argsort(hashes)
+        self._hashes = hashes[order]
+        self._words = words[order]
+
+    @classmethod
+    def from_bytes(cls, strings: Collection[bytes], width: int) -> _StringSet:
+        """Build the set of the strings shorter than width, padded with zeros."""
+        rows = np.zeros((len(strings), width), dtype=np.uint8)
+        for row, string in zip(rows, sorted(strings), strict=True):
+            if len(string) < width:
+                row[: len(string)] = np.frombuffer(string, dtype=np.uint8)
+
+        return cls(rows)
+
+    def contains(self, strings: np.ndarray) -> np.ndarray:
+        """Whether each row of a 2D uint8 array, as wide as the set, is in the set."""
+        words = np.ascontiguousarray(strings).view(np.uint64)
+        hashes = _hash_words(words)
+        if len(self._hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+
+        position = np.searchsorted(self._hashes, hashes)
+        position[position == len(self._hashes)] = 0
+        found = self._hashes[position] == hashes
+        found[found] = (self._words[position[found]] == words[found]).all(axis=1)
+
+        return found
+
+
+class _PrefixMatcher:
+    """Selects the lines of a block starting with one of a set of prefixes.
+
+    Each prefix is a chromosome name followed by the delimiter. The first bytes
+    of every line, up to the first delimiter, are looked up among the prefixes.
+    """
+
+    def __init__(self, prefixes: Collection[bytes], delimiter: bytes) -> None:
+        self.delimiter = delimiter[0]
+        self.width = _aligned_to_words(max(len(prefix) for prefix in prefixes) + 1)
+        self._prefixes = _StringSet.from_bytes(prefixes, self.width)
+
+    def select(self, block: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Select the lines of a block of whole lines.
+
+        Returns:
+            The end of every line of the block, and whether it is selected.
+        """
+        line_ends = np.flatnonzero(block == ord("\n")) + 1
+        if len(line_ends) == 0 or line_ends[-1] != len(block):
+            # the last line of the file has no newline
+            line_ends = np.append(line_ends, len(block))
+        line_starts = np.concatenate(([0], line_ends[:-1]))
+
+        # the first bytes of every line, cut after the first delimiter; the
+        # bytes past the end of a short line cannot match a prefix, which has
+        # no newline
+        offsets = np.minimum(
+            line_starts[:, None] + np.arange(self.width), len(block) - 1
+        )
+        heads = block[offsets]
+        is_delimiter = heads == self.delimiter
+        first_delimiter = np.where(
+            is_delimiter.any(axis=1), is_delimiter.argmax(axis=1), self.width
+        )
+        heads[np.arange(self.width) > first_delimiter[:, None]] = 0
+
+        return line_ends, self._prefixes.contains(heads)
+
+
+def _aligned_to_words(width: int) -> int:
+    return (width + 7) // 8 * 8
+
+
+def _hash_words(words: np.ndarray) -> np.ndarray:
+    """Combine the 64-bit words of each row into a single hash."""
+    hashes = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        hashes *= np.uint64(0x9E3779B97F4A7C15)
+        hashes ^= words[:, column]
+
+    return hashes
+
+
+def _is_empty(source: Source, skip_header: bool) -> bool:
+    with _open(source) as file:
+        if skip_header:
+            file.readline()
+
+        return all(not line.strip() for line in file)
+
+
+def _open(source: Source):
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+
+    if isinstance(source, Path):
+        return source.open("rb")
+
+    return io.BufferedReader(_PartsReader(source))
+
+
+class _PartsReader(io.RawIOBase):
+    """Reads the parts of the content of a file one after the other, without joining them."""
+
+    def __init__(self, parts: Sequence[memoryview]) -> None:
+        self._parts = iter(parts)
+        self._part = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # fill the buffer from as many parts as needed, since the selected lines
+        # of an unsorted file are many small parts
+        filled = 0
+        while filled < len(buffer):
+            if len(self._part) == 0:
+                part = next(self._parts, None)
+                if part is None:
+                    break
+                self._part = part
+
+            size = min(len(buffer) - filled, len(self._part))
+            buffer[filled : filled + size] = self._part[:size]
+            self._part = self._part[size:]
+            filled += size
+
+        return filled
+
+
+def _load_rows(
+    source: Source,
+    delimiter: str,
+    n_columns: int,
+    chromosome_column: int,
+    columns: dict[str, ColumnSpec],
+    chromosome_width: int,
+    skip_header: bool,
+    quotechar: str | None,
+) -> np.ndarray:
+    try:
+        return _load_rows_as(
+            source,
+            delimiter,
+            n_columns,
+            chromosome_column,
+            columns,
+            chromosome_width,
+            skip_header,
+            quotechar,
+            integers_as_floats=False,
+        )
+    except ValueError:
+        # Integer columns may be written in floating point notation (e.g. '1.0').
+        return _load_rows_as(
+            source,
+            delimiter,
+            n_columns,
+            chromosome_column,
+            columns,
+            chromosome_width,
+            skip_header,
+            quotechar,
+            integers_as_floats=True,
+        )
+
+
+def _load_rows_as(
+    source: Source,
+    delimiter: str,
+    n_columns: int,
+    chromosome_column: int,
+    columns: dict[str, ColumnSpec],
+    chromosome_width: int,
+    skip_header: bool,
+    quotechar: str | None,
+    integers_as_floats: bool,
+) -> np.ndarray:
+    fields: list[tuple[str, str]] = [("_chromosome", f"S{chromosome_width}")]
+    usecols = [chromosome_column]
+
+    for name, spec in columns.items():
+        if spec.skip_invalid:
+            fields.append((name, f"S{TEXT_WIDTH}"))
+        elif spec.dtype.kind in "iu" and integers_as_floats:
+            fields.append((name, "f8"))
+        else:
+            fields.append((name, spec.dtype.str))
+        usecols.append(spec.index)
+
+    if n_columns - 1 not in usecols:
+        # Also read the last column, so that rows that are too short are rejected.
+        fields.append(("_last", "S1"))
+        usecols.append(n_columns - 1)
+
+    return np.loadtxt(
+        source if isinstance(source, Path) else _open(source),
+        dtype=np.dtype(fields),
+        delimiter=delimiter,
+        usecols=usecols,
+        skiprows=1 if skip_header else 0,
+        comments=None,
+        quotechar=quotechar,
+        ndmin=1,
+        encoding=None if isinstance(source, Path) else "latin-1",
+    )
+
+
+def _convert_columns(
+    rows: np.ndarray, columns: dict[str, ColumnSpec]
+) -> tuple[dict[str, np.ndarray], np.ndarray | None]:
+    """Convert the raw parsed columns to their final dtype.
+
+    Returns:
+        The converted columns, and the mask of the rows to keep, or None if every
+        row is valid.
+    """
+    converted: dict[str, np.ndarray] = {}
+    keep: np.ndarray | None = None
+
+    for name, spec in columns.items():
+        column = rows[name]
+
+        if spec.skip_invalid:
+            try:
+                column = column.astype(np.float64)
+            except ValueError:
+                # Only fall back to converting one value at a time when the
+                # column actually contains something that is not a number.
+                valid = np.ones(len(column), dtype=bool)
+                values = np.empty(len(column), dtype=np.float64)
+                for i, value in enumerate(column.tolist()):
+                    try:
+                        values[i] = float(value)
+                    except ValueError:
+                        valid[i] = False
+                column = values
+                keep = valid if keep is None else keep & valid
+
+        # copy out of the parsed records, so they can be released
+        converted[name] = np.ascontiguousarray(column, dtype=spec.dtype)
+
+    return converted, keep
+
+
+def _group_rows(
+    rows: np.ndarray, columns: dict[str, ColumnSpec], allowed: set[bytes] | None
+) -> ChromosomeTable:
+    converted, keep = _convert_columns(rows, columns)
+    chromosomes = rows["_chromosome"]
+
+    if allowed is not None:
+        # look up the chromosome of each run of rows, rather than of each row
+        run_starts = _run_starts(chromosomes)
+        width = chromosomes.dtype.itemsize
+        run_names = np.ascontiguousarray(chromosomes[run_starts])
+        is_allowed = _StringSet.from_bytes(allowed, width).contains(
+            run_names.view(np.uint8).reshape(-1, width)
+        )
+        if not is_allowed.all():
+            is_allowed = np.repeat(is_allowed, np.diff(run_starts, append=len(rows)))
+            keep = is_allowed if keep is None else keep & is_allowed
+
+    if keep is not None:
+        chromosomes = chromosomes[keep]
+        converted = {name: column[keep] for name, column in converted.items()}
+
+    if len(chromosomes) == 0:
+        return _empty_table(columns)
+
+    run_starts = _run_starts(chromosomes)
+    run_names = chromosomes[run_starts]
+
+    if len(np.unique(run_names)) != len(run_names):
+        # The rows of some chromosome are not contiguous: reorder them by
+        # chromosome, keeping the chromosomes in order of first appearance and
+        # the rows of each chromosome in file order.
+        _, first_index, codes = np.unique(
+            chromosomes, return_index=True, return_inverse=True
+        )
+        rank = np.empty(len(first_index), dtype=np.int64)
+        rank[np.argsort(first_index)] = np.arange(len(first_index))
+        order = np.argsort(rank[codes], kind="stable")
+        chromosomes = chromosomes[order]
+        converted = {name: column[order] for name, column in converted.items()}
+        run_starts = _run_starts(chromosomes)
+        run_names = chromosomes[run_starts]
+
+    offsets = np.append(run_starts, len(chromosomes)).astype(np.int64)
+
+    return ChromosomeTable(
+        [name.decode() for name in run_names.tolist()], offsets, converted
+    )
+
+
+def _run_starts(chromosomes: np.ndarray) -> np.ndarray:
+    """The index of the first row of every run of rows of the same chromosome."""
+    return np.concatenate(
+        ([0], np.flatnonzero(chromosomes[1:] != chromosomes[:-1]) + 1)
+    )
+
+
+def _empty_table(columns: dict[str, ColumnSpec]) -> ChromosomeTable:
+    return ChromosomeTable(
+        [],
+        np.zeros(1, dtype=np.int64),
+        {name: np.zeros(0, dtype=spec.dtype) for name, spec in columns.items()},
+    )
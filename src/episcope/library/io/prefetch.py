@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+import warnings
+
+from episcope.library.io import BaseSourceProvider
+
+# Number of timesteps loaded ahead around each displayed chromosome.
+DEFAULT_MAX_TARGETS = 4
+
+
+class Prefetcher:
+    """Loads the timesteps likely to be displayed next on a background thread.
+
+    After a chromosome of an experiment and timestep has been displayed, the
+    neighbouring timesteps of the same experiment (the next one first), then the
+    same timestep of the other experiments, are loaded through the prefetch
+    method of the source provider.
+
+    A new request cancels the current one, and the foreground can cancel the
+    prefetch before loading data of its own, so that the background thread stops
+    competing with it once the file being loaded is done. At most max_targets timesteps are loaded per
+    request, and the provider stops prefetching when its memory budget is
+    reached.
+
+    Attributes:
+        max_targets: The maximum number of timesteps loaded per request.
+    """
+
+    def __init__(
+        self, source: BaseSourceProvider, max_targets: int = DEFAULT_MAX_TARGETS
+    ) -> None:
+        self.max_targets = max_targets
+        self._source = source
+        self._condition = threading.Condition()
+        self._request: tuple[str, str, str] | None = None
+        self._generation = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="episcope-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def request(self, chromosome: str, experiment: str, timestep: str) -> None:
+        """Start loading the neighbours of a displayed chromosome.
+
+        Args:
+            chromosome: The displayed chromosome name.
+            experiment: The displayed experiment name.
+            timestep: The displayed timestep name.
+        """
+        with self._condition:
+            self._generation += 1
+            self._request = (chromosome, experiment, timestep)
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        """Stop the current prefetch after the file being loaded, if any."""
+        with self._condition:
+            self._generation += 1
+            self._request = None
+
+    def close(self) -> None:
+        """Cancel the current prefetch and stop the background thread."""
+        with self._condition:
+            self._generation += 1
+            self._request = None
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+
+    def targets(
+        self, chromosome: str, experiment: str, timestep: str
+    ) -> list[tuple[str, str, str]]:
+        """List the timesteps to load around a displayed chromosome, in order.
+
+        Args:
+            chromosome: The displayed chromosome name.
+            experiment: The displayed experiment name.
+            timestep: The displayed timestep name.
+
+        Returns:
+            At most max_targets (chromosome, experiment, timestep) tuples.
+        """
+        targets = []
+
+        timesteps = sorted(self._source.get_timesteps(chromosome, experiment))
+        if timestep in timesteps:
+            position = timesteps.index(timestep)
+            for neighbour in (position + 1, position - 1):
+                if 0 <= neighbour < len(timesteps):
+                    targets.append((chromosome, experiment, timesteps[neighbour]))
+
+        for other_experiment in sorted(
+            self._source.get_experiments(chromosome, timestep)
+        ):
+            if other_experiment != experiment:
+                targets.append((chromosome, other_experiment, timestep))
+
+        return targets[: self.max_targets]
+
+    def _is_cancelled(self, generation: int) -> bool:
+        return self._closed or self._generation != generation
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._request is None and not self._closed:
+                    self._condition.wait()
+
+                if self._closed:
+                    return
+
+                request, generation = self._request, self._generation
+                self._request = None
+
+            self._prefetch(request, generation)
+
+    def _prefetch(self, request: tuple[str, str, str], generation: int) -> None:
+        try:
+            for target in self.targets(*request):
+                if self._is_cancelled(generation):
+                    return
+
+                completed = self._source.prefetch(
+                    *target, cancelled=lambda: self._is_cancelled(generation)
+                )
+                if not completed:
+                    return
+        except (OSError, ValueError, KeyError) as error:
+            msg = f"Prefetching the neighbours of {request} failed: {error}"
+            warnings.warn(msg, RuntimeWarning, stacklevel=2)
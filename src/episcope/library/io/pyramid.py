@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from episcope.library.io.columnar import ChromosomeTable
+
+if TYPE_CHECKING:
+    # only used in annotations: the package imports this module
+    from episcope.library.io import TrackSummaryArrays
+
+# The bin size of the finest level is at least 2**MIN_BIN_SHIFT base pairs.
+MIN_BIN_SHIFT = 8
+
+# Levels are not built past bins of 2**MAX_BIN_SHIFT base pairs.
+MAX_BIN_SHIFT = 40
+
+# The finest level has bins about this many times longer than the mean interval,
+# so that most intervals fall in one or two bins.
+INTERVALS_PER_BIN = 4
+
+SUMMARY_DTYPES: dict[str, np.dtype | type] = {
+    "start": np.int64,
+    "end": np.int64,
+    "min": np.float64,
+    "max": np.float64,
+    "mean": np.float64,
+    "covered": np.int64,
+}
+
+
+class TrackPyramid:
+    """Zoom levels of a track, summarizing its values in bins of increasing size.
+
+    As for the zoom levels of bigWig files, each level splits the chromosomes in
+    bins of a power of two base pairs and stores, for every bin covered by some
+    interval of the track, the minimum, maximum and mean value of the intervals
+    overlapping it. The mean is weighted by the number of base pairs of each
+    interval inside the bin, and this number is stored as 'covered'. Empty bins
+    are not stored.
+
+    The bin size doubles from one level to the next, until each chromosome fits
+    in a single bin.
+
+    Attributes:
+        levels: The summary of each level, indexed by the base 2 logarithm of its
+            bin size, from the finest to the coarsest level.
+    """
+
+    def __init__(self, levels: dict[int, ChromosomeTable]) -> None:
+        self.levels = dict(sorted(levels.items()))
+
+    @classmethod
+    def build(cls, table: ChromosomeTable) -> TrackPyramid:
+        """Build the zoom levels of a track.
+
+        Args:
+            table: The track, with 'start', 'end' and 'value' columns.
+
+        Returns:
+            The TrackPyramid of the track.
+        """
+        if table.n_rows == 0:
+            return cls({})
+
+        starts = np.asarray(table.columns["start"], dtype=np.int64)
+        ends = np.maximum(np.asarray(table.columns["end"], dtype=np.int64), starts + 1)
+        values = np.asarray(table.columns["value"], dtype=np.float64)
+        chromosome_ids = np.repeat(
+            np.arange(len(table), dtype=np.int64), np.diff(table.offsets)
+        )
+
+        mean_length = float(np.mean(ends - starts))
+        shift = max(
+            MIN_BIN_SHIFT, math.ceil(math.log2(INTERVALS_PER_BIN * mean_length))
+        )
+
+        # split every interval in the bins it overlaps
+        first_bins = starts >> shift
+        n_bins = ((ends - 1) >> shift) - first_bins + 1
+        rows = np.repeat(np.arange(len(starts)), n_bins)
+        bins = first_bins[rows] + (
+            np.arange(len(rows)) - np.repeat(np.cumsum(n_bins) - n_bins, n_bins)
+        )
+        covered = np.minimum(ends[rows], (bins + 1) << shift) - np.maximum(
+            starts[rows], bins << shift
+        )
+
+        order = np.lexsort((bins, chromosome_ids[rows]))
+        level = _reduce(
+            chromosome_ids[rows][order],
+            bins[order],
+            values[rows][order],
+            values[rows][order],
+            (values[rows] * covered)[order],
+            covered[order],
+        )
+
+        levels = {}
+        while True:
+            levels[shift] = _level_table(table.chromosomes, shift, *level)
+
+            n_chromosomes = len(np.unique(level[0]))
+            if len(level[0]) <= n_chromosomes or shift >= MAX_BIN_SHIFT:
+                break
+
+            shift += 1
+            chromosome_ids, bins, *summaries = level
+            level = _reduce(chromosome_ids, bins >> 1, *summaries)
+
+        return cls(levels)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.levels.values())
+
+    @property
+    def bin_sizes(self) -> list[int]:
+        return [1 << shift for shift in self.levels]
+
+    def level_for(self, bin_size: int) -> int | None:
+        """Pick the finest level with bins at least as large as the given size.
+
+        Args:
+            bin_size: The requested size of the bins, in base pairs.
+
+        Returns:
+            The base 2 logarithm of the bin size of the level, or None if the
+            pyramid is empty. If every level is finer than the requested size,
+            the coarsest level is used.
+        """
+        if not self.levels:
+            return None
+
+        for shift in self.levels:
+            if 1 << shift >= bin_size:
+                return shift
+
+        return max(self.levels)
+
+    def summary(self, chromosome: str, bin_size: int) -> TrackSummaryArrays:
+        """Get the summary of a chromosome at the level matching a bin size.
+
+        Args:
+            chromosome: The chromosome name.
+            bin_size: The requested size of the bins, in base pairs.
+
+        Returns:
+            A TrackSummaryArrays dictionary with the non empty bins, sorted by start.
+        """
+        shift = self.level_for(bin_size)
+        if shift is None or chromosome not in self.levels[shift]:
+            return {
+                name: np.zeros(0, dtype=dtype) for name, dtype in SUMMARY_DTYPES.items()
+            }
+
+        return self.levels[shift][chromosome]
+
+
+def _reduce(
+    chromosome_ids: np.ndarray,
+    bins: np.ndarray,
+    minimums: np.ndarray,
+    maximums: np.ndarray,
+    sums: np.ndarray,
+    covered: np.ndarray,
+) -> tuple[np.ndarray, ...]:
+    """Merge the consecutive entries of the same bin, sorted by chromosome and bin."""
+    is_first = np.ones(len(bins), dtype=bool)
+    is_first[1:] = (bins[1:] != bins[:-1]) | (chromosome_ids[1:] != chromosome_ids[:-1])
+    firsts = np.flatnonzero(is_first)
+
+    return (
+        chromosome_ids[firsts],
+        bins[firsts],
+        np.minimum.reduceat(minimums, firsts),
+        np.maximum.reduceat(maximums, firsts),
+        np.add.reduceat(sums, firsts),
+        np.add.reduceat(covered, firsts),
+    )
+
+
+def _level_table(
+    chromosomes: list[str],
+    shift: int,
+    chromosome_ids: np.ndarray,
+    bins: np.ndarray,
+    minimums: np.ndarray,
+    maximums: np.ndarray,
+    sums: np.ndarray,
+    covered: np.ndarray,
+) -> ChromosomeTable:
+    present = np.flatnonzero(np.bincount(chromosome_ids, minlength=len(chromosomes)))
+    offsets = np.searchsorted(chromosome_ids, np.append(present, len(chromosomes)))
+
+    return ChromosomeTable(
+        [chromosomes[i] for i in present.tolist()],
+        offsets,
+        {
+            "start": bins << shift,
+            "end": (bins + 1) << shift,
+            "min": minimums,
+            "max": maximums,
+            "mean": sums / covered,
+            "covered": covered,
+        },
+    )
@@ -0,0 +1,683 @@
+from __future__ import annotations
+
+import contextlib
+import copy
+import hashlib
+import http.client
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from episcope.library.io.binary import PREAMBLE_SIZE, parse_header
+from episcope.library.io.cache import DEFAULT_MAX_BYTES
+from episcope.library.io.catalogue import CatalogueIndex
+from episcope.library.io.columnar import ChromosomeTable
+from episcope.library.io.container import (
+    ContainerSourceProvider,
+    _Timestep,
+    check_container,
+)
+from episcope.library.io.singleflight import SingleFlight
+from episcope.library.io.v1_2.ensemble import read_display_options
+
+DEFAULT_BLOCK_SIZE = 256 * 1024
+
+DEFAULT_MEMORY_BYTES = 256 * 1024**2
+
+DEFAULT_CONNECTIONS = 4
+
+DEFAULT_TIMEOUT = 30.0
+
+BLOCK_SUFFIX = ".blk"
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def is_remote(location: str | Path) -> bool:
+    """Whether a data location is an HTTP(S) URL rather than a local path."""
+    return urlsplit(str(location)).scheme in ("http", "https")
+
+
+class BlockCache:
+    """A bounded cache of the blocks of remote files, in memory and optionally on disk.
+
+    The blocks are kept in memory in least recently used order, and the least
+    recently used ones are dropped when their total size exceeds max_bytes.
+
+    With a directory, every fetched block is also written to it, so that later
+    runs, and other processes sharing the directory, read the block from disk
+    instead of the network. As in ParseCache, the modification time of a block
+    file is updated on every hit and used as its last access time, and the least
+    recently used block files are removed when the directory grows beyond
+    max_disk_bytes.
+
+    Attributes:
+        max_bytes: The maximum size of the blocks kept in memory, in bytes.
+        directory: The directory holding the block files, or None.
+        max_disk_bytes: The maximum size of the block files, in bytes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MEMORY_BYTES,
+        directory: str | Path | None = None,
+        max_disk_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.directory = None if directory is None else Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+
+        self._blocks: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+        self._nbytes = 0
+        self._disk_nbytes = 0
+        self._lock = threading.Lock()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.evict()
+
+    def _block_path(self, key: str, block: int) -> Path:
+        return self.directory / f"{key}-{block}{BLOCK_SUFFIX}"
+
+    def get(self, key: str, block: int) -> bytes | None:
+        """Look up a block.
+
+        Args:
+            key: The key of the file the block belongs to.
+            block: The index of the block in the file.
+
+        Returns:
+            The content of the block, or None if it is not cached.
+        """
+        with self._lock:
+            data = self._blocks.get((key, block))
+            if data is not None:
+                self._blocks.move_to_end((key, block))
+                return data
+
+        if self.directory is None:
+            return None
+
+        block_path = self._block_path(key, block)
+        try:
+            data = block_path.read_bytes()
+        except OSError:
+            return None
+
+        with contextlib.suppress(OSError):
+            os.utime(block_path)
+
+        self._keep(key, block, data)
+
+        return data
+
+    def put(self, key: str, block: int, data: bytes) -> None:
+        """Store a block, then evict blocks above the size caps.
+
+        Args:
+            key: The key of the file the block belongs to.
+            block: The index of the block in the file.
+            data: The content of the block.
+        """
+        self._keep(key, block, data)
+
+        if self.directory is None:
+            return
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".block.")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            Path(tmp_name).replace(self._block_path(key, block))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._disk_nbytes += len(data)
+            is_full = self._disk_nbytes > self.max_disk_bytes
+        if is_full:
+            self.evict()
+
+    def _keep(self, key: str, block: int, data: bytes) -> None:
+        with self._lock:
+            previous = self._blocks.pop((key, block), None)
+            if previous is not None:
+                self._nbytes -= len(previous)
+
+            self._blocks[(key, block)] = data
+            self._nbytes += len(data)
+
+            while self._nbytes > self.max_bytes and len(self._blocks) > 1:
+                _, evicted = self._blocks.popitem(last=False)
+                self._nbytes -= len(evicted)
+
+    def evict(self) -> None:
+        """Remove the least recently used block files until the directory fits its size cap.
+
+        Blocks are removed down to nine tenths of the cap, so that the directory
+        is not scanned again on every following block.
+        """
+        if self.directory is None:
+            return
+
+        entries = []
+        total_bytes = 0
+
+        for block_path in self.directory.glob(f"*{BLOCK_SUFFIX}"):
+            try:
+                stat = block_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, block_path))
+            total_bytes += stat.st_size
+
+        entries.sort()
+
+        if total_bytes > self.max_disk_bytes:
+            for _, size, block_path in entries:
+                if total_bytes <= self.max_disk_bytes * 9 // 10:
+                    break
+                block_path.unlink(missing_ok=True)
+                total_bytes -= size
+
+        with self._lock:
+            self._disk_nbytes = total_bytes
+
+
+class _HTTPClient:
+    """Requests a URL over persistent connections, one per thread.
+
+    Attributes:
+        url: The requested URL.
+        requests: The number of requests sent so far.
+    """
+
+    def __init__(self, url: str, connections: int, timeout: float) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            msg = f"'{url}' is not an HTTP or HTTPS URL."
+            raise ValueError(msg)
+
+        self.url = url
+        self.requests = 0
+
+        self._connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._netloc = parts.netloc
+        self._target = parts.path or "/"
+        if parts.query:
+            self._target += f"?{parts.query}"
+        self._timeout = timeout
+
+        self._local = threading.local()
+        self._connections: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=connections, thread_name_prefix="episcope-http"
+        )
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connection_class(self._netloc, timeout=self._timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def request(
+        self, method: str, headers: dict[str, str] | None = None
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        """Send a request, on the connection of the calling thread.
+
+        A connection closed by the server since its last use (e.g. after a keep
+        alive timeout) is opened again, and the request is sent once more.
+
+        Returns:
+            The response, and its body.
+
+        Raises:
+            OSError: If the server cannot be reached, or the response has an
+                error status.
+        """
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, self._target, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                if attempt > 0:
+                    raise
+                continue
+
+            with self._lock:
+                self.requests += 1
+
+            if response.status >= 300:
+                msg = (
+                    f"Request of '{self.url}' failed: "
+                    f"{response.status} {response.reason}."
+                )
+                raise OSError(msg)
+
+            return response, body
+
+        msg = f"Request of '{self.url}' failed."
+        raise OSError(msg)
+
+    def map(self, function: Callable[[_T], _R], items: Iterable[_T]) -> list[_R]:
+        """Call a function on several items concurrently, on separate connections."""
+        return list(self._executor.map(function, items))
+
+    def close(self) -> None:
+        """Close the connections of every thread."""
+        self._executor.shutdown()
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+
+class RemoteFile:
+    """A file served over HTTP, read by byte ranges through a block cache.
+
+    The file is read by aligned blocks of block_size bytes: the blocks missing
+    from the cache are fetched with Range requests, one per run of consecutive
+    missing blocks, and the runs of a read are fetched concurrently. A
+    RemoteFile is a view of one version of the file, identified by its size and
+    validator (its ETag or modification date), which also key its blocks in
+    the cache: the blocks of a replaced file are never mixed with the new ones.
+
+    Attributes:
+        url: The URL of the file.
+        size: The size of the file, in bytes.
+        validator: The ETag or the last modification date of the file.
+        block_size: The size of the blocks read from the server, in bytes.
+        cache: The cache holding the blocks.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cache: BlockCache | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        connections: int = DEFAULT_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Open a file served over HTTP, fetching its first block.
+
+        Raises:
+            ValueError: If the URL is not an HTTP or HTTPS URL.
+            OSError: If the file cannot be fetched.
+        """
+        self.url = url
+        self.block_size = block_size
+        self.cache = BlockCache() if cache is None else cache
+
+        self._client = _HTTPClient(url, connections, timeout)
+        self._flights = SingleFlight()
+
+        self._open()
+
+    @property
+    def requests(self) -> int:
+        """The number of requests sent to the server so far, by every version."""
+        return self._client.requests
+
+    def _open(self) -> None:
+        # the first block tells the size and the validator of the file, and
+        # usually holds the header of an array file
+        response, body = self._client.request(
+            "GET", {"Range": f"bytes=0-{self.block_size - 1}"}
+        )
+
+        if response.status == 206:
+            match = _CONTENT_RANGE.fullmatch(response.getheader("Content-Range", ""))
+            if match is None or match[3] == "*":
+                msg = f"'{self.url}' returned an invalid Content-Range."
+                raise OSError(msg)
+            self.size = int(match[3])
+        else:
+            self.size = len(body)
+
+        self.validator = _validator(response)
+        self._key = hashlib.sha256(
+            f"{self.url}\0{self.size}\0{self.validator}".encode()
+        ).hexdigest()[:32]
+
+        self.cache.put(self._key, 0, body[: self.block_size])
+
+    def close(self) -> None:
+        """Close the connections to the server, shared by every version of the file."""
+        self._client.close()
+
+    def stat(self) -> tuple[int, str]:
+        """Ask the server for the current size and validator of the file."""
+        response, _ = self._client.request("HEAD")
+
+        return int(response.getheader("Content-Length", "0")), _validator(response)
+
+    def reopen(self) -> RemoteFile:
+        """Open the current version of the file, sharing the connections and cache."""
+        remote_file = copy.copy(self)
+        remote_file._flights = SingleFlight()
+        remote_file._open()
+
+        return remote_file
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Read a range of bytes of the file."""
+        return self.read_ranges([(offset, length)])[0]
+
+    def read_ranges(self, ranges: list[tuple[int, int]]) -> list[bytes]:
+        """Read several ranges of bytes of the file, fetching their missing blocks at once.
+
+        Args:
+            ranges: The offset and length of each range.
+
+        Returns:
+            The bytes of each range.
+
+        Raises:
+            ValueError: If a range is past the end of the file.
+            OSError: If the blocks cannot be fetched.
+        """
+        needed: set[int] = set()
+        for offset, length in ranges:
+            if offset < 0 or offset + length > self.size:
+                msg = f"The range {offset}+{length} is outside of '{self.url}'."
+                raise ValueError(msg)
+            if length > 0:
+                needed.update(
+                    range(self._block(offset), self._block(offset + length - 1) + 1)
+                )
+
+        blocks: dict[int, bytes] = {}
+        missing = []
+        for block in sorted(needed):
+            data = self.cache.get(self._key, block)
+            if data is None or len(data) != self._block_length(block):
+                missing.append(block)
+            else:
+                blocks[block] = data
+
+        runs = _runs(missing)
+        if len(runs) == 1:
+            blocks.update(self._fetch(runs[0]))
+        elif runs:
+            for fetched in self._client.map(self._fetch, runs):
+                blocks.update(fetched)
+
+        results = []
+        for offset, length in ranges:
+            if length == 0:
+                results.append(b"")
+                continue
+
+            first, last = self._block(offset), self._block(offset + length - 1)
+            data = b"".join(blocks[block] for block in range(first, last + 1))
+            start = offset - first * self.block_size
+            results.append(data[start : start + length])
+
+        return results
+
+    def _block(self, offset: int) -> int:
+        return offset // self.block_size
+
+    def _block_length(self, block: int) -> int:
+        return min(self.block_size, self.size - block * self.block_size)
+
+    def _fetch(self, run: tuple[int, int]) -> dict[int, bytes]:
+        return self._flights.do(run, lambda: self._fetch_run(*run))
+
+    def _fetch_run(self, first: int, last: int) -> dict[int, bytes]:
+        """Fetch the consecutive blocks first to last with a single request."""
+        start = first * self.block_size
+        end = min((last + 1) * self.block_size, self.size)
+
+        response, body = self._client.request(
+            "GET", {"Range": f"bytes={start}-{end - 1}"}
+        )
+
+        if response.status == 206:
+            match = _CONTENT_RANGE.fullmatch(response.getheader("Content-Range", ""))
+            if match is None or int(match[1]) != start or len(body) != end - start:
+                msg = f"'{self.url}' returned an unexpected range."
+                raise OSError(msg)
+            body_offset = start
+        else:
+            # the server ignored the Range header, and sent the whole file
+            if len(body) != self.size:
+                msg = f"'{self.url}' changed while it was read."
+                raise OSError(msg)
+            body_offset = 0
+
+        blocks = {}
+        for block in range(first, last + 1):
+            block_start = block * self.block_size - body_offset
+            data = body[block_start : block_start + self._block_length(block)]
+            self.cache.put(self._key, block, data)
+            blocks[block] = data
+
+        return blocks
+
+
+def _validator(response: http.client.HTTPResponse) -> str:
+    return response.getheader("ETag") or response.getheader("Last-Modified") or ""
+
+
+def _runs(blocks: list[int]) -> list[tuple[int, int]]:
+    """Group sorted block indices into runs of consecutive blocks."""
+    runs: list[tuple[int, int]] = []
+    for block in blocks:
+        if runs and runs[-1][1] == block - 1:
+            runs[-1] = (runs[-1][0], block)
+        else:
+            runs.append((block, block))
+
+    return runs
+
+
+class _RemoteColumn:
+    """A column of a table of a remote container, read by slices of rows."""
+
+    def __init__(
+        self, remote_file: RemoteFile, offset: int, entry: dict[str, Any]
+    ) -> None:
+        self.dtype = np.dtype(entry["dtype"])
+        self.shape = tuple(entry["shape"])
+
+        self._file = remote_file
+        self._offset = offset + entry["offset"]
+        self._row_nbytes = self.dtype.itemsize * int(np.prod(self.shape[1:]))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        start, end, step = rows.indices(len(self))
+        if step != 1:
+            msg = "Remote columns are only read by contiguous slices of rows."
+            raise IndexError(msg)
+
+        end = max(start, end)
+
+        return self.from_bytes(
+            self._file.read(*self.byte_range(start, end)), end - start
+        )
+
+    def byte_range(self, start: int, end: int) -> tuple[int, int]:
+        """The offset and length in the file of the rows start to end."""
+        return self._offset + start * self._row_nbytes, (end - start) * self._row_nbytes
+
+    def from_bytes(self, data: bytes, n_rows: int) -> np.ndarray:
+        return np.frombuffer(data, dtype=self.dtype).reshape((n_rows, *self.shape[1:]))
+
+
+class _RemoteTable(ChromosomeTable):
+    """A ChromosomeTable of a remote container, whose rows are read on lookup.
+
+    The offsets of the chromosomes come from the header of the container, so
+    looking up a chromosome reads its rows of all the columns at once, and
+    nothing else.
+    """
+
+    def __init__(
+        self,
+        remote_file: RemoteFile,
+        chromosomes: list[str],
+        offsets: list[int],
+        columns: dict[str, _RemoteColumn],
+    ) -> None:
+        super().__init__(chromosomes, np.asarray(offsets), columns)
+        self._file = remote_file
+
+    def __getitem__(self, chromosome: str) -> dict[str, np.ndarray]:
+        start, end = self.row_range(chromosome)
+
+        ranges = [column.byte_range(start, end) for column in self.columns.values()]
+        data = self._file.read_ranges(ranges)
+
+        return {
+            name: column.from_bytes(column_data, end - start)
+            for (name, column), column_data in zip(
+                self.columns.items(), data, strict=True
+            )
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes held by the offsets, the rows being read on lookup."""
+        return self.offsets.nbytes
+
+
+class RemoteContainerSourceProvider(ContainerSourceProvider):
+    def __init__(
+        self,
+        url: str,
+        display_options_path: str | Path = "",
+        cache_dir: str | Path | None = None,
+        cache_size: int = DEFAULT_MAX_BYTES,
+        memory_cache_size: int = DEFAULT_MEMORY_BYTES,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        connections: int = DEFAULT_CONNECTIONS,
+    ):
+        """Initializes the RemoteContainerSourceProvider with the URL of a container file.
+
+        Args:
+            url: The HTTP(S) URL of a container file written by pack(), served
+                by a server supporting Range requests (e.g. any static file server).
+            display_options_path: The path of a file that has overrides to the
+                appearance of the 3D visualization.
+            cache_dir: A directory where the fetched blocks are stored, to be
+                read from disk by later runs instead of the network.
+            cache_size: The maximum size of the cache directory, in bytes.
+            memory_cache_size: The maximum size of the blocks kept in memory, in bytes.
+            block_size: The size of the blocks read from the server, in bytes.
+            connections: The number of connections fetching blocks concurrently.
+
+        Opening the container costs two requests: the size and validator of the
+        file, then its first block, holding the header. The header locates the
+        rows of every chromosome in the arrays of the container, so displaying
+        a chromosome only fetches the blocks of its rows, in one round-trip per
+        table. Blocks stay in the cache until evicted, and the interval indexes
+        of the tracks are built on first use.
+
+        Raises:
+            ValueError: If the URL is not an HTTP(S) URL, or the file is not a
+                container file.
+            OSError: If the server cannot be reached.
+        """
+        self.url = url
+        self._file = RemoteFile(
+            url,
+            BlockCache(memory_cache_size, cache_dir, cache_size),
+            block_size=block_size,
+            connections=connections,
+        )
+        self._lock = threading.RLock()
+        self._index = CatalogueIndex()
+        self._timesteps: dict[tuple[str, str], _Timestep] = {}
+        self._display_options = read_display_options(Path(display_options_path))
+
+        self._open()
+
+    @property
+    def requests(self) -> int:
+        """The number of requests sent to the server so far."""
+        return self._file.requests
+
+    def close(self) -> None:
+        """Close the connections to the server."""
+        self._file.close()
+
+    def _version(self) -> tuple[Any, ...]:
+        return self._file.stat()
+
+    def _read(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Fetch the header of the container, opening its current version if it changed.
+
+        Returns:
+            The RemoteFile of the container, the offset of its array data and
+            the entries of its arrays, as used by _read_table(); and its metadata.
+        """
+        if (self._file.size, self._file.validator) != self._opened_version:
+            self._file = self._file.reopen()
+
+        remote_file = self._file
+        header, data_offset = parse_header(
+            remote_file.read(0, min(PREAMBLE_SIZE, remote_file.size)),
+            lambda length: remote_file.read(PREAMBLE_SIZE, length),
+        )
+        check_container(header["meta"], self.url)
+
+        arrays = {
+            "file": remote_file,
+            "data_offset": data_offset,
+            "entries": header["arrays"],
+        }
+
+        return arrays, header["meta"]
+
+    def _read_table(
+        self,
+        arrays: dict[str, Any],
+        prefix: str,
+        table_name: str,
+        table_meta: dict[str, Any],
+    ) -> ChromosomeTable:
+        remote_file = arrays["file"]
+        entries = arrays["entries"]
+        prefix = f"{prefix}{table_name}/"
+
+        return _RemoteTable(
+            remote_file,
+            table_meta["chromosomes"],
+            table_meta["offsets"],
+            {
+                name: _RemoteColumn(
+                    remote_file,
+                    arrays["data_offset"],
+                    entries[f"{prefix}column/{name}"],
+                )
+                for name in table_meta["columns"]
+            },
+        )
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from episcope.library.io.cache import ParseCache
+from episcope.library.io.v1_2 import Ensemble
+
+
+def publish(
+    data_directory: str | Path,
+    directory: str | Path,
+    display_options: str = "",
+    workers: int = 1,
+) -> Ensemble:
+    """Parse an ensemble into a directory shared by several server processes.
+
+    Every structure, labels and track file of the ensemble is parsed and stored
+    in a ParseCache in the directory, along with the zoom levels of the tracks.
+    The entries are never evicted. When the directory is on a memory-backed
+    filesystem such as /dev/shm, the processes attached to it with attach()
+    memory-map the same pages: each of them only holds the data it derives from
+    the entries, and starts without parsing anything.
+
+    The entries of files that changed since they were published are ignored by
+    the attached processes, which then parse these files on their own until
+    the ensemble is published again.
+
+    Args:
+        data_directory: The directory of the ensemble.
+        directory: The shared directory, created if needed.
+        display_options: The path of the display options file of the ensemble.
+        workers: The number of processes parsing the timesteps in parallel.
+
+    Returns:
+        The loaded Ensemble.
+    """
+    cache = ParseCache(directory, max_bytes=sys.maxsize)
+    ensemble = Ensemble(data_directory, display_options, cache=cache, workers=workers)
+
+    for _experiment in ensemble._experiments.values():
+        for _timestep in _experiment._timesteps.values():
+            for _track_name in _timestep.peak_track_names:
+                _timestep.get_peak_track_pyramid(_track_name)
+            for _track_name in _timestep.point_track_names:
+                _timestep.get_point_track_pyramid(_track_name)
+
+    return ensemble
+
+
+def attach(directory: str | Path) -> ParseCache:
+    """Open a directory published with publish() for reading.
+
+    Args:
+        directory: The shared directory.
+
+    Returns:
+        A read-only ParseCache of the directory, to pass to a lazy Ensemble.
+
+    Raises:
+        FileNotFoundError: If the directory does not exist.
+    """
+    if not Path(directory).is_dir():
+        msg = f"The shared directory '{directory}' does not exist."
+        raise FileNotFoundError(msg)
+
+    return ParseCache(directory, read_only=True)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls computing the same value.
+
+    The first thread calling do() with a key runs the function, while the other
+    threads calling do() with the same key before it returns wait for it, and
+    get the same result or exception. Once the function returned, the next call
+    with the key runs it again: caching the result is left to the function.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, function: Callable[[], _T]) -> _T:
+        """Run a function, or wait for the call already running with the same key.
+
+        Args:
+            key: The key identifying the value computed by the function.
+            function: The function computing the value.
+
+        Returns:
+            The value returned by the function.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.result
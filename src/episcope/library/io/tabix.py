@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import gzip
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO
+
+# Size of the fixed part of the header of a BGZF block, up to the extra field.
+_BGZF_HEADER = struct.Struct("<4BI2BH")
+
+# A BGZF block holds at most 64 KiB of compressed data.
+_BGZF_MAX_BLOCK_SIZE = 65536
+
+_TABIX_MAGIC = b"TBI\x01"
+_TABIX_HEADER = struct.Struct("<4s8i")
+
+# Flag of the tabix format field marking zero-based, half-open coordinates.
+_TABIX_ZERO_BASED = 0x10000
+
+# Bins above this number hold metadata instead of chunks of records.
+_MAX_BIN = 37449
+
+# Positions covered by each entry of the linear index.
+_LINEAR_SHIFT = 14
+
+
+def read_block(data: bytes | memoryview, offset: int) -> tuple[bytes, int]:
+    """Decompress the BGZF block starting at an offset of a buffer.
+
+    Args:
+        data: A buffer holding compressed data.
+        offset: The offset of the block in the buffer.
+
+    Returns:
+        The decompressed content of the block, and its compressed size.
+
+    Raises:
+        ValueError: If there is no valid BGZF block at the offset.
+    """
+    header_end = offset + _BGZF_HEADER.size
+    if len(data) < header_end:
+        msg = f"Truncated BGZF block header at offset {offset}."
+        raise ValueError(msg)
+
+    id1, id2, method, flags, _, _, _, extra_length = _BGZF_HEADER.unpack_from(
+        data, offset
+    )
+    if (id1, id2, method) != (31, 139, 8) or not flags & 4:
+        msg = f"No BGZF block at offset {offset}."
+        raise ValueError(msg)
+
+    block_size = None
+    position = header_end
+    extra_end = header_end + extra_length
+    while position + 4 <= extra_end:
+        si1, si2, length = struct.unpack_from("<2BH", data, position)
+        if (si1, si2) == (66, 67):
+            (block_size,) = struct.unpack_from("<H", data, position + 4)
+            block_size += 1
+        position += 4 + length
+
+    if block_size is None or len(data) < offset + block_size:
+        msg = f"Invalid or truncated BGZF block at offset {offset}."
+        raise ValueError(msg)
+
+    content = zlib.decompress(
+        bytes(data[extra_end : offset + block_size - 8]), wbits=-15
+    )
+
+    return content, block_size
+
+
+def read_virtual_range(file: BinaryIO, begin: int, end: int) -> bytes:
+    """Read the decompressed bytes between two BGZF virtual offsets.
+
+    A virtual offset holds the offset of a block in the compressed file in its
+    upper 48 bits, and an offset within the decompressed block in its lower 16
+    bits. Only the blocks covering the range are read and decompressed.
+
+    Args:
+        file: The compressed file.
+        begin: The virtual offset of the first byte.
+        end: The virtual offset following the last byte.
+
+    Returns:
+        The decompressed bytes.
+    """
+    first_block, first_offset = begin >> 16, begin & 0xFFFF
+    last_block, last_offset = end >> 16, end & 0xFFFF
+
+    file.seek(first_block)
+    data = file.read(last_block - first_block + _BGZF_MAX_BLOCK_SIZE)
+
+    parts = []
+    position = 0
+    while first_block + position < last_block or (
+        first_block + position == last_block and last_offset > 0
+    ):
+        content, block_size = read_block(data, position)
+
+        start = first_offset if position == 0 else 0
+        stop = last_offset if first_block + position == last_block else len(content)
+        parts.append(content[start:stop])
+
+        position += block_size
+
+    return b"".join(parts)
+
+
+class TabixIndex:
+    """The content of a tabix index (.tbi) of a BGZF compressed, sorted text file.
+
+    Attributes:
+        chromosomes: The names of the indexed chromosomes, in file order.
+        column_chromosome: The 1-based column of the chromosome names.
+        column_start: The 1-based column of the start positions.
+        column_end: The 1-based column of the end positions, or 0 if there is none.
+        zero_based: If True, positions are zero-based and intervals half-open, as
+            in BED files. Otherwise, positions are one-based and inclusive.
+        meta_character: Lines starting with this character are not records.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        data = gzip.decompress(Path(path).read_bytes())
+
+        (
+            magic,
+            n_references,
+            file_format,
+            self.column_chromosome,
+            self.column_start,
+            self.column_end,
+            meta_character,
+            _skip,
+            names_length,
+        ) = _TABIX_HEADER.unpack_from(data, 0)
+        if magic != _TABIX_MAGIC:
+            msg = f"'{path}' is not a tabix index."
+            raise ValueError(msg)
+
+        self.zero_based = bool(file_format & _TABIX_ZERO_BASED)
+        self.meta_character = chr(meta_character)
+
+        position = _TABIX_HEADER.size
+        names = data[position : position + names_length].split(b"\0")
+        self.chromosomes = [name.decode() for name in names[:n_references]]
+        position += names_length
+
+        self._bins: list[dict[int, list[tuple[int, int]]]] = []
+        self._linear: list[tuple[int, ...]] = []
+        for _ in range(n_references):
+            (n_bins,) = struct.unpack_from("<i", data, position)
+            position += 4
+
+            bins = {}
+            for _ in range(n_bins):
+                bin_number, n_chunks = struct.unpack_from("<Ii", data, position)
+                position += 8
+                chunks = struct.unpack_from(f"<{2 * n_chunks}Q", data, position)
+                position += 16 * n_chunks
+                if bin_number <= _MAX_BIN:
+                    bins[bin_number] = list(
+                        zip(chunks[0::2], chunks[1::2], strict=True)
+                    )
+            self._bins.append(bins)
+
+            (n_intervals,) = struct.unpack_from("<i", data, position)
+            position += 4
+            self._linear.append(struct.unpack_from(f"<{n_intervals}Q", data, position))
+            position += 8 * n_intervals
+
+        self._reference_ids = {name: i for i, name in enumerate(self.chromosomes)}
+
+    def chunks(
+        self, chromosome: str, start: int | None = None, end: int | None = None
+    ) -> list[tuple[int, int]]:
+        """Find the chunks of the compressed file that may hold records of a region.
+
+        Args:
+            chromosome: The chromosome name.
+            start: The first base pair of the region (zero-based), or None for
+                the start of the chromosome.
+            end: The base pair following the region, or None for the end of the
+                chromosome.
+
+        Returns:
+            Non overlapping (begin, end) virtual offset ranges, in file order.
+        """
+        reference_id = self._reference_ids.get(chromosome)
+        if reference_id is None:
+            return []
+
+        bins = self._bins[reference_id]
+        if start is None and end is None:
+            chunks = [chunk for bin_chunks in bins.values() for chunk in bin_chunks]
+        else:
+            start = 0 if start is None else max(start, 0)
+            end = (1 << 29) if end is None else end
+            if end <= start:
+                return []
+
+            linear = self._linear[reference_id]
+            min_offset = 0
+            if linear:
+                min_offset = linear[min(start >> _LINEAR_SHIFT, len(linear) - 1)]
+
+            chunks = [
+                chunk
+                for bin_number in _region_bins(start, end)
+                for chunk in bins.get(bin_number, ())
+                if chunk[1] > min_offset
+            ]
+
+        merged: list[tuple[int, int]] = []
+        for begin, stop in sorted(chunks):
+            if merged and begin <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((begin, stop))
+
+        return merged
+
+
+def _region_bins(start: int, end: int) -> list[int]:
+    """The bins of the tabix binning scheme overlapping [start, end)."""
+    end -= 1
+    bins = [0]
+    for shift, first_bin in ((26, 1), (23, 9), (20, 73), (17, 585), (14, 4681)):
+        bins.extend(range(first_bin + (start >> shift), first_bin + (end >> shift) + 1))
+
+    return bins
+
+
+class TabixFile:
+    """Random access to the records of a BGZF compressed file with a tabix index.
+
+    Only the compressed blocks holding the records of the requested chromosome
+    or region are read and decompressed.
+
+    Attributes:
+        path: The path of the compressed file.
+        index: The tabix index of the file.
+    """
+
+    def __init__(self, path: str | Path, index_path: str | Path | None = None) -> None:
+        self.path = Path(path)
+        if index_path is None:
+            index_path = self.path.with_name(f"{self.path.name}.tbi")
+        self.index = TabixIndex(index_path)
+
+    @property
+    def chromosomes(self) -> list[str]:
+        return self.index.chromosomes
+
+    def fetch(
+        self, chromosome: str, start: int | None = None, end: int | None = None
+    ) -> bytes:
+        """Read the lines of the records of a chromosome overlapping a region.
+
+        Args:
+            chromosome: The chromosome name.
+            start: The first base pair of the region (zero-based), or None for
+                the start of the chromosome.
+            end: The base pair following the region, or None for the end of the
+                chromosome.
+
+        Returns:
+            The matching lines, in file order, each terminated by a newline.
+        """
+        chunks = self.index.chunks(chromosome, start, end)
+        if not chunks:
+            return b""
+
+        with self.path.open("rb") as file:
+            data = b"".join(
+                read_virtual_range(file, begin, stop) for begin, stop in chunks
+            )
+
+        if start is None and end is None:
+            return data
+
+        return b"".join(
+            line
+            for line in data.splitlines(keepends=True)
+            if self._overlaps(line, chromosome, start, end)
+        )
+
+    def _overlaps(
+        self, line: bytes, chromosome: str, start: int | None, end: int | None
+    ) -> bool:
+        index = self.index
+        if line.startswith(index.meta_character.encode()):
+            return False
+
+        fields = line.rstrip(b"\r\n").split(b"\t")
+        if fields[index.column_chromosome - 1].decode() != chromosome:
+            return False
+
+        record_start = int(fields[index.column_start - 1])
+        if not index.zero_based:
+            record_start -= 1
+
+        record_end = record_start + 1
+        if index.column_end > 0:
+            record_end = int(fields[index.column_end - 1])
+
+        return (start is None or record_end > start) and (
+            end is None or record_start < end
+        )
@@ -1,151 +1,420 @@
 from __future__ import annotations
 
-from episcope.library.io import BaseSourceProvider
+import functools
+import threading
+from collections import Counter
+from collections.abc import Callable
+from typing import ParamSpec, TypeVar
+
+from episcope.library.io import (
+    ArraySourceProvider,
+    EnsembleChanges,
+    PeakTrackArrays,
+    PointTrackArrays,
+    StructureArrays,
+    TrackSummaryArrays,
+)
+from episcope.library.io.catalogue import CatalogueIndex
+from episcope.library.io.columnar import label_points
+from episcope.library.io.memory import MemoryCache
 from episcope.library.io.v1_2.ensemble import Ensemble
+from episcope.library.io.v1_2.timestep import Timestep
 
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
 
-class SourceProvider(BaseSourceProvider):
-    def __init__(self, ensemble: Ensemble):
+
+def _synchronized(method: Callable[_P, _R]) -> Callable[_P, _R]:
+    """Run a method of the SourceProvider while holding its lock."""
+
+    @functools.wraps(method)
+    def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+        with args[0]._lock:
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+class SourceProvider(ArraySourceProvider):
+    def __init__(self, ensemble: Ensemble, max_bytes: int | None = None):
+        """Initializes the SourceProvider with an ensemble.
+
+        Args:
+            ensemble: The ensemble to provide the data of.
+            max_bytes: The memory budget for the parsed content of the timesteps,
+                in bytes, or None for no limit. When the content of the timesteps
+                goes over the budget, the least recently used timesteps are
+                unloaded, and loaded again on their next use.
+
+        The methods of the provider can be called from several threads. The
+        catalogue and the memory budget are only accessed while holding a lock,
+        while files are loaded outside of it: concurrent requests for different
+        files load them in parallel, and concurrent requests for the same file
+        wait for a single load (see Timestep).
+        """
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
         self._ensemble = ensemble
+        self._index = CatalogueIndex()
+        self._memory = MemoryCache(max_bytes)
+        # the number of prefetches of each timestep that was not used since
+        self._prefetching: Counter[tuple[str, str]] = Counter()
 
+        for _experiment_name, _experiment in self._ensemble._experiments.items():
+            for _timestep_name in _experiment._timesteps:
+                self.index_timestep(_experiment_name, _timestep_name)
+
+    def _get_timestep(self, experiment: str, timestep: str) -> Timestep:
+        return self._ensemble._experiments[experiment]._timesteps[timestep]
+
+    def _use_timestep(self, experiment: str, timestep: str) -> Timestep:
+        """Get a timestep whose content is about to be used, enforcing the memory budget."""
+        with self._lock:
+            _timestep = self._get_timestep(experiment, timestep)
+            self._prefetching.pop((experiment, timestep), None)
+            self._memory.use((experiment, timestep), _timestep)
+
+        return _timestep
+
+    def _is_current(self, experiment: str, timestep: str, _timestep: Timestep) -> bool:
+        _experiment = self._ensemble._experiments.get(experiment)
+
+        return (
+            _experiment is not None
+            and _experiment._timesteps.get(timestep) is _timestep
+        )
+
+    @_synchronized
+    def get_memory_stats(self) -> dict[str, int | None]:
+        """Get the hit, miss and eviction counters of the loaded timesteps.
+
+        Returns:
+            The counters, along with the number of bytes currently loaded and the
+            memory budget.
+        """
+        return self._memory.stats()
+
+    @_synchronized
+    def index_timestep(self, experiment: str, timestep: str) -> None:
+        """Add a timestep of the ensemble to the catalogue, or update its entry.
+
+        Args:
+            experiment: The experiment name.
+            timestep: The timestep name.
+        """
+        _timestep = self._get_timestep(experiment, timestep)
+        self._index.add(experiment, timestep, _timestep.chromosomes)
+        self._memory.add((experiment, timestep), _timestep)
+        _timestep.on_load = functools.partial(self._on_load, (experiment, timestep))
+
+    def _on_load(self, key: tuple[str, str]) -> None:
+        """Enforce the memory budget again once a timestep has loaded more content.
+
+        The budget is first enforced when the timestep is used, before the
+        content it is used for is loaded. A timestep that is only being
+        prefetched never unloads the others (see prefetch).
+        """
+        with self._lock:
+            if not self._prefetching[key]:
+                self._memory.evict(keep=key)
+
+    @_synchronized
+    def unindex_timestep(self, experiment: str, timestep: str) -> None:
+        """Remove a timestep from the catalogue.
+
+        Args:
+            experiment: The experiment name.
+            timestep: The timestep name.
+        """
+        self._index.remove(experiment, timestep)
+        self._memory.remove((experiment, timestep))
+
+    def refresh(self) -> EnsembleChanges:
+        """Load the experiments and timesteps that changed on disk, and update the catalogue.
+
+        The changed timesteps are loaded without holding the lock, so that other
+        requests are served in the meantime. The lock is only held to swap them
+        into the ensemble and update the catalogue. Refreshes run one at a time.
+
+        Returns:
+            The (experiment, timestep) names of the added, modified and removed
+            timesteps.
+        """
+        with self._refresh_lock:
+            updates = self._ensemble.load_changes()
+
+            with self._lock:
+                changes = self._ensemble.apply_changes(updates)
+
+                for experiment, timestep in changes["removed"]:
+                    self.unindex_timestep(experiment, timestep)
+
+                for experiment, timestep in changes["added"] + changes["modified"]:
+                    self.index_timestep(experiment, timestep)
+
+        return changes
+
+    def prefetch(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Load the data of a timestep ahead of its display, one file at a time.
+
+        The files are loaded outside of the lock of the provider, so that the
+        foreground requests are never blocked by the prefetch, except when they
+        need a file being prefetched: they then wait for its load to complete
+        instead of loading it again. The prefetched data does not
+        count as a use of the timestep, and never makes other timesteps unloaded:
+        if a file takes the loaded data over the memory budget, the prefetched
+        timestep is unloaded and the prefetch stops, unless the timestep was used
+        in the meantime. No more file is loaded once the budget is reached either.
+
+        Args:
+            chromosome: The chromosome name. The files of a timestep hold every
+                chromosome, so the whole timestep is loaded if it has a structure
+                for the chromosome.
+            experiment: The experiment name.
+            timestep: The timestep name.
+            cancelled: An optional callable checked before loading each file; the
+                prefetch stops as soon as it returns True.
+
+        Returns:
+            True if all the files were loaded, False if the prefetch stopped early.
+        """
+        with self._lock:
+            if chromosome not in self._index.get_chromosomes(experiment, timestep):
+                return True
+
+            _timestep = self._get_timestep(experiment, timestep)
+            steps: list[Callable[[], object]] = [
+                _timestep.get_structures,
+                _timestep.get_labels,
+            ]
+            for _track_name in sorted(_timestep.peak_track_names):
+                steps.append(
+                    functools.partial(_timestep.get_peak_track_index, _track_name)
+                )
+                steps.append(
+                    functools.partial(_timestep.get_peak_track_pyramid, _track_name)
+                )
+            for _track_name in sorted(_timestep.point_track_names):
+                steps.append(
+                    functools.partial(_timestep.get_point_track_index, _track_name)
+                )
+                steps.append(
+                    functools.partial(_timestep.get_point_track_pyramid, _track_name)
+                )
+
+            key = (experiment, timestep)
+            self._prefetching[key] += 1
+
+        try:
+            for step in steps:
+                if cancelled is not None and cancelled():
+                    return False
+
+                with self._lock:
+                    if self._memory.is_full:
+                        return False
+
+                step()
+
+                with self._lock:
+                    if self._prefetching[key] and self._memory.is_over_budget:
+                        self._memory.unload(key)
+                        return False
+        finally:
+            with self._lock:
+                self._prefetching[key] -= 1
+                if self._prefetching[key] <= 0:
+                    del self._prefetching[key]
+
+        return True
+
+    @_synchronized
     def get_chromosomes(
         self,
         experiment: str | None = None,
         timestep: str | None = None,
     ) -> set[str]:
-        chromosomes = set()
-
-        for _experiment_name, _experiment in self._ensemble._experiments.items():
-            if experiment is not None and _experiment_name != experiment:
-                continue
-
-            for _timestep_name, _timestep in _experiment._timesteps.items():
-                if timestep is not None and _timestep_name != timestep:
-                    continue
-
-                for _chromosome in _timestep._structures:
-                    chromosomes.add(_chromosome)
-
-        return chromosomes
+        return self._index.get_chromosomes(experiment, timestep)
 
+    @_synchronized
     def get_experiments(
         self,
         chromosome: str | None = None,
         timestep: str | None = None,
     ) -> set[str]:
-        experiments = set()
-
-        for _experiment_name, _experiment in self._ensemble._experiments.items():
-            add_experiment = False
+        return self._index.get_experiments(chromosome, timestep)
 
-            for _timestep_name, _timestep in _experiment._timesteps.items():
-                if timestep is not None and _timestep_name != timestep:
-                    continue
+    @_synchronized
+    def get_timesteps(
+        self,
+        chromosome: str | None = None,
+        experiment: str | None = None,
+    ) -> set[str]:
+        return self._index.get_timesteps(chromosome, experiment)
 
-                for _chromosome_name in _timestep._structures:
-                    if chromosome is not None and _chromosome_name != chromosome:
-                        continue
+    def get_peak_tracks(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> set[str]:
+        with self._lock:
+            is_indexed = self._index.has_tracks(experiment, timestep, "peak")
 
-                    add_experiment = True
+        if not is_indexed:
+            _timestep = self._use_timestep(experiment, timestep)
+            _tracks = {
+                _track_name: _timestep.get_peak_track(_track_name)
+                for _track_name in _timestep.peak_track_names
+            }
 
-            if add_experiment:
-                experiments.add(_experiment_name)
+            with self._lock:
+                # the timestep may have been refreshed while loading its tracks
+                if self._is_current(experiment, timestep, _timestep):
+                    self._index.set_tracks(experiment, timestep, "peak", _tracks)
 
-        return experiments
+        with self._lock:
+            return self._index.get_tracks(chromosome, experiment, timestep, "peak")
 
-    def get_timesteps(
+    def get_point_tracks(
         self,
-        chromosome: str | None = None,
-        experiment: str | None = None,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
     ) -> set[str]:
-        experiments = set()
+        with self._lock:
+            is_indexed = self._index.has_tracks(experiment, timestep, "point")
 
-        for _experiment_name, _experiment in self._ensemble._experiments.items():
-            if experiment is not None and _experiment_name != experiment:
-                continue
+        if not is_indexed:
+            _timestep = self._use_timestep(experiment, timestep)
+            _tracks = {
+                _track_name: _timestep.get_point_track(_track_name)
+                for _track_name in _timestep.point_track_names
+            }
 
-            for _timestep_name, _timestep in _experiment._timesteps.items():
-                add_timestep = False
+            with self._lock:
+                # the timestep may have been refreshed while loading its tracks
+                if self._is_current(experiment, timestep, _timestep):
+                    self._index.set_tracks(experiment, timestep, "point", _tracks)
 
-                for _chromosome_name in _timestep._structures:
-                    if chromosome is not None and _chromosome_name != chromosome:
-                        continue
+        with self._lock:
+            return self._index.get_tracks(chromosome, experiment, timestep, "point")
 
-                    add_timestep = True
+    def get_structure_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+    ) -> StructureArrays:
+        _timestep = self._use_timestep(experiment, timestep)
 
-                if add_timestep:
-                    experiments.add(_timestep_name)
+        return _timestep.get_structures()[chromosome]
 
-        return experiments
+    def get_peak_track_arrays(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> PeakTrackArrays:
+        _timestep = self._use_timestep(experiment, timestep)
+        _track = _timestep.get_peak_track(track)
 
-    def get_peak_tracks(
+        return _track[chromosome]
+
+    def get_point_track_arrays(
         self,
         chromosome: str,
         experiment: str,
         timestep: str,
-    ) -> set[str]:
-        _experiment = self._ensemble._experiments[experiment]
-        _timestep = _experiment._timesteps[timestep]
+        track: str,
+    ) -> PointTrackArrays:
+        _timestep = self._use_timestep(experiment, timestep)
+        _track = _timestep.get_point_track(track)
 
-        tracks = set()
-        for _track_name, _track in _timestep._peak_tracks.items():
-            if chromosome in _track:
-                tracks.add(_track_name)
+        return _track[chromosome]
 
-        return tracks
+    def get_peak_track_count(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+    ) -> int:
+        _timestep = self._use_timestep(experiment, timestep)
+        start, end = _timestep.get_peak_track(track).row_range(chromosome)
 
-    def get_point_tracks(
+        return end - start
+
+    def get_point_track_count(
         self,
         chromosome: str,
         experiment: str,
         timestep: str,
-    ) -> set[str]:
-        _experiment = self._ensemble._experiments[experiment]
-        _timestep = _experiment._timesteps[timestep]
+        track: str,
+    ) -> int:
+        _timestep = self._use_timestep(experiment, timestep)
+        start, end = _timestep.get_point_track(track).row_range(chromosome)
 
-        tracks = set()
-        for _track_name, _track in _timestep._point_tracks.items():
-            if chromosome in _track:
-                tracks.add(_track_name)
+        return end - start
+
+    def get_peak_track_range(
+        self,
+        chromosome: str,
+        experiment: str,
+        timestep: str,
+        track: str,
+        start: int,
+        end: int,
+    ) -> PeakTrackArrays:
+        _timestep = self._use_timestep(experiment, timestep)
 
-        return tracks
+        return _timestep.get_peak_track_range(track, chromosome, start, end)
 
-    def get_structure(
+    def get_point_track_range(
         self,
         chromosome: str,
         experiment: str,
         timestep: str,
-    ):
-        _experiment = self._ensemble._experiments[experiment]
-        _timestep = _experiment._timesteps[timestep]
+        track: str,
+        start: int,
+        end: int,
+    ) -> PointTrackArrays:
+        _timestep = self._use_timestep(experiment, timestep)
 
-        return _timestep._structures[chromosome]
+        return _timestep.get_point_track_range(track, chromosome, start, end)
 
-    def get_peak_track(
+    def get_peak_track_summary(
         self,
         chromosome: str,
         experiment: str,
         timestep: str,
         track: str,
-    ):
-        _experiment = self._ensemble._experiments[experiment]
-        _timestep = _experiment._timesteps[timestep]
-        _track = _timestep._peak_tracks[track]
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        _timestep = self._use_timestep(experiment, timestep)
+        _pyramid = _timestep.get_peak_track_pyramid(track)
 
-        return _track[chromosome]
+        return _pyramid.summary(chromosome, bin_size)
 
-    def get_point_track(
+    def get_point_track_summary(
         self,
         chromosome: str,
         experiment: str,
         timestep: str,
         track: str,
-    ):
-        _experiment = self._ensemble._experiments[experiment]
-        _timestep = _experiment._timesteps[timestep]
-        _track = _timestep._point_tracks[track]
+        bin_size: int,
+    ) -> TrackSummaryArrays:
+        _timestep = self._use_timestep(experiment, timestep)
+        _pyramid = _timestep.get_point_track_pyramid(track)
 
-        return _track[chromosome]
+        return _pyramid.summary(chromosome, bin_size)
 
     def get_labels(
         self,
@@ -153,10 +422,13 @@ class SourceProvider(BaseSourceProvider):
         experiment: str,
         timestep: str,
     ):
-        _experiment = self._ensemble._experiments[experiment]
-        _timestep = _experiment._timesteps[timestep]
+        _timestep = self._use_timestep(experiment, timestep)
+        _labels = _timestep.get_labels()
+
+        if chromosome not in _labels:
+            return []
 
-        return _timestep._labels.get(chromosome, [])
+        return label_points(_labels[chromosome])
 
     def get_display_options(self, display_type: str):
         return self._ensemble._display_options.get(display_type, {})
@@ -1,22 +1,32 @@
 from __future__ import annotations
 
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, TypedDict
 
 import yaml
 
-from episcope.library.io.v1_2.experiment import Experiment
+from episcope.library.io import EnsembleChanges
+from episcope.library.io.cache import ParseCache
+from episcope.library.io.v1_2.experiment import Experiment, TimestepUpdates
+from episcope.library.io.v1_2.timestep import Timestep
 
 
-class _ExperimentsMetaStructure(TypedDict):
+class _ExperimentsMetaStructure(TypedDict, total=False):
     chromosomes: list[str]
 
 
-class ExperimentsMeta(TypedDict):
+class ExperimentsMeta(TypedDict, total=False):
     structure: _ExperimentsMetaStructure
 
 
+class EnsembleUpdates(TypedDict):
+    added: dict[str, Experiment]
+    removed: list[str]
+    timesteps: dict[str, TimestepUpdates]
+
+
 class Ensemble:
     """A class to represent an ensemble of models stored in a directory.
 
@@ -28,13 +38,29 @@ class Ensemble:
     """
 
     def __init__(
-        self, directory_path: str | Path, display_options_path: str | Path
+        self,
+        directory_path: str | Path,
+        display_options_path: str | Path,
+        lazy: bool = False,
+        cache: ParseCache | None = None,
+        workers: int = 1,
     ) -> None:
         """Initializes the Ensemble with a directory path.
 
         Args:
             directory_path: The path to the directory containing the models.
             display_options_path: The path to a file that has overrides to the appearance of the 3D visualization.
+            lazy: If True, only discover the experiments and timesteps, and parse
+                each structure, track and labels file the first time it is requested.
+            cache: An optional persistent cache, where parsed files are stored and
+                memory-mapped from on later loads.
+            workers: The number of processes parsing the timesteps in parallel.
+                Ignored when lazy is True.
+
+        Only the rows of the chromosomes of the structure file of each timestep
+        are loaded from its track files, since the other chromosomes have no
+        structure to be displayed on. If 'experiments/meta.yaml' lists chromosomes,
+        only those among them are loaded.
 
         Raises:
             ValueError: If the provided path is not a directory.
@@ -48,10 +74,142 @@ class Ensemble:
         self._chromosomes: set[str] = self._read_chromosomes()
         self._meta: dict[str, Any] = self._read_meta()
         self._experiments_meta: ExperimentsMeta = self._read_experiments_meta()
+        self._lazy = lazy
+        self._cache = cache
         self._experiments = {
-            path.name: Experiment(path) for path in self._discover_experiments()
+            path.name: self._create_experiment(path, lazy=lazy or workers > 1)
+            for path in self._discover_experiments()
         }
-        self._display_options = self._read_display_options(self.display_options_path)
+        if workers > 1 and not lazy:
+            self._load_parallel(workers)
+        self._display_options = read_display_options(self.display_options_path)
+
+    def _create_experiment(self, path: Path, lazy: bool) -> Experiment:
+        return Experiment(
+            path,
+            lazy=lazy,
+            cache=self._cache,
+            track_chromosomes=(self._experiments_meta.get("structure") or {}).get(
+                "chromosomes"
+            )
+            or None,
+        )
+
+    def refresh(self) -> EnsembleChanges:
+        """Discover the experiments and timesteps that changed on disk.
+
+        The directory tree is compared with the known experiments and timesteps:
+        only the new timesteps, and those whose files were added, removed or
+        modified, are loaded again. Unchanged timesteps keep their parsed
+        content. New experiments are only added once all their timesteps have
+        a structure file.
+
+        Returns:
+            The (experiment, timestep) names of the added, modified and removed
+            timesteps.
+        """
+        return self.apply_changes(self.load_changes())
+
+    def load_changes(self) -> EnsembleUpdates:
+        """Load the experiments and timesteps that changed on disk.
+
+        The ensemble itself is left unchanged until the updates are passed to
+        apply_changes(), so that it can keep being read while they are loaded.
+        Only one of these calls may run at a time.
+
+        Returns:
+            The loaded experiments and timesteps, and the names of the removed
+            experiments.
+        """
+        updates: EnsembleUpdates = {"added": {}, "removed": [], "timesteps": {}}
+
+        paths = {path.name: path for path in self._discover_experiments()}
+
+        updates["removed"] = sorted(set(self._experiments) - set(paths))
+
+        for experiment_name, path in sorted(paths.items()):
+            experiment = self._experiments.get(experiment_name)
+            if experiment is None:
+                try:
+                    experiment = self._create_experiment(path, lazy=self._lazy)
+                except FileNotFoundError:
+                    # a timestep is still being written, retry on the next refresh
+                    continue
+
+                updates["added"][experiment_name] = experiment
+                continue
+
+            updates["timesteps"][experiment_name] = experiment.load_changes(
+                lazy=self._lazy
+            )
+
+        return updates
+
+    def apply_changes(self, updates: EnsembleUpdates) -> EnsembleChanges:
+        """Replace the experiments and timesteps of the ensemble with those of load_changes().
+
+        Args:
+            updates: The experiments and timesteps returned by load_changes().
+
+        Returns:
+            The (experiment, timestep) names of the added, modified and removed
+            timesteps.
+        """
+        changes: EnsembleChanges = {"added": [], "modified": [], "removed": []}
+
+        for experiment_name in updates["removed"]:
+            experiment = self._experiments.pop(experiment_name)
+            changes["removed"].extend(
+                (experiment_name, timestep_name)
+                for timestep_name in sorted(experiment._timesteps)
+            )
+
+        for experiment_name, experiment in updates["added"].items():
+            self._experiments[experiment_name] = experiment
+            changes["added"].extend(
+                (experiment_name, timestep_name)
+                for timestep_name in sorted(experiment._timesteps)
+            )
+
+        for experiment_name, timestep_updates in updates["timesteps"].items():
+            experiment_changes = self._experiments[experiment_name].apply_changes(
+                timestep_updates
+            )
+            for kind, timestep_names in experiment_changes.items():
+                changes[kind].extend(
+                    (experiment_name, timestep_name) for timestep_name in timestep_names
+                )
+
+        for names in changes.values():
+            names.sort()
+
+        return changes
+
+    def _load_parallel(self, workers: int) -> None:
+        """Parse the files of every timestep in a pool of processes.
+
+        Each timestep is sent to a worker process before being parsed, and sent
+        back once all its files are loaded. Since the parsed content is stored
+        in a few arrays per file, transferring it back is cheap.
+
+        Args:
+            workers: The number of worker processes.
+        """
+        timesteps = [
+            (experiment, timestep_name, timestep)
+            for experiment in self._experiments.values()
+            for timestep_name, timestep in experiment._timesteps.items()
+        ]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            loaded_timesteps = executor.map(
+                _load_timestep, [timestep for _, _, timestep in timesteps]
+            )
+
+            for (experiment, timestep_name, _), loaded_timestep in zip(
+                timesteps, loaded_timesteps, strict=True
+            ):
+                experiment._timesteps[timestep_name] = loaded_timestep
 
     def _read_chromosomes(self) -> set[str]:
         """Finds the first file ending in '*_autosomes.tsv' and reads chromosome names.
@@ -96,22 +254,28 @@ class Ensemble:
             return {"structure": {"chromosomes": []}}
 
         with meta_yaml_path.open("r") as file:
-            return yaml.safe_load(file)
-
-    def _read_display_options(self, display_options_path: Path):
-        if display_options_path.is_file():
-            with display_options_path.open("r") as file:
-                return yaml.safe_load(file)
-
-        if display_options_path != Path():
-            msg = f"No display_options file found: '{display_options_path}'."
-            warnings.warn(msg, RuntimeWarning, stacklevel=2)
-
-        return {}
+            return yaml.safe_load(file) or {}
 
     def _discover_experiments(self):
         experiments_dir = self.directory_path / "experiments"
         for path in experiments_dir.iterdir():
             if path.is_dir():
-                experiment_dir = self.directory_path / path
-                yield experiment_dir
+                yield path
+
+
+def read_display_options(display_options_path: Path):
+    if display_options_path.is_file():
+        with display_options_path.open("r") as file:
+            return yaml.safe_load(file)
+
+    if display_options_path != Path():
+        msg = f"No display_options file found: '{display_options_path}'."
+        warnings.warn(msg, RuntimeWarning, stacklevel=2)
+
+    return {}
+
+
+def _load_timestep(timestep: Timestep) -> Timestep:
+    timestep.load()
+
+    return timestep
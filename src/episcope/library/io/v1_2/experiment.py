@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import warnings
+from collections.abc import Collection
 from pathlib import Path
 from typing import TypedDict
 
 import yaml
 
+from episcope.library.io.cache import ParseCache
 from episcope.library.io.v1_2.timestep import Timestep
 
 
@@ -15,12 +17,35 @@ class ExperimentMeta(TypedDict):
     desc: str
 
 
+class RefreshChanges(TypedDict):
+    added: list[str]
+    modified: list[str]
+    removed: list[str]
+
+
+class TimestepUpdates(TypedDict):
+    added: dict[str, Timestep]
+    modified: dict[str, Timestep]
+    removed: list[str]
+
+
 class Experiment:
-    def __init__(self, directory_path: str | Path) -> None:
+    def __init__(
+        self,
+        directory_path: str | Path,
+        lazy: bool = False,
+        cache: ParseCache | None = None,
+        track_chromosomes: Collection[str] | None = None,
+    ) -> None:
         """Initializes the Experiment with a directory path.
 
         Args:
             directory_path (str): The path to the directory containing the models.
+            lazy (bool): If True, the timesteps only parse their files on demand.
+            cache (ParseCache): An optional persistent cache of parsed files.
+            track_chromosomes (Collection[str]): The chromosomes for which the
+                tracks are loaded, among those of each structure file. Defaults
+                to every chromosome of each structure file.
 
         Raises:
             ValueError: If the provided path is not a directory.
@@ -30,9 +55,91 @@ class Experiment:
             msg = f"The provided path '{directory_path}' is not a directory."
             raise ValueError(msg)
 
+        self._lazy = lazy
+        self._cache = cache
+        self._track_chromosomes = track_chromosomes
+
         self._meta = self._read_meta()
         self._timesteps = {
-            path.name: Timestep(path) for path in self._discover_timesteps()
+            path.name: self._create_timestep(path)
+            for path in self._discover_timesteps()
+        }
+
+    def _create_timestep(self, path: Path, lazy: bool | None = None) -> Timestep:
+        return Timestep(
+            path,
+            lazy=self._lazy if lazy is None else lazy,
+            cache=self._cache,
+            track_chromosomes=self._track_chromosomes,
+        )
+
+    def refresh(self, lazy: bool | None = None) -> RefreshChanges:
+        """Discover the timesteps added, removed or modified since the last refresh.
+
+        New and modified timestep directories are loaded again from scratch,
+        while the other timesteps are kept as they are. Directories without a
+        structure file are skipped, since they are probably still being written;
+        they are picked up by a later refresh.
+
+        Args:
+            lazy: Overrides the laziness of the experiment for the new timesteps.
+
+        Returns:
+            The names of the added, modified and removed timesteps.
+        """
+        return self.apply_changes(self.load_changes(lazy))
+
+    def load_changes(self, lazy: bool | None = None) -> TimestepUpdates:
+        """Load the timesteps added or modified since the last refresh.
+
+        The experiment itself is left unchanged until the updates are passed to
+        apply_changes(), so that it can keep being read while they are loaded.
+
+        Args:
+            lazy: Overrides the laziness of the experiment for the new timesteps.
+
+        Returns:
+            The loaded timesteps, and the names of the removed timesteps.
+        """
+        updates: TimestepUpdates = {"added": {}, "modified": {}, "removed": []}
+
+        paths = {
+            path.name: path
+            for path in self._discover_timesteps()
+            if (path / "structure.csv").is_file()
+        }
+
+        updates["removed"] = sorted(set(self._timesteps) - set(paths))
+
+        for timestep_name, path in sorted(paths.items()):
+            timestep = self._timesteps.get(timestep_name)
+            if timestep is not None and not timestep.is_modified():
+                continue
+
+            kind = "added" if timestep is None else "modified"
+            updates[kind][timestep_name] = self._create_timestep(path, lazy)
+
+        return updates
+
+    def apply_changes(self, updates: TimestepUpdates) -> RefreshChanges:
+        """Replace the timesteps of the experiment with those of load_changes().
+
+        Args:
+            updates: The timesteps returned by load_changes().
+
+        Returns:
+            The names of the added, modified and removed timesteps.
+        """
+        for timestep_name in updates["removed"]:
+            del self._timesteps[timestep_name]
+
+        self._timesteps.update(updates["added"])
+        self._timesteps.update(updates["modified"])
+
+        return {
+            "added": list(updates["added"]),
+            "modified": list(updates["modified"]),
+            "removed": list(updates["removed"]),
         }
 
     def _read_meta(self) -> ExperimentMeta | dict:
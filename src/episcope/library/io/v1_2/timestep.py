@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import csv
+import hashlib
+import threading
+import warnings
+from collections.abc import Callable, Collection
+from functools import partial
 from pathlib import Path
-from typing import TypedDict
+from typing import TypedDict, TypeVar
 
-from episcope.library.io import (
-    LabelPoint,
-    PeakTrackPoint,
-    PointTrackPoint,
-    StructurePoint,
-)
+import numpy as np
+
+from episcope.library.io.cache import ParseCache
+from episcope.library.io.columnar import LABELS_DTYPES, ChromosomeTable
+from episcope.library.io.intervals import IntervalIndex
+from episcope.library.io.manifest import MANIFEST_NAME, Manifest, index_file
+from episcope.library.io.parser import ColumnSpec, Source, read_table
+from episcope.library.io.pyramid import TrackPyramid
+from episcope.library.io.singleflight import SingleFlight
+from episcope.library.io.tabix import TabixFile
+
+_T = TypeVar("_T")
 
 
 class _TimestepMetaTracks(TypedDict):
@@ -56,11 +67,24 @@ class LabelsColumns:
 
 
 class Timestep:
-    def __init__(self, directory_path: str | Path) -> None:
-        """Initializes the Experiment with a directory path.
+    def __init__(
+        self,
+        directory_path: str | Path,
+        lazy: bool = False,
+        cache: ParseCache | None = None,
+        track_chromosomes: Collection[str] | None = None,
+    ) -> None:
+        """Initializes the Timestep with a directory path.
 
         Args:
             directory_path (str): The path to the directory containing the models.
+            lazy (bool): If True, only discover the files in the directory and
+                parse each of them the first time its content is requested.
+            cache (ParseCache): An optional persistent cache of parsed files.
+            track_chromosomes (Collection[str]): The chromosomes for which the
+                tracks are loaded, among those of the structure file. The rows of
+                other chromosomes are skipped while parsing. Defaults to every
+                chromosome of the structure file.
 
         Raises:
             ValueError: If the provided path is not a directory.
@@ -71,32 +95,402 @@ class Timestep:
             msg = f"The provided path '{directory_path}' is not a directory."
             raise ValueError(msg)
 
-        structure_file = self.directory_path / "structure.csv"
-        if not structure_file.is_file():
+        self._cache = cache
+        self._fingerprint = self._scan_fingerprint()
+        self._manifest = Manifest.load(self.directory_path)
+
+        self._structure_file = self.directory_path / "structure.csv"
+        if not self._structure_file.is_file():
             msg = "No structure file (structure.csv) found in the directory."
             raise FileNotFoundError(msg)
 
-        self._structures = self._read_structure(structure_file)
-
-        labels_file = self.directory_path / "labels.csv"
-        if not labels_file.is_file():
-            self._labels = {}
-        else:
-            self._labels = self._read_labels(labels_file)
+        self._labels_file: Path | None = self.directory_path / "labels.csv"
+        if not self._labels_file.is_file():
+            self._labels_file = None
 
-        self._peak_tracks = {
-            track_stem: self._read_peak_track(track_path)
+        self._peak_track_files = {
+            track_stem: track_path
             for track_path, track_stem in self._discover_files("narrowPeak")
         }
 
-        self._point_tracks = {
-            track_stem: self._read_point_track(track_path)
+        self._point_track_files = {
+            track_stem: track_path
             for track_path, track_stem in self._discover_files("bed")
         }
 
+        self._requested_track_chromosomes: frozenset[str] | None = (
+            None if track_chromosomes is None else frozenset(track_chromosomes)
+        )
+        self._track_chromosomes: frozenset[str] | None = None
+        self._chromosomes: set[str] | None = None
+        # the loaded structures and labels, indexed by 'structure' and 'labels'
+        self._tables: dict[str, ChromosomeTable] = {}
+        self._peak_tracks: dict[str, ChromosomeTable] = {}
+        self._point_tracks: dict[str, ChromosomeTable] = {}
+        self._peak_track_indexes: dict[str, IntervalIndex] = {}
+        self._point_track_indexes: dict[str, IntervalIndex] = {}
+        self._peak_track_pyramids: dict[str, TrackPyramid] = {}
+        self._point_track_pyramids: dict[str, TrackPyramid] = {}
+        # the indexes of the compressed tracks, kept when the timestep is unloaded
+        self._tabix_files: dict[str, TabixFile] = {}
+
+        # guards the dictionaries of loaded content, which may be used by
+        # several threads, while each file is only loaded by one of them
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+        # called without holding the lock every time an item has been loaded,
+        # e.g. to enforce a memory budget on the loaded content
+        self.on_load: Callable[[], None] | None = None
+
+        if not lazy:
+            self.load()
+
+    def load(self) -> None:
+        """Parse every file of the timestep that has not been parsed yet."""
+        self.get_structures()
+        self.get_labels()
+
+        for track_name in self._peak_track_files:
+            self.get_peak_track(track_name)
+
+        for track_name in self._point_track_files:
+            self.get_point_track(track_name)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_flights"]
+        state["on_load"] = None
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes held by the parsed content of the timestep."""
+        with self._lock:
+            items = [
+                *self._tables.values(),
+                *self._peak_tracks.values(),
+                *self._point_tracks.values(),
+                *self._peak_track_indexes.values(),
+                *self._point_track_indexes.values(),
+                *self._peak_track_pyramids.values(),
+                *self._point_track_pyramids.values(),
+            ]
+
+        return sum(item.nbytes for item in items)
+
+    def unload(self) -> None:
+        """Release the parsed content of the timestep.
+
+        The files are parsed again, or read from the parse cache, the next time
+        their content is requested.
+        """
+        with self._lock:
+            structures = self._tables.get("structure")
+            if structures is not None:
+                self._chromosomes = set(structures)
+
+            self._tables.clear()
+            self._peak_tracks.clear()
+            self._point_tracks.clear()
+            self._peak_track_indexes.clear()
+            self._point_track_indexes.clear()
+            self._peak_track_pyramids.clear()
+            self._point_track_pyramids.clear()
+
+    def is_modified(self) -> bool:
+        """Whether files were added, removed or modified in the directory since it was loaded."""
+        return self._scan_fingerprint() != self._fingerprint
+
+    def _scan_fingerprint(self) -> dict[str, tuple[int, int]]:
+        """The size and modification time of every data file in the directory."""
+        fingerprint = {}
+        for path in self.directory_path.iterdir():
+            if path.name == MANIFEST_NAME:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            fingerprint[path.name] = (stat.st_size, stat.st_mtime_ns)
+
+        return fingerprint
+
+    @property
+    def chromosomes(self) -> set[str]:
+        """The set of chromosomes that have a structure in this timestep.
+
+        When the structure file has not been parsed yet, it is memory-mapped
+        from the parse cache if possible, otherwise its chromosomes are taken
+        from the index of the timestep, or only its chromosome column is scanned.
+        """
+        structures = self._tables.get("structure")
+        if structures is None and self._chromosomes is None and self._cache is not None:
+            structures = self._cache.get(self._structure_file, "structure")
+            if structures is not None:
+                with self._lock:
+                    structures = self._tables.setdefault("structure", structures)
+
+        if structures is not None:
+            return set(structures)
+
+        if self._chromosomes is None and self._manifest is not None:
+            self._chromosomes = self._manifest.chromosomes(self._structure_file)
+
+        if self._chromosomes is None:
+            self._chromosomes = self._scan_structure_chromosomes(self._structure_file)
+
+        return self._chromosomes
+
+    @property
+    def track_chromosomes(self) -> frozenset[str]:
+        """The set of chromosomes for which the tracks are loaded."""
+        if self._track_chromosomes is None:
+            track_chromosomes = frozenset(self.chromosomes)
+            if self._requested_track_chromosomes is not None:
+                track_chromosomes &= self._requested_track_chromosomes
+            self._track_chromosomes = track_chromosomes
+
+        return self._track_chromosomes
+
+    @property
+    def peak_track_names(self) -> set[str]:
+        return set(self._peak_track_files)
+
+    @property
+    def point_track_names(self) -> set[str]:
+        return set(self._point_track_files)
+
+    def get_structures(self) -> ChromosomeTable:
+        return self._get(
+            self._tables,
+            "structure",
+            lambda: self._read(self._structure_file, "structure", self._read_structure),
+        )
+
+    def get_labels(self) -> ChromosomeTable:
+        if self._labels_file is None:
+            return self._get(
+                self._tables,
+                "labels",
+                lambda: ChromosomeTable.from_groups({}, LABELS_DTYPES),
+            )
+
+        return self._get(
+            self._tables,
+            "labels",
+            lambda: self._read(self._labels_file, "labels", self._read_labels),
+        )
+
+    def get_peak_track(self, track_name: str) -> ChromosomeTable:
+        return self._get(
+            self._peak_tracks,
+            track_name,
+            lambda: self._read(
+                self._peak_track_files[track_name],
+                self._track_kind("peak"),
+                self._read_peak_track,
+            ),
+        )
+
+    def get_peak_track_index(self, track_name: str) -> IntervalIndex:
+        return self._get(
+            self._peak_track_indexes,
+            track_name,
+            lambda: IntervalIndex(self.get_peak_track(track_name)),
+        )
+
+    def get_peak_track_range(
+        self, track_name: str, chromosome: str, start: int, end: int
+    ) -> dict[str, np.ndarray]:
+        """Get the rows of a peak track overlapping the range [start, end) of a chromosome.
+
+        A compressed and indexed track that is not loaded is not parsed whole:
+        only the records overlapping the range are read, from the blocks of the
+        file that may hold them.
+
+        Returns:
+            The overlapping rows of every column of the track, sorted by start.
+        """
+        path = self._peak_track_files[track_name]
+        if path.suffix != ".gz" or track_name in self._peak_tracks:
+            return self.get_peak_track_index(track_name).select(chromosome, start, end)
+
+        table = self._read_peak_track(
+            path, self.track_chromosomes & {chromosome}, (start, end)
+        )
+
+        return IntervalIndex(table).select(chromosome, start, end)
+
+    def get_point_track(self, track_name: str) -> ChromosomeTable:
+        return self._get(
+            self._point_tracks,
+            track_name,
+            lambda: self._read(
+                self._point_track_files[track_name],
+                self._track_kind("point"),
+                self._read_point_track,
+            ),
+        )
+
+    def get_point_track_index(self, track_name: str) -> IntervalIndex:
+        return self._get(
+            self._point_track_indexes,
+            track_name,
+            lambda: IntervalIndex(self.get_point_track(track_name)),
+        )
+
+    def get_point_track_range(
+        self, track_name: str, chromosome: str, start: int, end: int
+    ) -> dict[str, np.ndarray]:
+        """Get the rows of a point track overlapping the range [start, end) of a chromosome.
+
+        See get_peak_track_range().
+        """
+        path = self._point_track_files[track_name]
+        if path.suffix != ".gz" or track_name in self._point_tracks:
+            return self.get_point_track_index(track_name).select(chromosome, start, end)
+
+        table = self._read_point_track(
+            path, self.track_chromosomes & {chromosome}, (start, end)
+        )
+
+        return IntervalIndex(table).select(chromosome, start, end)
+
+    def get_peak_track_pyramid(self, track_name: str) -> TrackPyramid:
+        return self._get(
+            self._peak_track_pyramids,
+            track_name,
+            lambda: self._read_pyramid(
+                self._peak_track_files[track_name],
+                f"{self._track_kind('peak')}-pyramid",
+                lambda: self.get_peak_track(track_name),
+            ),
+        )
+
+    def get_point_track_pyramid(self, track_name: str) -> TrackPyramid:
+        return self._get(
+            self._point_track_pyramids,
+            track_name,
+            lambda: self._read_pyramid(
+                self._point_track_files[track_name],
+                f"{self._track_kind('point')}-pyramid",
+                lambda: self.get_point_track(track_name),
+            ),
+        )
+
+    def _get(self, items: dict[str, _T], name: str, load: Callable[[], _T]) -> _T:
+        """Get an item of the loaded content, loading it if needed.
+
+        When several threads request an item that is not loaded, only one of
+        them loads it, and the others wait for the result.
+
+        Args:
+            items (dict): The loaded items of one kind, indexed by name.
+            name (str): The name of the item.
+            load (Callable): The function loading the item.
+
+        Returns:
+            The item.
+        """
+        item = items.get(name)
+        if item is not None:
+            return item
+
+        return self._flights.do(
+            (id(items), name), lambda: self._load(items, name, load)
+        )
+
+    def _load(self, items: dict[str, _T], name: str, load: Callable[[], _T]) -> _T:
+        with self._lock:
+            item = items.get(name)
+
+        # the item may have been loaded by a flight that just completed
+        if item is None:
+            item = load()
+            with self._lock:
+                items[name] = item
+
+            if self.on_load is not None:
+                self.on_load()
+
+        return item
+
+    def _read(
+        self, path: Path, kind: str, reader: Callable[[Path], ChromosomeTable]
+    ) -> ChromosomeTable:
+        """Read a file through the parse cache, if any.
+
+        Args:
+            path (Path): The path of the file.
+            kind (str): The kind of content of the file, used as part of the cache key.
+            reader (Callable): The function parsing the file when it is not cached.
+
+        Returns:
+            ChromosomeTable: The content of the file.
+        """
+        if self._cache is not None:
+            table = self._cache.get(path, kind)
+            if table is not None:
+                return table
+
+        table = reader(path)
+
+        if self._cache is not None:
+            self._cache.put(path, kind, table)
+
+        return table
+
+    def _read_pyramid(
+        self, path: Path, kind: str, get_track: Callable[[], ChromosomeTable]
+    ) -> TrackPyramid:
+        """Build the zoom levels of a track, or read them from the parse cache.
+
+        Args:
+            path (Path): The path of the track file.
+            kind (str): The kind of the zoom levels, used as part of the cache key.
+            get_track (Callable): The function returning the parsed track.
+
+        Returns:
+            TrackPyramid: The zoom levels of the track.
+        """
+        if self._cache is not None:
+            levels = self._cache.get_tables(path, kind)
+            if levels is not None:
+                return TrackPyramid(
+                    {int(shift): level for shift, level in levels.items()}
+                )
+
+        pyramid = TrackPyramid.build(get_track())
+
+        if self._cache is not None:
+            self._cache.put_tables(
+                path,
+                kind,
+                {str(shift): level for shift, level in pyramid.levels.items()},
+            )
+
+        return pyramid
+
+    def _track_kind(self, kind: str) -> str:
+        """The cache kind of a track, which depends on the chromosomes it is restricted to."""
+        key = "\0".join(sorted(self.track_chromosomes)).encode()
+
+        return f"{kind}-{hashlib.sha256(key).hexdigest()[:16]}"
+
     def _discover_files(self, extension: str):
         """Discover files with a specific extension in the timestep directory.
 
+        Files compressed with bgzip and indexed with tabix (e.g. 'ATAC.narrowPeak.gz'
+        along with 'ATAC.narrowPeak.gz.tbi') are discovered as well.
+
         Args:
             extension (str): The file extension to look for (e.g., 'narrowPeak').
 
@@ -107,37 +501,142 @@ class Timestep:
             if file_path.is_file():
                 yield (file_path, file_path.stem)
 
-    def _read_structure(self, path: Path):
-        chromosome_structures: dict[str, list[StructurePoint]] = {}
-
-        with path.open("r") as file:
-            structure_reader = csv.reader(file)
-
-            # skip header line
-            structure_reader.__next__()
-
-            for line in structure_reader:
-                assert len(line) == StructureColumns.N_COLUMNS
-
-                chromosome = line[StructureColumns.CHROMOSOME]
-                index = int(float(line[StructureColumns.INDEX]))
-                x = float(line[StructureColumns.X])
-                y = float(line[StructureColumns.Y])
-                z = float(line[StructureColumns.Z])
+        for file_path in self.directory_path.glob(f"*.{extension}.gz"):
+            if not file_path.is_file():
+                continue
+
+            if not file_path.with_name(f"{file_path.name}.tbi").is_file():
+                msg = f"No tabix index found for '{file_path}', the file is ignored."
+                warnings.warn(msg, RuntimeWarning, stacklevel=2)
+                continue
+
+            yield (file_path, file_path.name[: -len(f".{extension}.gz")])
+
+    def _track_source(
+        self,
+        path: Path,
+        chromosomes: Collection[str],
+        region: tuple[int, int] | None = None,
+    ) -> Source:
+        """The content of a track file to parse, limited to some chromosomes.
+
+        For compressed and indexed files, only the blocks holding the lines of
+        the chromosomes, or of their region [start, end) if given, are
+        decompressed. For files in the index of the timestep, only the lines of
+        the chromosomes are read.
+        """
+        if path.suffix != ".gz":
+            if self._manifest is not None:
+                # a file holding only these chromosomes is parsed faster whole
+                file_chromosomes = self._manifest.chromosomes(path)
+                if file_chromosomes is not None and not file_chromosomes <= set(
+                    chromosomes
+                ):
+                    content = self._manifest.read(path, chromosomes)
+                    if content is not None:
+                        return content
+
+            return path
+
+        tabix_file = self._get(self._tabix_files, path.name, lambda: TabixFile(path))
+        start, end = (None, None) if region is None else region
+
+        return b"".join(
+            tabix_file.fetch(chromosome, start, end)
+            for chromosome in tabix_file.chromosomes
+            if chromosome in chromosomes
+        )
+
+    def build_manifest(self) -> Manifest:
+        """Index the uncompressed structure, labels and track files of the timestep.
+
+        Every file is parsed, including the rows of the chromosomes outside of
+        the track chromosomes, to count the rows and find the range of the
+        columns of each chromosome.
+
+        Returns:
+            The Manifest of the timestep, which is not written.
+        """
+        files = {
+            self._structure_file.name: index_file(
+                self._structure_file,
+                lambda _: self._read_structure(self._structure_file),
+                delimiter=",",
+                skip_header=True,
+                quotechar='"',
+            )
+        }
 
-                structure = chromosome_structures.setdefault(chromosome, [])
+        if self._labels_file is not None:
+            files[self._labels_file.name] = index_file(
+                self._labels_file,
+                lambda _: self._read_labels(self._labels_file),
+                delimiter=",",
+                quotechar='"',
+            )
+
+        for path in self._peak_track_files.values():
+            if path.suffix != ".gz":
+                files[path.name] = index_file(
+                    path,
+                    partial(self._read_peak_track, path),
+                    delimiter="\t",
+                )
 
-                structure.append(
-                    {
-                        "index": index,
-                        "position": (x, y, z),
-                    }
+        for path in self._point_track_files.values():
+            if path.suffix != ".gz":
+                files[path.name] = index_file(
+                    path,
+                    partial(self._read_point_track, path),
+                    delimiter="\t",
                 )
 
-        return chromosome_structures
+        return Manifest(
+            self.directory_path,
+            {name: entry for name, entry in files.items() if entry is not None},
+        )
+
+    def _scan_structure_chromosomes(self, path: Path) -> set[str]:
+        chromosomes = set()
 
-    def _read_labels(self, path: Path):
-        chromosome_labels: dict[str, list[LabelPoint]] = {}
+        with path.open("r") as file:
+            # skip header line
+            file.readline()
+
+            for line in file:
+                # the names are quoted in some files, as read by _read_structure
+                chromosome = line.split(",", 1)[0].strip('"')
+                if chromosome.strip():
+                    chromosomes.add(chromosome)
+
+        return chromosomes
+
+    def _read_structure(self, path: Path) -> ChromosomeTable:
+        table = read_table(
+            path,
+            delimiter=",",
+            n_columns=StructureColumns.N_COLUMNS,
+            chromosome_column=StructureColumns.CHROMOSOME,
+            columns={
+                "index": ColumnSpec(StructureColumns.INDEX, np.int64),
+                "x": ColumnSpec(StructureColumns.X, np.float64),
+                "y": ColumnSpec(StructureColumns.Y, np.float64),
+                "z": ColumnSpec(StructureColumns.Z, np.float64),
+            },
+            skip_header=True,
+            quotechar='"',
+        )
+
+        columns = table.columns
+        position = np.column_stack(
+            (columns.pop("x"), columns.pop("y"), columns.pop("z"))
+        )
+        columns["position"] = position
+
+        return table
+
+    def _read_labels(self, path: Path) -> ChromosomeTable:
+        chromosome_labels: dict[str, dict[str, list]] = {}
 
         with path.open("r") as file:
             labels_reader = csv.reader(file)
@@ -152,70 +651,63 @@ class Timestep:
                 index = int(float(line[LabelsColumns.INDEX]))
                 text = line[LabelsColumns.TEXT]
 
-                labels = chromosome_labels.setdefault(chromosome, [])
-
-                labels.append(
-                    {
-                        "index": index,
-                        "text": text,
-                    }
-                )
-
-        return chromosome_labels
-
-    def _read_peak_track(self, path: Path):
-        chromosome_track: dict[str, list[PeakTrackPoint]] = {}
-
-        with path.open("r") as file:
-            track_reader = csv.reader(file, delimiter="\t")
-
-            for line in track_reader:
-                assert len(line) == PeakTrackColumns.N_COLUMNS
-
-                chromosome = line[PeakTrackColumns.CHROMOSOME]
-                start = int(float(line[PeakTrackColumns.START]))
-                end = int(float(line[PeakTrackColumns.END]))
-                value = float(line[PeakTrackColumns.VALUE])
-                summit = start + int(float(line[PeakTrackColumns.SUMMIT]))
-
-                track = chromosome_track.setdefault(chromosome, [])
-
-                track.append(
-                    {
-                        "start": start,
-                        "end": end,
-                        "summit": summit,
-                        "value": value,
-                    }
-                )
-
-        return chromosome_track
-
-    def _read_point_track(self, path: Path):
-        chromosome_track: dict[str, list[PointTrackPoint]] = {}
-
-        with path.open("r") as file:
-            track_reader = csv.reader(file, delimiter="\t")
-
-            for line in track_reader:
-                assert len(line) == PointTrackColumns.N_COLUMNS
-
-                chromosome = line[PointTrackColumns.CHROMOSOME]
-                start = int(float(line[PointTrackColumns.START]))
-                end = int(float(line[PointTrackColumns.END]))
-                try:
-                    value = float(line[PointTrackColumns.VALUE])
-                except ValueError:
-                    continue
-
-                track = chromosome_track.setdefault(chromosome, [])
-
-                track.append(
-                    {
-                        "start": start,
-                        "end": end,
-                        "value": value,
-                    }
+                labels = chromosome_labels.setdefault(
+                    chromosome, {"index": [], "text": []}
                 )
 
-        return chromosome_track
+                labels["index"].append(index)
+                labels["text"].append(text)
+
+        return ChromosomeTable.from_groups(chromosome_labels, LABELS_DTYPES)
+
+    def _read_peak_track(
+        self,
+        path: Path,
+        chromosomes: frozenset[str] | None = None,
+        region: tuple[int, int] | None = None,
+    ) -> ChromosomeTable:
+        if chromosomes is None:
+            chromosomes = self.track_chromosomes
+
+        table = read_table(
+            self._track_source(path, chromosomes, region),
+            delimiter="\t",
+            n_columns=PeakTrackColumns.N_COLUMNS,
+            chromosome_column=PeakTrackColumns.CHROMOSOME,
+            columns={
+                "start": ColumnSpec(PeakTrackColumns.START, np.int64),
+                "end": ColumnSpec(PeakTrackColumns.END, np.int64),
+                "summit": ColumnSpec(PeakTrackColumns.SUMMIT, np.int64),
+                "value": ColumnSpec(PeakTrackColumns.VALUE, np.float64),
+            },
+            chromosomes=chromosomes,
+        )
+
+        # the summit column holds the position of the summit relative to the start
+        table.columns["summit"] += table.columns["start"]
+
+        return table
+
+    def _read_point_track(
+        self,
+        path: Path,
+        chromosomes: frozenset[str] | None = None,
+        region: tuple[int, int] | None = None,
+    ) -> ChromosomeTable:
+        if chromosomes is None:
+            chromosomes = self.track_chromosomes
+
+        return read_table(
+            self._track_source(path, chromosomes, region),
+            delimiter="\t",
+            n_columns=PointTrackColumns.N_COLUMNS,
+            chromosome_column=PointTrackColumns.CHROMOSOME,
+            columns={
+                "start": ColumnSpec(PointTrackColumns.START, np.int64),
+                "end": ColumnSpec(PointTrackColumns.END, np.int64),
+                "value": ColumnSpec(
+                    PointTrackColumns.VALUE, np.float64, skip_invalid=True
+                ),
+            },
+            chromosomes=chromosomes,
+        )
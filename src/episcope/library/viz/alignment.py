@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 
-from episcope.library.io import StructurePoint
+from episcope.library.io import StructureArrays
 
 
 def compute_similarity_transform(A: np.ndarray, B: np.ndarray):
@@ -42,20 +42,19 @@ def apply_similarity_transformation(points, s, R, t):
     return s * np.dot(points, R.T) + t
 
 
-def align_structures(A: list[StructurePoint], B: list[StructurePoint], n_samples: int):
-    n_samples = min(n_samples, len(A), len(B))
+def align_structures(A: StructureArrays, B: StructureArrays, n_samples: int):
+    A_positions = A["position"]
+    B_positions = B["position"]
 
-    A_spacing = len(A) // n_samples
-    A_sampled = A[slice(0, A_spacing * n_samples, A_spacing)]
-    B_spacing = len(B) // n_samples
-    B_sampled = B[slice(0, B_spacing * n_samples, B_spacing)]
+    n_samples = min(n_samples, len(A_positions), len(B_positions))
 
-    assert len(A_sampled) == n_samples
-    assert len(B_sampled) == n_samples
+    A_spacing = len(A_positions) // n_samples
+    A_sampled_positions = A_positions[0 : A_spacing * n_samples : A_spacing]
+    B_spacing = len(B_positions) // n_samples
+    B_sampled_positions = B_positions[0 : B_spacing * n_samples : B_spacing]
 
-    A_positions = np.array([point["position"] for point in A])
-    A_sampled_positions = np.array([point["position"] for point in A_sampled])
-    B_sampled_positions = np.array([point["position"] for point in B_sampled])
+    assert len(A_sampled_positions) == n_samples
+    assert len(B_sampled_positions) == n_samples
 
     # Compute the similarity transformation
     scale, R, t = compute_similarity_transform(A_sampled_positions, B_sampled_positions)
@@ -63,12 +62,9 @@ def align_structures(A: list[StructurePoint], B: list[StructurePoint], n_samples
     # Apply the transformation to A's positions
     transformed_A_positions = apply_similarity_transformation(A_positions, scale, R, t)
 
-    transformed_A: list[StructurePoint] = []
-    for structure_point, transformed_point in zip(
-        A, transformed_A_positions, strict=False
-    ):
-        transformed_A.append(
-            {"index": structure_point["index"], "position": tuple(transformed_point)}
-        )
+    transformed_A: StructureArrays = {
+        "index": A["index"],
+        "position": transformed_A_positions,
+    }
 
     return transformed_A
@@ -1,11 +1,172 @@
 from __future__ import annotations
 
-from typing import TypedDict
+import numpy as np
 
-from vtkmodules.vtkCommonComputationalGeometry import vtkCardinalSpline
 
+class CardinalSplines:
+    """Cardinal splines interpolating the x, y and z coordinates of a structure.
 
-class CardinalSplines(TypedDict):
-    x: vtkCardinalSpline
-    y: vtkCardinalSpline
-    z: vtkCardinalSpline
+    The curve is the one of three vtkCardinalSpline with their default settings
+    (open, with a zero first derivative at both ends), parametrized by the base
+    pair index of the structure points. The coefficients of the three splines
+    are computed once when the points are set, and any number of indices are
+    then evaluated in a single vectorized call.
+    """
+
+    def __init__(self) -> None:
+        self._knots = np.zeros(0, dtype=np.float64)
+        self._coefficients = np.zeros((0, 4, 3), dtype=np.float64)
+
+    def set_points(self, indices: np.ndarray, positions: np.ndarray) -> None:
+        """Fit the splines to the points of a structure.
+
+        As with vtkCardinalSpline.AddPoint, points are sorted by index, and the
+        last position given for an index replaces the previous ones.
+
+        Args:
+            indices: The base pair index of each point, with shape (N,).
+            positions: The coordinates of each point, with shape (N, 3).
+        """
+        indices = np.asarray(indices, dtype=np.float64)
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+
+        order = np.argsort(indices, kind="stable")
+        indices = indices[order]
+        positions = positions[order]
+        is_last = np.append(indices[1:] != indices[:-1], True)
+
+        self._knots = indices[is_last]
+        self._coefficients = _fit(self._knots, positions[is_last])
+
+    @property
+    def knots(self) -> np.ndarray:
+        """The sorted, distinct base pair indices of the points of the splines."""
+        return self._knots
+
+    def second_derivative_bounds(self) -> np.ndarray:
+        """The largest norm of the second derivative of the curve on each interval.
+
+        The second derivative of a cubic is linear, so its norm is the largest
+        at one of the ends of the interval.
+
+        Returns:
+            The bound of each interval between consecutive knots, with shape
+            (N - 1,).
+        """
+        c = self._coefficients
+        h = np.diff(self._knots)[:, np.newaxis]
+
+        at_start = 2.0 * c[:, 2]
+        at_end = at_start + 6.0 * h * c[:, 3]
+
+        return np.maximum(
+            np.linalg.norm(at_start, axis=1), np.linalg.norm(at_end, axis=1)
+        )
+
+    def evaluate(self, indices: np.ndarray) -> np.ndarray:
+        """Evaluate the splines at base pair indices.
+
+        Indices outside of the structure are clamped to its first and last
+        points, as vtkCardinalSpline.Evaluate does.
+
+        Args:
+            indices: The base pair indices to evaluate, with shape (M,).
+
+        Returns:
+            The coordinates of the curve at each index, with shape (M, 3). They
+            are all zero if the splines have less than two points.
+        """
+        indices = np.asarray(indices, dtype=np.float64).reshape(-1)
+        knots = self._knots
+
+        if len(knots) < 2:
+            return np.zeros((len(indices), 3), dtype=np.float64)
+
+        t = np.clip(indices, knots[0], knots[-1])
+        # an index on a knot belongs to the interval ending there, as in vtkSpline.FindIndex
+        intervals = np.clip(
+            np.searchsorted(knots, t, side="left") - 1, 0, len(knots) - 2
+        )
+        t = (t - knots[intervals])[:, np.newaxis]
+
+        c = self._coefficients[intervals]
+
+        return t * (t * (t * c[:, 3] + c[:, 2]) + c[:, 1]) + c[:, 0]
+
+
+def _fit(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Compute the cubic coefficients of the intervals of open cardinal splines.
+
+    Follows vtkCardinalSpline.Fit1D, with the slope constrained to zero at both
+    ends: the first derivatives at the knots solve a tridiagonal system, from
+    which the coefficients of each interval follow.
+
+    Args:
+        x: The sorted, distinct knots, with shape (N,).
+        y: The values of the splines at the knots, with shape (N, 3).
+
+    Returns:
+        The coefficients c such that the splines are
+        c[k, 0] + c[k, 1] t + c[k, 2] t^2 + c[k, 3] t^3 at x[k] + t, with shape
+        (N - 1, 4, 3).
+    """
+    size = len(x)
+    if size < 2:
+        return np.zeros((0, 4, 3), dtype=np.float64)
+
+    xlk = np.diff(x)
+    dy = np.diff(y, axis=0)
+
+    # the band matrix: zero slope constraints at both ends, and the body
+    lower = np.zeros(size)
+    diagonal = np.ones(size)
+    upper = np.zeros(size)
+    work = np.zeros((size, 3))
+
+    lower[1:-1] = xlk[1:]
+    diagonal[1:-1] = 2.0 * (xlk[1:] + xlk[:-1])
+    upper[1:-1] = xlk[:-1]
+    work[1:-1] = 3.0 * (
+        (xlk[1:, np.newaxis] * dy[:-1]) / xlk[:-1, np.newaxis]
+        + (xlk[:-1, np.newaxis] * dy[1:]) / xlk[1:, np.newaxis]
+    )
+
+    # solve the tridiagonal system, the recurrences run on python floats
+    a = lower.tolist()
+    b = diagonal.tolist()
+    c = upper.tolist()
+    w = work.tolist()
+
+    c[0] = c[0] / b[0]
+    w[0] = [value / b[0] for value in w[0]]
+    c[-1] = 0.0
+
+    for k in range(1, size):
+        b[k] = b[k] - a[k] * c[k - 1]
+        c[k] = c[k] / b[k]
+        w[k] = [
+            (value - a[k] * previous) / b[k]
+            for value, previous in zip(w[k], w[k - 1], strict=True)
+        ]
+
+    for k in range(size - 2, -1, -1):
+        w[k] = [
+            value - c[k] * following
+            for value, following in zip(w[k], w[k + 1], strict=True)
+        ]
+
+    # the first derivatives at the knots give the cubic of each interval
+    derivatives = np.array(w)
+    h = xlk[:, np.newaxis]
+
+    coefficients = np.empty((size - 1, 4, 3), dtype=np.float64)
+    coefficients[:, 0] = y[:-1]
+    coefficients[:, 1] = derivatives[:-1]
+    coefficients[:, 2] = (3.0 * dy) / (h * h) - (
+        derivatives[1:] + 2.0 * derivatives[:-1]
+    ) / h
+    coefficients[:, 3] = (2.0 * -dy) / (h * h * h) + (
+        derivatives[1:] + derivatives[:-1]
+    ) / (h * h)
+
+    return coefficients
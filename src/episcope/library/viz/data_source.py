@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import numpy as np
 from paraview import simple
-from vtkmodules.vtkCommonCore import vtkFloatArray, vtkPoints, vtkStringArray
-from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData, vtkPolyLine
-from vtkmodules.vtkIOXML import vtkXMLPolyDataWriter
+from vtkmodules.vtkCommonCore import vtkStringArray
 
-from episcope.library.io import LabelPoint, PeakTrackPoint, PointTrackPoint
+from episcope.library.io import LabelPoint, PeakTrackArrays, PointTrackArrays
 from episcope.library.viz.common import CardinalSplines
+from episcope.library.viz.geometry import build_polydata, polyline_offsets
+from episcope.library.viz.sampling import (
+    adaptive_samples,
+    resample_intervals,
+    resample_profiles,
+)
 
 
 class DataSource:
@@ -36,10 +41,20 @@ class StructureSource(DataSource):
     using cardinal splines for smooth curve representation.
     """
 
-    def __init__(self):
-        """Initialize the StructureSource with default values."""
+    def __init__(self, tolerance: float | None = None, max_points: int | None = None):
+        """Initialize the StructureSource with default values.
+
+        Args:
+            tolerance: If set, the structure is resampled adaptively instead of
+                at a fixed spacing, so that the polyline stays within this
+                fraction of the size of the structure from the spline.
+            max_points: If set, the structure is resampled adaptively with at
+                most this number of points.
+        """
         self._data = None
         self._max_distance = -1
+        self._tolerance = tolerance
+        self._max_points = max_points
         self._splines: CardinalSplines | None = None
         self._output = simple.TrivialProducer()
 
@@ -59,20 +74,22 @@ class StructureSource(DataSource):
         """Set the cardinal splines for 3D coordinate interpolation.
 
         Args:
-            splines: A dictionary containing x, y, and z splines for coordinate
-                interpolation.
+            splines: The splines interpolating the x, y, and z coordinates of
+                the structure.
         """
         self._splines = splines
 
-    def set_data(self, data: list[int], max_distance: int):
+    def set_data(self, data: np.ndarray, max_distance: int):
         """Set the structure data and generate VTK polydata for visualization.
 
         This method processes genomic indices to create a smooth 3D curve representation
         using cardinal splines. If max_distance is positive, it interpolates points
-        between consecutive indices.
+        between consecutive indices, either at that spacing or, if the source was
+        created with a tolerance or a maximum number of points, more densely where
+        the curve bends and more sparsely where it is straight.
 
         Args:
-            data: A list of base pair indices representing the chromosome structure.
+            data: An array of base pair indices representing the chromosome structure.
             max_distance: The maximum distance between interpolated points. If <= 0,
                 no interpolation occurs and all original points are used.
 
@@ -86,47 +103,37 @@ class StructureSource(DataSource):
         self._data = data
         self._max_distance = max_distance
 
-        polydata = vtkPolyData()
-        points = vtkPoints()
-        line = vtkPolyLine()
-        cells = vtkCellArray()
+        structure_indices = np.asarray(data)
 
-        if max_distance <= 0 or len(data) < 2:
-            indices = data
+        if max_distance <= 0 or len(structure_indices) < 2:
+            indices = structure_indices
+        elif self._tolerance is not None or self._max_points is not None:
+            indices = self._adaptive_indices()
         else:
-            indices = []
-            for i in range(len(data) - 1):
-                index = data[i]
-                while index < data[i + 1]:
-                    indices.append(index)
-                    index += max_distance
-
-        points.SetNumberOfPoints(len(indices))
-        line.GetPointIds().SetNumberOfIds(len(indices))
-
-        x_spline = self._splines["x"]
-        y_spline = self._splines["y"]
-        z_spline = self._splines["z"]
-
-        for i, index in enumerate(indices):
-            points.SetPoint(
-                i,
-                (
-                    x_spline.Evaluate(index),
-                    y_spline.Evaluate(index),
-                    z_spline.Evaluate(index),
-                ),
+            # resample between consecutive points, up to the last one excluded
+            indices, _ = resample_intervals(
+                structure_indices[:-1], structure_indices[1:], max_distance
             )
-            line.GetPointIds().SetId(i, i)
-
-        cells.InsertNextCell(line)
 
-        # Set points, cells (lines), and point data to the output vtkPolyData
-        polydata.SetPoints(points)
-        polydata.SetLines(cells)
+        # a single polyline through all the points
+        polydata = build_polydata(
+            self._splines.evaluate(indices), polyline_offsets([len(indices)])
+        )
 
         self._output.GetClientSideObject().SetOutput(polydata)
 
+    def _adaptive_indices(self) -> np.ndarray:
+        knots = self._splines.knots
+
+        tolerance = None
+        if self._tolerance is not None:
+            size = np.linalg.norm(np.ptp(self._splines.evaluate(knots), axis=0))
+            tolerance = self._tolerance * size if size > 0 else 1.0
+
+        return adaptive_samples(
+            knots, self._splines.second_derivative_bounds(), tolerance, self._max_points
+        )
+
 
 class PeakTrackSource(DataSource):
     """Data source for peak track visualization.
@@ -158,20 +165,22 @@ class PeakTrackSource(DataSource):
         """Set the cardinal splines for 3D coordinate interpolation.
 
         Args:
-            splines: A dictionary containing x, y, and z splines for coordinate
-                interpolation.
+            splines: The splines interpolating the x, y, and z coordinates of
+                the structure.
         """
         self._splines = splines
 
-    def set_data(self, data: list[PeakTrackPoint], max_distance: int):
+    def set_data(self, data: PeakTrackArrays, max_distance: int):
         """Set the peak track data and generate VTK polydata for visualization.
 
         This method processes peak track points to create a 3D representation
         using cardinal splines. Each peak is represented as a triangle with
-        start point (0), summit point (with value), and end point (0).
+        start point (0), summit point (with value), and end point (0). If
+        max_distance is positive, the sides of the triangle are sampled along
+        the spline at that spacing, with the value ramping between the points.
 
         Args:
-            data: A list of PeakTrackPoint objects containing peak information.
+            data: A PeakTrackArrays dictionary containing peak information.
             max_distance: The maximum distance between interpolated points. If <= 0,
                 no interpolation occurs and all original points are used.
 
@@ -185,58 +194,23 @@ class PeakTrackSource(DataSource):
         self._data = data
         self._max_distance = max_distance
 
-        polydata = vtkPolyData()
-        points = vtkPoints()
-        cells = vtkCellArray()
-        pointdata = polydata.GetPointData()
-        array = vtkFloatArray()
-
-        interpolated_data: list[list[tuple[int, float]]] = []
-        n_points = 0
+        # the start (0), summit (value) and end (0) of each peak
+        keys = np.column_stack([data["start"], data["summit"], data["end"]])
+        key_values = np.zeros(keys.shape, dtype=np.float64)
+        key_values[:, 1] = data["value"]
 
         if max_distance <= 0:
-            for peak_point in data:
-                n_points += 3
-                interpolated_data.append(
-                    [
-                        (peak_point["start"], 0),
-                        (peak_point["summit"], peak_point["value"]),
-                        (peak_point["end"], 0),
-                    ]
-                )
+            indices = keys.ravel()
+            values = key_values.ravel()
+            offsets = polyline_offsets(np.full(len(keys), 3))
         else:
-            pass
-
-        x_spline = self._splines["x"]
-        y_spline = self._splines["y"]
-        z_spline = self._splines["z"]
-
-        points.SetNumberOfPoints(n_points)
-        point_id = 0
-
-        array.SetName("scalars")
-        array.SetNumberOfTuples(n_points)
-        array.SetNumberOfComponents(1)
-
-        for segment in interpolated_data:
-            cells.InsertNextCell(len(segment))
-            for index, value in segment:
-                points.SetPoint(
-                    point_id,
-                    (
-                        x_spline.Evaluate(index),
-                        y_spline.Evaluate(index),
-                        z_spline.Evaluate(index),
-                    ),
-                )
-                cells.InsertCellPoint(point_id)
-                array.SetTuple1(point_id, value)
-
-                point_id += 1
-
-        polydata.SetPoints(points)
-        polydata.SetLines(cells)
-        pointdata.AddArray(array)
+            indices, values, offsets = resample_profiles(keys, key_values, max_distance)
+
+        polydata = build_polydata(
+            self._splines.evaluate(indices),
+            offsets,
+            point_data={"scalars": values.astype(np.float32)},
+        )
 
         self._output.GetClientSideObject().SetOutput(polydata)
 
@@ -271,12 +245,12 @@ class PointTrackSource(DataSource):
         """Set the cardinal splines for 3D coordinate interpolation.
 
         Args:
-            splines: A dictionary containing x, y, and z splines for coordinate
-                interpolation.
+            splines: The splines interpolating the x, y, and z coordinates of
+                the structure.
         """
         self._splines = splines
 
-    def set_data(self, data: list[PointTrackPoint], max_distance: int):
+    def set_data(self, data: PointTrackArrays, max_distance: int):
         """Set the point track data and generate VTK polydata for visualization.
 
         This method processes point track data to create a 3D representation
@@ -284,7 +258,7 @@ class PointTrackSource(DataSource):
         positions based on max_distance parameter.
 
         Args:
-            data: A list of PointTrackPoint objects containing point track information.
+            data: A PointTrackArrays dictionary containing point track information.
             max_distance: The maximum distance between interpolated points. If <= 0,
                 no interpolation occurs and only start/end points are used.
 
@@ -298,72 +272,21 @@ class PointTrackSource(DataSource):
         self._data = data
         self._max_distance = max_distance
 
-        polydata = vtkPolyData()
-        points = vtkPoints()
-        cells = vtkCellArray()
-        pointdata = polydata.GetPointData()
-        array = vtkFloatArray()
-
-        interpolated_data: list[list[tuple[int, float]]] = []
-        n_points = 0
-
         if max_distance <= 0:
-            for track_point in data:
-                n_points += 2
-                interpolated_data.append(
-                    [
-                        (track_point["start"], track_point["value"]),
-                        (track_point["end"], track_point["value"]),
-                    ]
-                )
+            indices = np.column_stack((data["start"], data["end"])).ravel()
+            offsets = polyline_offsets(np.full(len(data["start"]), 2))
         else:
-            for track_point in data:
-                index = track_point["start"]
-                segment = []
-                while index < track_point["end"]:
-                    segment.append((index, track_point["value"]))
-                    n_points += 1
-                    index += max_distance
-                segment.append((track_point["end"], track_point["value"]))
-                n_points += 1
-                interpolated_data.append(segment)
-
-        x_spline = self._splines["x"]
-        y_spline = self._splines["y"]
-        z_spline = self._splines["z"]
-
-        points.SetNumberOfPoints(n_points)
-        point_id = 0
-
-        array.SetName("scalars")
-        array.SetNumberOfTuples(n_points)
-        array.SetNumberOfComponents(1)
-
-        # cells.InsertNextCell(n_points)
-        for segment in interpolated_data:
-            cells.InsertNextCell(len(segment))
-            for index, value in segment:
-                points.SetPoint(
-                    point_id,
-                    (
-                        x_spline.Evaluate(index),
-                        y_spline.Evaluate(index),
-                        z_spline.Evaluate(index),
-                    ),
-                )
-                cells.InsertCellPoint(point_id)
-                array.SetTuple1(point_id, value)
-
-                point_id += 1
-
-        polydata.SetPoints(points)
-        polydata.SetLines(cells)
-        pointdata.AddArray(array)
-
-        writer = vtkXMLPolyDataWriter()
-        writer.SetFileName("compartment_point_track.vtp")
-        writer.SetInputData(polydata)
-        writer.Write()
+            indices, offsets = resample_intervals(
+                data["start"], data["end"], max_distance, include_end=True
+            )
+
+        values = np.repeat(data["value"].astype(np.float32), np.diff(offsets))
+
+        polydata = build_polydata(
+            self._splines.evaluate(indices),
+            offsets,
+            point_data={"scalars": values},
+        )
 
         self._output.GetClientSideObject().SetOutput(polydata)
 
@@ -391,22 +314,22 @@ class LabelTrackSource(DataSource):
         """Set the cardinal splines for 3D coordinate interpolation.
 
         Args:
-            splines: A dictionary containing x, y, and z splines for coordinate
-                interpolation.
+            splines: The splines interpolating the x, y, and z coordinates of
+                the structure.
         """
         self._splines = splines
 
     def set_data(self, data: list[LabelPoint], _max_distance: int):
-        """Set the peak track data and generate VTK polydata for visualization.
+        """Set the label data and generate VTK polydata for visualization.
 
-        This method processes peak track points to create a 3D representation
-        using cardinal splines. Each peak is represented as a triangle with
-        start point (0), summit point (with value), and end point (0).
+        This method places each label on the structure using cardinal splines:
+        every label becomes a point at its base pair index, carrying its text
+        in a 'labels' string array.
 
         Args:
-            data: A list of PeakTrackPoint objects containing peak information.
-            max_distance: The maximum distance between interpolated points. If <= 0,
-                no interpolation occurs and all original points are used.
+            data: A list of LabelPoint objects, with the base pair index and the
+                text of each label.
+            max_distance: Unused, labels are never interpolated.
 
         Raises:
             RuntimeError: If splines have not been set before calling this method.
@@ -417,30 +340,15 @@ class LabelTrackSource(DataSource):
 
         self._data = data
 
-        polydata = vtkPolyData()
-        points = vtkPoints()
-        pointdata = polydata.GetPointData()
+        polydata = build_polydata(
+            self._splines.evaluate([label_point["index"] for label_point in data])
+        )
 
         labels = vtkStringArray(name="labels")
         labels.SetNumberOfValues(len(data))
-        points.SetNumberOfPoints(len(data))
-
-        x_spline = self._splines["x"]
-        y_spline = self._splines["y"]
-        z_spline = self._splines["z"]
-
         for i, label_point in enumerate(data):
-            points.SetPoint(
-                i,
-                (
-                    x_spline.Evaluate(label_point["index"]),
-                    y_spline.Evaluate(label_point["index"]),
-                    z_spline.Evaluate(label_point["index"]),
-                ),
-            )
             labels.SetValue(i, label_point["text"])
 
-        polydata.SetPoints(points)
-        pointdata.AddArray(labels)
+        polydata.GetPointData().AddArray(labels)
 
         self._output.GetClientSideObject().SetOutput(polydata)
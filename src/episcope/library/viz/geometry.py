@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+from vtkmodules.util.numpy_support import (
+    get_numpy_array_type,
+    numpy_to_vtk,
+    numpy_to_vtkIdTypeArray,
+)
+from vtkmodules.vtkCommonCore import VTK_ID_TYPE, vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+
+# The NumPy type of the point ids of the cells, matching vtkIdType.
+ID_DTYPE = np.dtype(get_numpy_array_type(VTK_ID_TYPE))
+
+
+def polyline_offsets(lengths: np.ndarray) -> np.ndarray:
+    """The offsets of polylines of the given number of points, laid out one after the other."""
+    offsets = np.zeros(len(lengths) + 1, dtype=ID_DTYPE)
+    np.cumsum(lengths, out=offsets[1:])
+
+    return offsets
+
+
+def build_polydata(
+    points: np.ndarray,
+    line_offsets: np.ndarray | None = None,
+    connectivity: np.ndarray | None = None,
+    point_data: dict[str, np.ndarray] | None = None,
+) -> vtkPolyData:
+    """Build a vtkPolyData of polylines from NumPy arrays, without copying them.
+
+    The VTK arrays of the polydata wrap the buffers of the NumPy arrays. Each
+    VTK array holds a reference to its NumPy array, which stays alive as long
+    as the polydata uses it, so the arrays can be temporaries of the caller.
+    They should not be modified afterwards, since the polydata would change
+    along. Arrays that are not contiguous, or not of a type used by VTK for
+    their role, are converted first, the conversion being the only copy.
+
+    Args:
+        points: The coordinates of the points, with shape (N, 3).
+        line_offsets: The offset of each polyline in the connectivity, followed
+            by the size of the connectivity, with shape (L + 1,). If None, the
+            polydata has no lines.
+        connectivity: The point ids of the polylines, one after the other. If
+            None, the polylines go through all the points in order.
+        point_data: Arrays of one value per point, indexed by name.
+
+    Returns:
+        The vtkPolyData holding the points, the polylines and the point data.
+    """
+    polydata = vtkPolyData()
+
+    points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+    vtk_points = vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(points))
+    polydata.SetPoints(vtk_points)
+
+    if line_offsets is not None:
+        if connectivity is None:
+            connectivity = np.arange(len(points), dtype=ID_DTYPE)
+
+        cells = vtkCellArray()
+        cells.SetData(
+            numpy_to_vtkIdTypeArray(np.ascontiguousarray(line_offsets, dtype=ID_DTYPE)),
+            numpy_to_vtkIdTypeArray(np.ascontiguousarray(connectivity, dtype=ID_DTYPE)),
+        )
+        polydata.SetLines(cells)
+
+    for name, values in (point_data or {}).items():
+        array = numpy_to_vtk(np.ascontiguousarray(values))
+        array.SetName(name)
+        polydata.GetPointData().AddArray(array)
+
+    return polydata
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def resample_intervals(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    spacing: int,
+    include_end: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sample genomic intervals at a regular spacing, all at once.
+
+    The samples of an interval are start, start + spacing, ... up to but
+    excluding its end, so an interval that does not end after its start has no
+    samples. The samples of all the intervals are laid out one after the other,
+    without any per-sample Python loop.
+
+    Args:
+        starts: The first base pair of each interval, with shape (N,).
+        ends: The end of each interval, with shape (N,).
+        spacing: The distance in base pairs between two samples, strictly positive.
+        include_end: If True, the end of each interval is appended to its samples.
+
+    Returns:
+        The indices of the samples, and the offset of the samples of each
+        interval followed by the number of samples, with shape (N + 1,).
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+
+    counts = -(-np.maximum(ends - starts, 0) // spacing)
+    if include_end:
+        counts += 1
+
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    # the rank of each sample in its interval
+    steps = np.arange(offsets[-1], dtype=np.int64)
+    steps -= np.repeat(offsets[:-1], counts)
+
+    indices = np.repeat(starts, counts)
+    indices += steps * spacing
+
+    if include_end:
+        indices[offsets[1:] - 1] = ends
+
+    return indices, offsets
+
+
+def resample_profiles(
+    indices: np.ndarray,
+    values: np.ndarray,
+    spacing: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sample piecewise linear profiles at a regular spacing, all at once.
+
+    Each row is a profile going through key points, such as the start, summit
+    and end of a peak. Every segment between two consecutive keys is sampled
+    from its first key at the spacing, up to but excluding its second key, and
+    always keeps its first key even when it is shorter than the spacing. The
+    last key of the row closes the profile. The values ramp linearly between
+    the keys, so a profile narrower than the spacing keeps only its keys.
+
+    Args:
+        indices: The base pair index of the keys of each profile, with shape
+            (N, K).
+        values: The value of the keys of each profile, with shape (N, K).
+        spacing: The distance in base pairs between two samples, strictly positive.
+
+    Returns:
+        The indices and values of the samples, and the offset of the samples of
+        each profile followed by the number of samples, with shape (N + 1,).
+    """
+    starts = np.asarray(indices, dtype=np.int64)
+    start_values = np.asarray(values, dtype=np.float64)
+
+    # each key starts a piece: a segment up to the next key, or the closing key
+    ends = np.concatenate([starts[:, 1:], starts[:, -1:]], axis=1)
+    end_values = np.concatenate([start_values[:, 1:], start_values[:, -1:]], axis=1)
+    lengths = ends - starts
+
+    counts = np.maximum(-(-lengths // spacing), 1)
+
+    offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+    np.cumsum(counts.sum(axis=1), out=offsets[1:])
+
+    counts = counts.ravel()
+    piece_offsets = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=piece_offsets[1:])
+
+    # the distance of each sample to the start of its piece
+    distances = np.arange(offsets[-1], dtype=np.int64)
+    distances -= np.repeat(piece_offsets, counts)
+    distances *= spacing
+
+    sample_indices = np.repeat(starts.ravel(), counts) + distances
+
+    lengths = np.repeat(lengths.ravel(), counts)
+    ratios = np.divide(
+        distances,
+        lengths,
+        out=np.zeros(len(distances), dtype=np.float64),
+        where=lengths > 0,
+    )
+    start_values = np.repeat(start_values.ravel(), counts)
+    sample_values = start_values + ratios * (
+        np.repeat(end_values.ravel(), counts) - start_values
+    )
+
+    return sample_indices, sample_values, offsets
+
+
+def adaptive_samples(
+    knots: np.ndarray,
+    second_derivative_bounds: np.ndarray,
+    tolerance: float | None = None,
+    max_points: int | None = None,
+) -> np.ndarray:
+    """Sample a curve densely where it bends, and sparsely where it is straight.
+
+    On an interval of length h where the norm of its second derivative is at
+    most M, a curve is within h^2 M / 8 of its chord. Each interval between
+    knots is given the density of samples that keeps this chord error under
+    the tolerance, and the samples are spread evenly over the cumulated
+    density, so they may skip over knots along straight stretches.
+
+    Args:
+        knots: The sorted base pair indices delimiting the intervals of the
+            curve, with shape (K,).
+        second_derivative_bounds: The largest norm of the second derivative of
+            the curve on each interval, with shape (K - 1,).
+        tolerance: The largest distance allowed between the curve and the
+            polyline through its samples. If None, only max_points applies.
+        max_points: The largest number of samples. If the tolerance needs more,
+            the samples are spread the same way with a larger tolerance.
+
+    Returns:
+        The increasing indices of the samples, from the first knot to the last.
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+    bounds = np.asarray(second_derivative_bounds, dtype=np.float64)
+
+    if len(knots) < 2:
+        return knots.copy()
+
+    if tolerance is None and max_points is None:
+        msg = "a tolerance or a maximum number of points is required."
+        raise ValueError(msg)
+    if tolerance is not None and tolerance <= 0:
+        msg = f"the tolerance should be positive, got {tolerance}."
+        raise ValueError(msg)
+
+    # samples per base pair, up to the constant 1 / sqrt(8 tolerance)
+    density = np.sqrt(bounds)
+    cumulated = np.zeros(len(knots), dtype=np.float64)
+    np.cumsum(density * np.diff(knots), out=cumulated[1:])
+    total = cumulated[-1]
+
+    if total <= 0:
+        # a straight line
+        return knots[[0, -1]]
+
+    n_intervals = None
+    if tolerance is not None:
+        n_intervals = int(np.ceil(total / np.sqrt(8.0 * tolerance)))
+    if max_points is not None:
+        budget = max_points - 1
+        n_intervals = budget if n_intervals is None else min(n_intervals, budget)
+    n_intervals = max(n_intervals, 1)
+
+    levels = np.linspace(0.0, total, n_intervals + 1)
+    # the interval of each level, which has a positive density before the last level
+    intervals = np.clip(
+        np.searchsorted(cumulated, levels, side="right") - 1, 0, len(knots) - 2
+    )
+    offsets = np.divide(
+        levels - cumulated[intervals],
+        density[intervals],
+        out=np.zeros_like(levels),
+        where=density[intervals] > 0,
+    )
+
+    samples = knots[intervals] + offsets
+    samples[0] = knots[0]
+    samples[-1] = knots[-1]
+
+    return samples
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import functools
+import math
+from collections.abc import Callable
 from typing import Any, Literal, TypedDict
 
 from paraview import simple
-from vtkmodules.vtkCommonComputationalGeometry import vtkCardinalSpline
 
-from episcope.library.io import BaseSourceProvider
+from episcope.library.io import (
+    BaseSourceProvider,
+    PeakTrackArrays,
+    PointTrackArrays,
+    TrackSummaryArrays,
+)
+from episcope.library.io.pyramid import MAX_BIN_SHIFT
 from episcope.library.viz.alignment import align_structures
 from episcope.library.viz.common import CardinalSplines
 from episcope.library.viz.data_source import (
@@ -28,6 +36,13 @@ from episcope.library.viz.display import (
 
 TrackType = Literal["point", "peak", "structure", "labels"]
 
+# Tracks with more intervals than this on a chromosome are displayed from their
+# zoom levels, instead of interval by interval.
+MAX_TRACK_INTERVALS = 20_000
+
+# The maximum number of bins used to display a track from its zoom levels.
+TRACK_SUMMARY_BINS = 4_096
+
 
 class DisplayMeta(TypedDict):
     track_name: str
@@ -49,46 +64,42 @@ class Visualization:
     TEMP_DISPLAY_ID = -1
     ERROR_DISPLAY_ID = -2
 
-    def __init__(self, source_provider: BaseSourceProvider, render_view):
+    def __init__(
+        self,
+        source_provider: BaseSourceProvider,
+        render_view,
+        structure_tolerance: float | None = None,
+        structure_max_points: int | None = None,
+    ):
         self._source = source_provider
         self.render_view = render_view
+        self._structure_tolerance = structure_tolerance
+        self._structure_max_points = structure_max_points
         self._chromosome = ""
         self._experiment = ""
         self._timestep = ""
-        self._splines: CardinalSplines = {
-            "x": vtkCardinalSpline(),
-            "y": vtkCardinalSpline(),
-            "z": vtkCardinalSpline(),
-        }
+        self._splines = CardinalSplines()
         self._dataset_timestamp: tuple[str, str] = ("", "")
         self._displays: dict[int, DisplayMeta] = {}
         self._sources: dict[str, SourceMeta] = {}
         self._display_id = 0
 
     def align(self, other: Visualization | None):
-        structure = self._source.get_structure(
+        structure = self._source.get_structure_arrays(
             self._chromosome, self._experiment, self._timestep
         )
 
         if other is None or other is self:
             aligned_structure = structure
         else:
-            structure_other = other._source.get_structure(
+            structure_other = other._source.get_structure_arrays(
                 other._chromosome, other._experiment, other._timestep
             )
             aligned_structure = align_structures(structure, structure_other, 100)
 
-        for coord in ("x", "y", "z"):
-            self._splines[coord].RemoveAllPoints()
-
-        for structure_point in aligned_structure:
-            for i, coord in enumerate(("x", "y", "z")):
-                self._splines[coord].AddPoint(
-                    structure_point["index"], structure_point["position"][i]
-                )
-
-        for coord in ("x", "y", "z"):
-            self._splines[coord].Compute()
+        self._splines.set_points(
+            aligned_structure["index"], aligned_structure["position"]
+        )
 
         for source_meta in self._sources.values():
             source_meta["source"].update()
@@ -101,6 +112,47 @@ class Visualization:
             for k, v in display_meta["repr_props"].items():
                 representation.__setattr__(k, v)
 
+    def get_peak_track(self, track_name: str) -> PeakTrackArrays:
+        """Get the peaks of a track to display for the current chromosome.
+
+        Dense tracks are summarized in bins, each displayed as a peak as high as
+        the highest peak in the bin.
+        """
+        key = (self._chromosome, self._experiment, self._timestep, track_name)
+        if self._source.get_peak_track_count(*key) <= MAX_TRACK_INTERVALS:
+            return self._source.get_peak_track_arrays(*key)
+
+        summary = _summarize(
+            functools.partial(self._source.get_peak_track_summary, *key)
+        )
+
+        return {
+            "start": summary["start"],
+            "end": summary["end"],
+            "summit": (summary["start"] + summary["end"]) // 2,
+            "value": summary["max"],
+        }
+
+    def get_point_track(self, track_name: str) -> PointTrackArrays:
+        """Get the points of a track to display for the current chromosome.
+
+        Dense tracks are summarized in bins, each displayed with the mean value of
+        the bin.
+        """
+        key = (self._chromosome, self._experiment, self._timestep, track_name)
+        if self._source.get_point_track_count(*key) <= MAX_TRACK_INTERVALS:
+            return self._source.get_point_track_arrays(*key)
+
+        summary = _summarize(
+            functools.partial(self._source.get_point_track_summary, *key)
+        )
+
+        return {
+            "start": summary["start"],
+            "end": summary["end"],
+            "value": summary["mean"],
+        }
+
     def set_chromosome(self, chromosome: str, experiment: str, timestep: str):
         self._chromosome = chromosome
         self._experiment = experiment
@@ -176,13 +228,14 @@ class Visualization:
         structure_source_meta = self._sources.get(source_key)
 
         if structure_source_meta is None:
-            structure = self._source.get_structure(
+            structure = self._source.get_structure_arrays(
                 self._chromosome, self._experiment, self._timestep
             )
-            structure_indices = [p["index"] for p in structure]
-            structure_source = StructureSource()
+            structure_source = StructureSource(
+                self._structure_tolerance, self._structure_max_points
+            )
             structure_source.set_splines(self._splines)
-            structure_source.set_data(structure_indices, point_spacing)
+            structure_source.set_data(structure["index"], point_spacing)
             structure_source_meta = {
                 "source": structure_source,
                 "source_name": "structure",
@@ -226,9 +279,7 @@ class Visualization:
         peak_source_meta = self._sources.get(source_key)
 
         if peak_source_meta is None:
-            track = self._source.get_peak_track(
-                self._chromosome, self._experiment, self._timestep, track_name
-            )
+            track = self.get_peak_track(track_name)
             track_source = PeakTrackSource()
             track_source.set_splines(self._splines)
             track_source.set_data(track, point_spacing)
@@ -288,9 +339,7 @@ class Visualization:
         point_source_meta = self._sources.get(source_key)
 
         if point_source_meta is None:
-            track = self._source.get_point_track(
-                self._chromosome, self._experiment, self._timestep, track_name
-            )
+            track = self.get_point_track(track_name)
             track_source = PointTrackSource()
             track_source.set_splines(self._splines)
             track_source.set_data(track, point_spacing)
@@ -425,3 +474,30 @@ class Visualization:
         if source_meta["ref_count"] == 0:
             simple.Delete(source_meta["source"].output)
             del self._sources[source_key]
+
+
+def _summarize(summary: Callable[[int], TrackSummaryArrays]) -> TrackSummaryArrays:
+    """Summarize a track in about TRACK_SUMMARY_BINS bins, without reading its rows.
+
+    The span of the intervals is first bounded by the bins of the coarsest level,
+    which can be several times larger, then by the bins of the level picked from
+    that bound, which cover the intervals to within a bin on each side.
+
+    Args:
+        summary: The summary method of the provider, bound to the track.
+    """
+    track_summary = summary(1 << MAX_BIN_SHIFT)
+    for _ in range(2):
+        track_summary = summary(_summary_bin_size(track_summary))
+
+    return track_summary
+
+
+def _summary_bin_size(track_summary: TrackSummaryArrays) -> int:
+    """The bin size to summarize a track with, from the span of a summary."""
+    if len(track_summary["start"]) == 0:
+        return 1
+
+    span = int(track_summary["end"].max()) - int(track_summary["start"].min())
+
+    return max(1, math.ceil(span / TRACK_SUMMARY_BINS))
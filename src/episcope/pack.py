@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+
+from episcope.library.io.container import pack
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="episcope-pack",
+        description="Pack a data directory into a single container file, which episcope opens with --data.",
+    )
+    parser.add_argument(
+        "-d",
+        "--data",
+        help="Data directory to pack.",
+        dest="data",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Path of the container file to write, e.g. ensemble.episcope.",
+        dest="output",
+        required=True,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of processes used to parse the data directory.",
+        dest="workers",
+        type=int,
+        default=1,
+    )
+    args = parser.parse_args(argv)
+
+    pack(args.data, args.output, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
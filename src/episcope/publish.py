@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+
+from episcope.library.io.shared import publish
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="episcope-publish",
+        description="Parse a data directory into a directory shared by several episcope servers started with --shared.",
+    )
+    parser.add_argument(
+        "-d",
+        "--data",
+        help="Data directory to publish.",
+        dest="data",
+        required=True,
+    )
+    parser.add_argument(
+        "-s",
+        "--shared",
+        help="Directory where the parsed data is published, preferably on /dev/shm.",
+        dest="shared",
+        required=True,
+    )
+    parser.add_argument(
+        "--workers",
+        help="Number of processes used to parse the data directory.",
+        dest="workers",
+        type=int,
+        default=1,
+    )
+    args = parser.parse_args(argv)
+
+    publish(args.data, args.shared, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+CHROMOSOMES = ["chr1", "chr2"]
+EXPERIMENTS = ["Untr_A", "Vacv_A"]
+TIMESTEPS = ["12hpi", "18hpi"]
+
+
+def _write_ensemble(root):
+    rng = random.Random(0)
+
+    (root / "provenance").mkdir()
+    (root / "provenance" / "contigs.tsv").write_text(
+        "".join(f"{chromosome}\t1000000\n" for chromosome in CHROMOSOMES)
+    )
+    (root / "meta.yaml").write_text("description: test\n")
+    (root / "experiments").mkdir()
+    (root / "experiments" / "meta.yaml").write_text(
+        f"structure:\n  chromosomes: [{', '.join(CHROMOSOMES)}]\n"
+    )
+
+    for experiment in EXPERIMENTS:
+        experiment_path = root / "experiments" / experiment
+        experiment_path.mkdir()
+        (experiment_path / "meta.yaml").write_text("sample: test\n")
+
+        for timestep in TIMESTEPS:
+            path = experiment_path / timestep
+            path.mkdir()
+
+            structure = ["chromosome,id,x,y,z\n"]
+            labels = []
+            peaks = []
+            points = []
+            for chromosome in CHROMOSOMES:
+                for i in range(0, 1_000_001, 10_000):
+                    x, y, z = (rng.random() for _ in range(3))
+                    structure.append(f"{chromosome},{i}.0,{x},{y},{z}\n")
+                labels.append(f"{chromosome},500000,gene\n")
+                for i in range(200):
+                    start = i * 5_000
+                    peaks.append(
+                        f"{chromosome}\t{start}\t{start + 500}\tpeak\t{rng.randint(0, 1000)}\t.\t{rng.random()}\t0\t0\t250\n"
+                    )
+                for i in range(100):
+                    start = i * 10_000
+                    points.append(
+                        f"{chromosome}\t{start}\t{start + 10_000}\t{rng.random()}\n"
+                    )
+
+            (path / "structure.csv").write_text("".join(structure))
+            (path / "labels.csv").write_text("".join(labels))
+            (path / "ATAC.narrowPeak").write_text("".join(peaks))
+            (path / "compartment.bed").write_text("".join(points))
+
+
+@pytest.fixture
+def ensemble_path(tmp_path):
+    _write_ensemble(tmp_path)
+
+    return tmp_path
+
+
+def _assert_arrays_equal(expected, actual):
+    assert expected.keys() == actual.keys()
+    for name in expected:
+        assert actual[name].dtype == expected[name].dtype
+        assert np.array_equal(expected[name], actual[name])
+
+
+@pytest.fixture
+def assert_arrays_equal():
+    """Compare two dictionaries of arrays, including the dtypes of the arrays."""
+    return _assert_arrays_equal
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+from episcope.library.io.binary import read_arrays, write_arrays
+from episcope.library.io.cache import ENTRY_SUFFIX, ParseCache
+from episcope.library.io.columnar import ChromosomeTable
+
+
+def _table(n_rows=100):
+    return ChromosomeTable.from_groups(
+        {
+            "chr1": {"start": np.arange(n_rows), "value": np.linspace(0, 1, n_rows)},
+            "chr2": {"start": [7], "value": [0.5]},
+        },
+        {"start": np.int64, "value": np.float64},
+    )
+
+
+def _assert_tables_equal(actual, expected):
+    assert actual.chromosomes == expected.chromosomes
+    assert np.array_equal(actual.offsets, expected.offsets)
+    for name, column in expected.columns.items():
+        assert actual.columns[name].dtype == column.dtype
+        assert np.array_equal(actual.columns[name], column)
+
+
+def test_binary_round_trip(tmp_path):
+    path = tmp_path / "arrays.bin"
+    arrays = {
+        "index": np.arange(5, dtype=np.int32),
+        "position": np.random.default_rng(0).normal(size=(5, 3)),
+        "empty": np.zeros(0, dtype=np.uint8),
+    }
+
+    write_arrays(path, arrays, {"name": "test"})
+    loaded, meta = read_arrays(path)
+
+    assert meta == {"name": "test"}
+    for name, array in arrays.items():
+        assert loaded[name].dtype == array.dtype
+        assert loaded[name].shape == array.shape
+        assert np.array_equal(loaded[name], array)
+    assert not loaded["position"].flags.writeable
+    # no temporary file is left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["arrays.bin"]
+
+
+def test_binary_rejects_other_files(tmp_path):
+    path = tmp_path / "arrays.bin"
+    path.write_bytes(b"not an array file, but long enough to hold a preamble")
+
+    with pytest.raises(ValueError, match="not a supported array file"):
+        read_arrays(path)
+
+
+def test_cache_round_trip(tmp_path):
+    source = tmp_path / "track.bed"
+    source.write_text("chr1\t0\t10\t1\n")
+    cache = ParseCache(tmp_path / "cache")
+    table = _table()
+
+    assert cache.get(source, "point") is None
+    cache.put(source, "point", table)
+
+    _assert_tables_equal(cache.get(source, "point"), table)
+    # entries are keyed by the kind of content too
+    assert cache.get(source, "peak") is None
+
+    cache.put_tables(source, "pyramid", {"1000": table, "2000": _table(3)})
+    tables = cache.get_tables(source, "pyramid")
+    assert sorted(tables) == ["1000", "2000"]
+    _assert_tables_equal(tables["2000"], _table(3))
+
+
+def test_cache_stale_after_fingerprint_change(tmp_path):
+    source = tmp_path / "track.bed"
+    source.write_text("chr1\t0\t10\t1\n")
+    cache = ParseCache(tmp_path / "cache")
+    cache.put(source, "point", _table())
+
+    # same size, new modification time
+    source.write_text("chr2\t0\t10\t1\n")
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.get(source, "point") is None
+    # the stale entry is removed
+    assert not list(cache.directory.glob(f"*{ENTRY_SUFFIX}"))
+    assert cache.total_bytes == 0
+
+
+def test_cache_read_only(tmp_path):
+    source = tmp_path / "track.bed"
+    source.write_text("chr1\t0\t10\t1\n")
+    ParseCache(tmp_path / "cache").put(source, "point", _table())
+
+    cache = ParseCache(tmp_path / "cache", read_only=True)
+    cache.put(source, "peak", _table())
+
+    assert cache.get(source, "point") is not None
+    assert cache.get(source, "peak") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    sources = []
+    for i in range(4):
+        source = tmp_path / f"track{i}.bed"
+        source.write_text("chr1\t0\t10\t1\n")
+        sources.append(source)
+
+    cache = ParseCache(tmp_path / "cache")
+    cache.put(sources[0], "point", _table())
+    entry_bytes = cache.total_bytes
+    cache.max_bytes = 3 * entry_bytes
+
+    cache.put(sources[1], "point", _table())
+    cache.put(sources[2], "point", _table())
+    # a hit makes the first entry the most recently used
+    assert cache.get(sources[0], "point") is not None
+    cache.put(sources[3], "point", _table())
+
+    assert cache.total_bytes == 3 * entry_bytes
+    assert cache.get(sources[1], "point") is None
+    for i in (0, 2, 3):
+        assert cache.get(sources[i], "point") is not None
+
+    # a new instance recovers the same state from the directory
+    cache = ParseCache(tmp_path / "cache", max_bytes=entry_bytes)
+    assert cache.total_bytes == 3 * entry_bytes
+    cache.evict()
+    assert len(list(cache.directory.glob(f"*{ENTRY_SUFFIX}"))) == 1
+    assert cache.get(sources[3], "point") is not None
+
+    cache.clear()
+    assert cache.total_bytes == 0
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from episcope.library.io.catalogue import CatalogueIndex
+
+CHROMOSOMES = ["chr1", "chr2", "chr3", "chrX"]
+EXPERIMENTS = ["Untr_A", "Vacv_A", "Vacv_B"]
+TIMESTEPS = ["0hpi", "12hpi", "18hpi"]
+
+
+def _assert_matches(index, timesteps):
+    """Compare every catalogue query with a scan of the timesteps."""
+    for chromosome, experiment, timestep in itertools.product(
+        [None, *CHROMOSOMES], [None, *EXPERIMENTS], [None, *TIMESTEPS]
+    ):
+        matching = [
+            (e, t, c)
+            for (e, t), chromosomes in timesteps.items()
+            for c in chromosomes
+            if experiment in (None, e)
+            and timestep in (None, t)
+            and chromosome in (None, c)
+        ]
+        if chromosome is None:
+            assert index.get_chromosomes(experiment, timestep) == {
+                c for *_, c in matching
+            }
+        if experiment is None:
+            assert index.get_experiments(chromosome, timestep) == {
+                e for e, *_ in matching
+            }
+        if timestep is None:
+            assert index.get_timesteps(chromosome, experiment) == {
+                t for _, t, _ in matching
+            }
+
+
+def test_catalogue_matches_brute_force():
+    rng = random.Random(0)
+    index = CatalogueIndex()
+    timesteps = {}
+
+    for _ in range(200):
+        key = (rng.choice(EXPERIMENTS), rng.choice(TIMESTEPS))
+        if rng.random() < 0.3:
+            index.remove(*key)
+            timesteps.pop(key, None)
+        else:
+            chromosomes = set(rng.sample(CHROMOSOMES, rng.randint(0, 3)))
+            index.add(*key, chromosomes)
+            timesteps[key] = chromosomes
+
+        _assert_matches(index, timesteps)
+
+    for key in list(timesteps):
+        index.remove(*key)
+
+    _assert_matches(index, {})
+    assert index.get_chromosomes() == set()
+
+
+def test_catalogue_tracks():
+    index = CatalogueIndex()
+    index.add("Untr_A", "12hpi", ["chr1", "chr2"])
+
+    assert not index.has_tracks("Untr_A", "12hpi", "peak")
+    with pytest.raises(KeyError):
+        index.get_tracks("chr1", "Untr_A", "12hpi", "peak")
+
+    index.set_tracks(
+        "Untr_A", "12hpi", "peak", {"ATAC": ["chr1", "chr2"], "CTCF": ["chr2"]}
+    )
+
+    assert index.has_tracks("Untr_A", "12hpi", "peak")
+    assert not index.has_tracks("Untr_A", "12hpi", "point")
+    assert index.get_tracks("chr1", "Untr_A", "12hpi", "peak") == {"ATAC"}
+    assert index.get_tracks("chr2", "Untr_A", "12hpi", "peak") == {"ATAC", "CTCF"}
+    assert index.get_tracks("chr3", "Untr_A", "12hpi", "peak") == set()
+
+    # replacing a timestep drops the tracks indexed for it
+    index.add("Untr_A", "12hpi", ["chr1"])
+    assert not index.has_tracks("Untr_A", "12hpi", "peak")
+    assert index.get_chromosomes("Untr_A") == {"chr1"}
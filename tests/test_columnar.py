@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from episcope.library.io import BaseSourceProvider
+from episcope.library.io.columnar import (
+    ChromosomeTable,
+    peak_track_points,
+    point_track_points,
+    structure_points,
+)
+
+
+def _table():
+    return ChromosomeTable.from_groups(
+        {
+            "chr1": {"start": [10, 20, 30], "value": [1.0, 2.0, 3.0]},
+            "chr2": {"start": [], "value": []},
+            "chr3": {"start": [5], "value": [4.0]},
+        },
+        {"start": np.int64, "value": np.float64},
+    )
+
+
+def test_table_groups_rows_by_chromosome():
+    table = _table()
+
+    assert list(table) == ["chr1", "chr2", "chr3"]
+    assert len(table) == 3
+    assert "chr2" in table
+    assert "chr4" not in table
+    assert table.offsets.tolist() == [0, 3, 3, 4]
+    assert table.n_rows == 4
+    assert table.row_range("chr3") == (3, 4)
+    assert table["chr1"]["start"].tolist() == [10, 20, 30]
+    assert table["chr2"]["value"].dtype == np.float64
+    assert len(table["chr2"]["value"]) == 0
+    assert table.nbytes == 4 * 8 + 4 * 8 + 4 * 8
+
+    # the rows of a chromosome are views into the columns
+    assert np.shares_memory(table["chr1"]["value"], table.columns["value"])
+
+    with pytest.raises(KeyError):
+        table["chr4"]
+
+
+def test_table_checks_offsets():
+    with pytest.raises(ValueError, match="one more offset"):
+        ChromosomeTable(["chr1"], np.array([0]), {})
+
+
+class _ListSourceProvider(BaseSourceProvider):
+    """A provider only implementing the list-of-dict getters."""
+
+    def __init__(self, structure, peaks, points):
+        self._structure = structure
+        self._peaks = peaks
+        self._points = points
+
+    def get_chromosomes(self, *_args):
+        return {"chr1"}
+
+    def get_experiments(self, *_args):
+        return {"experiment"}
+
+    def get_timesteps(self, *_args):
+        return {"timestep"}
+
+    def get_peak_tracks(self, *_args):
+        return {"peaks"}
+
+    def get_point_tracks(self, *_args):
+        return {"points"}
+
+    def get_structure(self, *_args):
+        return self._structure
+
+    def get_peak_track(self, *_args):
+        return self._peaks
+
+    def get_point_track(self, *_args):
+        return self._points
+
+    def get_labels(self, *_args):
+        return []
+
+    def get_display_options(self, *_args):
+        return {}
+
+
+def test_base_provider_defaults_from_lists():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 1_000_000, 500)
+    ends = starts + rng.integers(1, 20_000, 500)
+    peaks = {
+        "start": starts,
+        "end": ends,
+        "summit": starts + (ends - starts) // 2,
+        "value": rng.random(500),
+    }
+    points = {"start": starts, "end": ends, "value": rng.random(500)}
+    structure = {
+        "index": np.arange(0, 1_000_000, 10_000),
+        "position": rng.normal(size=(100, 3)),
+    }
+
+    source = _ListSourceProvider(
+        structure_points(structure),
+        peak_track_points(peaks),
+        point_track_points(points),
+    )
+    key = ("chr1", "experiment", "timestep")
+
+    arrays = source.get_structure_arrays(*key)
+    assert np.array_equal(arrays["index"], structure["index"])
+    assert np.array_equal(arrays["position"], structure["position"])
+
+    assert source.get_peak_track_count(*key, "peaks") == 500
+    assert source.get_point_track_count(*key, "points") == 500
+
+    arrays = source.get_peak_track_arrays(*key, "peaks")
+    for name, column in peaks.items():
+        assert arrays[name].dtype == column.dtype
+        assert np.array_equal(arrays[name], column)
+
+    selected = source.get_point_track_range(*key, "points", 200_000, 300_000)
+    rows = np.flatnonzero((starts < 300_000) & (ends > 200_000))
+    rows = rows[np.argsort(starts[rows], kind="stable")]
+    for name, column in points.items():
+        assert np.array_equal(selected[name], column[rows])
+
+    summary = source.get_peak_track_summary(*key, "peaks", 100_000)
+    assert np.all(np.diff(summary["start"]) > 0)
+    assert summary["max"].max() == peaks["value"].max()
+    assert summary["covered"].sum() == (ends - starts).sum()
+
+    assert source.get_structure_arrays(*key)["position"].shape == (100, 3)
+    assert source.prefetch(*key)
+    assert not source.prefetch(*key, cancelled=lambda: True)
+    assert source.refresh() == {"added": [], "modified": [], "removed": []}
+
+    empty = _ListSourceProvider([], [], [])
+    assert empty.get_structure_arrays(*key)["position"].shape == (0, 3)
+    assert len(empty.get_point_track_range(*key, "points", 0, 10)["start"]) == 0
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from episcope.library.io.pyramid import TrackPyramid
+from episcope.library.io.singleflight import SingleFlight
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+from episcope.library.io.v1_2.timestep import Timestep
+
+N_THREADS = 16
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Count the files parsed and the zoom levels built, slowing them down to widen races."""
+    counter: Counter = Counter()
+    lock = threading.Lock()
+
+    def counted(name, function):
+        def wrapper(*args):
+            with lock:
+                counter[(name, str(args[-1]))] += 1
+            time.sleep(0.01)
+            return function(*args)
+
+        return wrapper
+
+    for name in (
+        "_read_structure",
+        "_read_labels",
+        "_read_peak_track",
+        "_read_point_track",
+    ):
+        monkeypatch.setattr(Timestep, name, counted(name, getattr(Timestep, name)))
+
+    build = TrackPyramid.build.__func__
+    monkeypatch.setattr(
+        TrackPyramid,
+        "build",
+        classmethod(counted("build", build)),
+    )
+
+    return counter
+
+
+def _requests(source: SourceProvider) -> list:
+    requests = []
+    for experiment in sorted(source.get_experiments()):
+        for timestep in sorted(source.get_timesteps(experiment=experiment)):
+            for chromosome in sorted(source.get_chromosomes(experiment, timestep)):
+                key = (chromosome, experiment, timestep)
+                requests.extend(
+                    [
+                        (source.get_structure_arrays, key),
+                        (source.get_labels, key),
+                        (source.get_peak_tracks, key),
+                        (source.get_point_tracks, key),
+                        (source.get_peak_track_arrays, (*key, "ATAC")),
+                        (source.get_point_track_arrays, (*key, "compartment")),
+                        (source.get_peak_track_range, (*key, "ATAC", 0, 100_000)),
+                        (source.get_point_track_summary, (*key, "compartment", 50_000)),
+                        (source.get_peak_track_summary, (*key, "ATAC", 50_000)),
+                    ]
+                )
+                requests.append((source.prefetch, key))
+
+    return requests
+
+
+def _result(value):
+    if isinstance(value, dict):
+        return {name: _result(item) for name, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, list)):
+        return sorted(map(str, value))
+    return value
+
+
+def test_concurrent_requests_load_each_file_once(ensemble_path, loads):
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+    requests = _requests(source)
+    barrier = threading.Barrier(N_THREADS)
+
+    def run(seed):
+        shuffled = list(requests)
+        random.Random(seed).shuffle(shuffled)
+        barrier.wait()
+        return [(id(method), args, _result(method(*args))) for method, args in shuffled]
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        results = list(executor.map(run, range(N_THREADS)))
+
+    n_timesteps = len(source.get_experiments()) * len(source.get_timesteps())
+    assert set(loads.values()) == {1}
+    assert sum(1 for name, _ in loads if name == "build") == 2 * n_timesteps
+    assert sum(1 for name, _ in loads if name != "build") == 4 * n_timesteps
+
+    expected = {(key, args): value for key, args, value in results[0]}
+    for thread_results in results[1:]:
+        for key, args, value in thread_results:
+            assert value == expected[(key, args)]
+
+
+def test_concurrent_requests_with_evictions(ensemble_path):
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True), max_bytes=1)
+    reference = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+    requests = _requests(source)
+
+    def run(seed):
+        shuffled = list(requests)
+        random.Random(seed).shuffle(shuffled)
+        for method, args in shuffled:
+            if method.__name__ == "prefetch":
+                # stops early, since the memory budget is always exceeded
+                method(*args)
+                continue
+
+            expected = getattr(reference, method.__name__)(*args)
+            assert _result(method(*args)) == _result(expected)
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+        list(executor.map(run, range(N_THREADS)))
+
+    assert source.get_memory_stats()["evictions"] > 0
+
+
+def test_single_flight_shares_results_and_errors():
+    flights = SingleFlight()
+    calls = Counter()
+    started = threading.Event()
+    release = threading.Event()
+
+    def load(key):
+        calls[key] += 1
+        started.set()
+        release.wait()
+        if key == "error":
+            msg = "failed"
+            raise ValueError(msg)
+        return object()
+
+    for key in ("value", "error"):
+        started.clear()
+        release.clear()
+        with ThreadPoolExecutor(max_workers=N_THREADS) as executor:
+            leader = executor.submit(flights.do, key, lambda key=key: load(key))
+            started.wait()
+            followers = [
+                executor.submit(flights.do, key, lambda key=key: load(key))
+                for _ in range(N_THREADS - 1)
+            ]
+            # let the followers join the flight before it completes
+            time.sleep(0.05)
+            release.set()
+
+            futures = [leader, *followers]
+            if key == "error":
+                for future in futures:
+                    with pytest.raises(ValueError, match="failed"):
+                        future.result()
+            else:
+                assert len({id(future.result()) for future in futures}) == 1
+
+        assert calls[key] == 1
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from episcope.library.io.container import (
+    ContainerSourceProvider,
+    is_container,
+    pack,
+)
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+
+
+def test_container_matches_directory(ensemble_path, tmp_path, assert_arrays_equal):
+    container_path = tmp_path / "ensemble.episcope"
+    pack(ensemble_path, container_path)
+
+    assert is_container(container_path)
+    assert not is_container(ensemble_path)
+
+    expected = SourceProvider(Ensemble(ensemble_path, ""))
+    actual = ContainerSourceProvider(container_path)
+
+    assert actual.get_experiments() == expected.get_experiments()
+    assert actual.get_timesteps() == expected.get_timesteps()
+    assert actual.get_chromosomes() == expected.get_chromosomes()
+
+    for experiment in expected.get_experiments():
+        for timestep in expected.get_timesteps(experiment=experiment):
+            for chromosome in expected.get_chromosomes(experiment, timestep):
+                key = (chromosome, experiment, timestep)
+
+                assert_arrays_equal(
+                    expected.get_structure_arrays(*key),
+                    actual.get_structure_arrays(*key),
+                )
+                assert actual.get_labels(*key) == expected.get_labels(*key)
+
+                for kind in ("peak", "point"):
+                    tracks = getattr(expected, f"get_{kind}_tracks")(*key)
+                    assert getattr(actual, f"get_{kind}_tracks")(*key) == tracks
+
+                    for track in tracks:
+                        count = getattr(expected, f"get_{kind}_track_count")(
+                            *key, track
+                        )
+                        assert (
+                            getattr(actual, f"get_{kind}_track_count")(*key, track)
+                            == count
+                        )
+                        for method, args in (
+                            (f"get_{kind}_track_arrays", ()),
+                            (f"get_{kind}_track_range", (100_000, 400_000)),
+                            (f"get_{kind}_track_summary", (50_000,)),
+                        ):
+                            assert_arrays_equal(
+                                getattr(expected, method)(*key, track, *args),
+                                getattr(actual, method)(*key, track, *args),
+                            )
+
+    assert actual.refresh() == {"added": [], "modified": [], "removed": []}
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import numpy as np
+
+from episcope.library.io.database import (
+    DatabaseSourceProvider,
+    import_ensemble,
+    is_database,
+)
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+
+
+def test_database_matches_directory(ensemble_path, tmp_path, assert_arrays_equal):
+    database_path = tmp_path / "ensemble.sqlite"
+    import_ensemble(ensemble_path, database_path)
+
+    assert is_database(database_path)
+    assert not is_database(ensemble_path)
+
+    expected = SourceProvider(Ensemble(ensemble_path, ""))
+    actual = DatabaseSourceProvider(database_path)
+
+    assert actual.get_experiments() == expected.get_experiments()
+    assert actual.get_timesteps() == expected.get_timesteps()
+    assert actual.get_chromosomes() == expected.get_chromosomes()
+
+    for experiment in expected.get_experiments():
+        for timestep in expected.get_timesteps(experiment=experiment):
+            for chromosome in expected.get_chromosomes(experiment, timestep):
+                key = (chromosome, experiment, timestep)
+
+                assert_arrays_equal(
+                    expected.get_structure_arrays(*key),
+                    actual.get_structure_arrays(*key),
+                )
+                assert actual.get_labels(*key) == expected.get_labels(*key)
+                assert actual.prefetch(*key)
+
+                for kind in ("peak", "point"):
+                    tracks = getattr(expected, f"get_{kind}_tracks")(*key)
+                    assert getattr(actual, f"get_{kind}_tracks")(*key) == tracks
+
+                    for track in tracks:
+                        count = getattr(expected, f"get_{kind}_track_count")(
+                            *key, track
+                        )
+                        assert (
+                            getattr(actual, f"get_{kind}_track_count")(*key, track)
+                            == count
+                        )
+                        for method, args in (
+                            (f"get_{kind}_track_arrays", ()),
+                            (f"get_{kind}_track_range", (100_000, 400_000)),
+                            (f"get_{kind}_track_summary", (50_000,)),
+                        ):
+                            assert_arrays_equal(
+                                getattr(expected, method)(*key, track, *args),
+                                getattr(actual, method)(*key, track, *args),
+                            )
+
+
+def test_find_peaks_across_ensemble(ensemble_path, tmp_path):
+    database_path = tmp_path / "ensemble.sqlite"
+    import_ensemble(ensemble_path, database_path)
+
+    expected = SourceProvider(Ensemble(ensemble_path, ""))
+    actual = DatabaseSourceProvider(database_path)
+
+    peaks = actual.find_peaks("chr1", 100_000, 400_000, min_value=500)
+
+    n_peaks = 0
+    for experiment in expected.get_experiments():
+        for timestep in expected.get_timesteps(experiment=experiment):
+            selected = expected.get_peak_track_range(
+                "chr1", experiment, timestep, "ATAC", 100_000, 400_000
+            )
+            is_kept = selected["value"] >= 500
+            is_found = (peaks["experiment"] == experiment) & (
+                peaks["timestep"] == timestep
+            )
+
+            assert np.array_equal(peaks["start"][is_found], selected["start"][is_kept])
+            n_peaks += int(is_kept.sum())
+
+    assert n_peaks == len(peaks["start"]) > 0
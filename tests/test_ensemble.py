@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pytest
+
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+from episcope.library.io.v1_2.timestep import Timestep
+
+
+def _add_other_chromosome(ensemble_path):
+    """Add the rows of a chromosome without structure to every track file."""
+    for path in ensemble_path.glob("experiments/*/*/ATAC.narrowPeak"):
+        with path.open("a") as file:
+            file.write("chrM\t0\t500\tpeak\t1\t.\t0.5\t0\t0\t250\n")
+
+
+@pytest.mark.parametrize(
+    "meta", ["foo: bar\n", "", "structure:\n  other: 1\n", "structure:\n"]
+)
+def test_meta_without_chromosomes(ensemble_path, meta):
+    _add_other_chromosome(ensemble_path)
+    (ensemble_path / "experiments" / "meta.yaml").write_text(meta)
+
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+
+    for chromosome in ("chr1", "chr2"):
+        arrays = source.get_peak_track_arrays(chromosome, "Untr_A", "12hpi", "ATAC")
+        assert len(arrays["start"]) == 200
+        assert source.get_peak_track_count(chromosome, "Untr_A", "12hpi", "ATAC") == 200
+
+    timestep = Timestep(ensemble_path / "experiments" / "Untr_A" / "12hpi")
+    assert timestep.track_chromosomes == {"chr1", "chr2"}
+    assert list(timestep.get_peak_track("ATAC")) == ["chr1", "chr2"]
+
+
+def test_meta_chromosomes_intersect_structure(ensemble_path):
+    _add_other_chromosome(ensemble_path)
+    (ensemble_path / "experiments" / "meta.yaml").write_text(
+        "structure:\n  chromosomes: [chr2, chrM, chr9]\n"
+    )
+
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+
+    assert (
+        len(source.get_peak_track_arrays("chr2", "Untr_A", "12hpi", "ATAC")["start"])
+        == 200
+    )
+    # the rows of chr1 are skipped
+    with pytest.raises(KeyError):
+        source.get_peak_track_arrays("chr1", "Untr_A", "12hpi", "ATAC")
+
+    timestep = Timestep(
+        ensemble_path / "experiments" / "Untr_A" / "12hpi",
+        track_chromosomes=["chr2", "chrM", "chr9"],
+    )
+    # chrM has no structure, so its rows are not loaded
+    assert timestep.track_chromosomes == {"chr2"}
+    assert list(timestep.get_peak_track("ATAC")) == ["chr2"]
+
+
+def test_quoted_structure_chromosomes(ensemble_path):
+    for path in ensemble_path.glob("experiments/*/*/structure.csv"):
+        header, *lines = path.read_text().splitlines(keepends=True)
+        path.write_text(
+            header + "".join('"{}",{}'.format(*line.split(",", 1)) for line in lines)
+        )
+
+    # the chromosomes of a lazy timestep are scanned instead of parsed
+    timestep = Timestep(ensemble_path / "experiments" / "Untr_A" / "12hpi")
+    assert timestep.chromosomes == {"chr1", "chr2"}
+    assert set(timestep.get_structures()) == timestep.chromosomes
+
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+    assert source.get_chromosomes() == {"chr1", "chr2"}
+    assert len(source.get_structure_arrays("chr1", "Untr_A", "12hpi")["index"]) == 101
+
+
+def test_parallel_load_matches_serial_load(ensemble_path, assert_arrays_equal):
+    expected = SourceProvider(Ensemble(ensemble_path, ""))
+    actual = SourceProvider(Ensemble(ensemble_path, "", workers=2))
+
+    assert actual.get_experiments() == expected.get_experiments()
+    assert actual.get_timesteps() == expected.get_timesteps()
+
+    for experiment in expected.get_experiments():
+        for timestep in expected.get_timesteps(experiment=experiment):
+            # every file was parsed in the worker processes
+            _timestep = actual._get_timestep(experiment, timestep)
+            assert _timestep.nbytes > 0
+            assert (
+                _timestep.nbytes == expected._get_timestep(experiment, timestep).nbytes
+            )
+
+            chromosomes = expected.get_chromosomes(experiment, timestep)
+            assert actual.get_chromosomes(experiment, timestep) == chromosomes
+
+            for chromosome in chromosomes:
+                key = (chromosome, experiment, timestep)
+                for method, args in (
+                    ("get_structure_arrays", ()),
+                    ("get_peak_track_arrays", ("ATAC",)),
+                    ("get_point_track_arrays", ("compartment",)),
+                    ("get_peak_track_summary", ("ATAC", 50_000)),
+                    ("get_point_track_summary", ("compartment", 50_000)),
+                ):
+                    assert_arrays_equal(
+                        getattr(expected, method)(*key, *args),
+                        getattr(actual, method)(*key, *args),
+                    )
+                assert actual.get_labels(*key) == expected.get_labels(*key)
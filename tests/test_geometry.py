@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import gc
+
+import numpy as np
+import pytest
+
+numpy_support = pytest.importorskip("vtkmodules.util.numpy_support")
+geometry = pytest.importorskip("episcope.library.viz.geometry")
+
+vtk_to_numpy = numpy_support.vtk_to_numpy
+build_polydata = geometry.build_polydata
+polyline_offsets = geometry.polyline_offsets
+
+
+def test_build_polydata_wraps_arrays():
+    points = np.random.default_rng(0).normal(size=(7, 3))
+    scalars = np.arange(7, dtype=np.float32)
+
+    polydata = build_polydata(
+        points, polyline_offsets([3, 4]), point_data={"scalars": scalars}
+    )
+
+    assert polydata.GetNumberOfPoints() == 7
+    assert polydata.GetNumberOfLines() == 2
+    assert np.array_equal(vtk_to_numpy(polydata.GetPoints().GetData()), points)
+    assert np.array_equal(
+        vtk_to_numpy(polydata.GetLines().GetOffsetsArray()), [0, 3, 7]
+    )
+    assert np.array_equal(
+        vtk_to_numpy(polydata.GetLines().GetConnectivityArray()), np.arange(7)
+    )
+
+    # the polydata shares the buffers of the arrays, and keeps them alive
+    assert vtk_to_numpy(polydata.GetPoints().GetData()).ctypes.data == (
+        points.ctypes.data
+    )
+    expected = points.copy()
+    del points, scalars
+    gc.collect()
+    assert np.array_equal(vtk_to_numpy(polydata.GetPoints().GetData()), expected)
+    assert np.array_equal(
+        vtk_to_numpy(polydata.GetPointData().GetArray("scalars")), np.arange(7)
+    )
+
+
+def test_build_polydata_without_lines():
+    polydata = build_polydata(np.zeros((0, 3)))
+
+    assert polydata.GetNumberOfPoints() == 0
+    assert polydata.GetNumberOfLines() == 0
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from episcope.library.io.columnar import ChromosomeTable
+from episcope.library.io.intervals import IntervalIndex
+
+
+def _track(rng, sort):
+    groups = {}
+    for chromosome, n_rows in (("chr1", 2_000), ("chr2", 0), ("chr3", 500)):
+        starts = rng.integers(0, 1_000_000, n_rows)
+        # a few long intervals, which the running maximum of the ends must skip
+        lengths = np.where(
+            rng.random(n_rows) < 0.01,
+            rng.integers(0, 200_000, n_rows),
+            rng.integers(0, 2_000, n_rows),
+        )
+        if sort:
+            order = np.argsort(starts, kind="stable")
+            starts, lengths = starts[order], lengths[order]
+        groups[chromosome] = {
+            "start": starts,
+            "end": starts + lengths,
+            "value": rng.random(n_rows),
+        }
+
+    return ChromosomeTable.from_groups(
+        groups, {"start": np.int64, "end": np.int64, "value": np.float64}
+    )
+
+
+def _brute_force(table, chromosome, start, end):
+    starts = table[chromosome]["start"]
+    rows = np.flatnonzero((starts < end) & (table[chromosome]["end"] > start))
+
+    return rows[np.argsort(starts[rows], kind="stable")]
+
+
+@pytest.mark.parametrize("sort", [False, True])
+def test_interval_index_matches_brute_force(sort):
+    rng = np.random.default_rng(0)
+    table = _track(rng, sort)
+    index = IntervalIndex(table)
+
+    if sort:
+        # the columns of a sorted track are used as they are
+        assert index.nbytes == table.columns["end"].nbytes
+
+    for _ in range(500):
+        chromosome = rng.choice(["chr1", "chr2", "chr3"])
+        start = int(rng.integers(-1_000, 1_100_000))
+        end = start + int(rng.choice([0, 1, 100, 10_000, 500_000]))
+
+        rows = index.query(chromosome, start, end)
+        assert np.array_equal(rows, _brute_force(table, chromosome, start, end))
+
+        selected = index.select(chromosome, start, end)
+        for name, column in table[chromosome].items():
+            assert selected[name].dtype == column.dtype
+            assert np.array_equal(selected[name], column[rows])
+
+
+def test_interval_index_half_open():
+    table = ChromosomeTable.from_groups(
+        {"chr1": {"start": [10, 20], "end": [20, 30]}},
+        {"start": np.int64, "end": np.int64},
+    )
+    index = IntervalIndex(table)
+
+    assert index.query("chr1", 20, 21).tolist() == [1]
+    assert index.query("chr1", 0, 10).tolist() == []
+    assert index.query("chr1", 19, 20).tolist() == [0]
+    assert index.query("chr1", 30, 40).tolist() == []
+    assert index.query("chr9", 0, 40).tolist() == []
+    assert len(index.select("chr9", 0, 40)["start"]) == 0
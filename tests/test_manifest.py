@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from episcope.index import main
+from episcope.library.io.manifest import MANIFEST_NAME, MANIFEST_VERSION, Manifest
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+from episcope.library.io.v1_2.timestep import Timestep
+
+
+def _add_chromosome(path, chromosome):
+    """Insert the rows of a chromosome without structure among the rows of chr1."""
+    lines = path.read_text().splitlines(keepends=True)
+    extra = [line.replace("chr1\t", f"{chromosome}\t", 1) for line in lines[:50]]
+    path.write_text("".join(lines[:100] + extra + lines[100:]))
+
+
+@pytest.fixture
+def indexed_ensemble_path(ensemble_path):
+    """An ensemble with an index, whose tracks hold a chromosome without structure."""
+    for path in ensemble_path.glob("experiments/*/*/ATAC.narrowPeak"):
+        _add_chromosome(path, "chrM")
+    main([str(ensemble_path)])
+
+    return ensemble_path
+
+
+def _arrays(source):
+    return {
+        (chromosome, experiment, timestep, track): arrays
+        for experiment in sorted(source.get_experiments())
+        for timestep in sorted(source.get_timesteps(experiment=experiment))
+        for chromosome in sorted(source.get_chromosomes(experiment, timestep))
+        for track, arrays in (
+            (
+                "structure",
+                source.get_structure_arrays(chromosome, experiment, timestep),
+            ),
+            (
+                "ATAC",
+                source.get_peak_track_arrays(chromosome, experiment, timestep, "ATAC"),
+            ),
+            (
+                "compartment",
+                source.get_point_track_arrays(
+                    chromosome, experiment, timestep, "compartment"
+                ),
+            ),
+        )
+    }
+
+
+def _arrays_without_index(ensemble_path, directory):
+    """The arrays of an ensemble read while the index of a timestep is moved aside."""
+    (directory / MANIFEST_NAME).rename(directory.parent / MANIFEST_NAME)
+    try:
+        return _arrays(SourceProvider(Ensemble(ensemble_path, "")))
+    finally:
+        (directory.parent / MANIFEST_NAME).rename(directory / MANIFEST_NAME)
+
+
+def _assert_arrays_equal(expected, actual):
+    assert expected.keys() == actual.keys()
+    for key, arrays in expected.items():
+        for name, array in arrays.items():
+            assert actual[key][name].dtype == array.dtype
+            assert np.array_equal(actual[key][name], array)
+
+
+def test_manifest_entries(indexed_ensemble_path):
+    directory = indexed_ensemble_path / "experiments" / "Untr_A" / "12hpi"
+    manifest = Manifest.load(directory)
+    assert manifest is not None
+    assert set(manifest.files) == {
+        "structure.csv",
+        "labels.csv",
+        "ATAC.narrowPeak",
+        "compartment.bed",
+    }
+
+    content = (directory / "ATAC.narrowPeak").read_bytes()
+    entry = manifest.files["ATAC.narrowPeak"]
+    assert set(entry["chromosomes"]) == {"chr1", "chr2", "chrM"}
+    for chromosome, chromosome_entry in entry["chromosomes"].items():
+        lines = b"".join(
+            content[offset : offset + length]
+            for offset, length in chromosome_entry["blocks"]
+        ).splitlines()
+        assert all(line.startswith(f"{chromosome}\t".encode()) for line in lines)
+        assert chromosome_entry["rows"] == len(lines)
+
+        starts = [int(line.split(b"\t")[1]) for line in lines]
+        assert chromosome_entry["ranges"]["start"] == [min(starts), max(starts)]
+
+    # chr1 is split in two runs around the chrM rows
+    assert len(entry["chromosomes"]["chr1"]["blocks"]) == 2
+    assert sum(
+        length
+        for chromosome_entry in entry["chromosomes"].values()
+        for _, length in chromosome_entry["blocks"]
+    ) == len(content)
+
+
+def test_indexed_ensemble_reads_selected_lines(indexed_ensemble_path, monkeypatch):
+    directory = indexed_ensemble_path / "experiments" / "Untr_A" / "12hpi"
+    expected = _arrays_without_index(indexed_ensemble_path, directory)
+
+    reads = []
+    read = Manifest.read
+
+    def recorded(self, path, chromosomes):
+        reads.append((path.name, set(chromosomes)))
+        return read(self, path, chromosomes)
+
+    def fail(*_args):
+        pytest.fail("The chromosomes of an indexed structure file were scanned.")
+
+    monkeypatch.setattr(Manifest, "read", recorded)
+    monkeypatch.setattr(Timestep, "_scan_structure_chromosomes", fail)
+
+    source = SourceProvider(Ensemble(indexed_ensemble_path, "", lazy=True))
+    _assert_arrays_equal(expected, _arrays(source))
+
+    # only the tracks holding chromosomes without structure are read in parts
+    assert sorted(reads) == [("ATAC.narrowPeak", {"chr1", "chr2"})] * 4
+
+
+def test_unsorted_file_is_not_indexed(ensemble_path):
+    path = ensemble_path / "experiments" / "Untr_A" / "12hpi" / "compartment.bed"
+    lines = path.read_text().splitlines(keepends=True)
+    random.Random(0).shuffle(lines)
+    path.write_text("".join(lines))
+
+    main([str(ensemble_path)])
+
+    manifest = Manifest.load(path.parent)
+    assert "compartment.bed" not in manifest.files
+    assert "ATAC.narrowPeak" in manifest.files
+
+
+def test_stale_entry_is_ignored(indexed_ensemble_path):
+    path = (
+        indexed_ensemble_path / "experiments" / "Vacv_A" / "18hpi" / "ATAC.narrowPeak"
+    )
+    _add_chromosome(path, "chrY")
+    expected = _arrays_without_index(indexed_ensemble_path, path.parent)
+
+    source = SourceProvider(Ensemble(indexed_ensemble_path, "", lazy=True))
+    with pytest.warns(RuntimeWarning, match="out of date") as records:
+        actual = _arrays(source)
+
+    # the file is read in full, with a single warning
+    assert len(records) == 1
+    _assert_arrays_equal(expected, actual)
+
+
+def test_invalid_manifest(ensemble_path):
+    directory = ensemble_path / "experiments" / "Untr_A" / "12hpi"
+    assert Manifest.load(directory) is None
+
+    (directory / MANIFEST_NAME).write_text("{not json")
+    with pytest.warns(RuntimeWarning, match="Invalid index"):
+        assert Manifest.load(directory) is None
+
+    (directory / MANIFEST_NAME).write_text(
+        json.dumps({"version": MANIFEST_VERSION + 1, "files": {}})
+    )
+    assert Manifest.load(directory) is None
+
+
+def test_manifest_read_views(ensemble_path):
+    path = ensemble_path / "experiments" / "Untr_A" / "12hpi" / "compartment.bed"
+    content = path.read_bytes().rstrip(b"\n")
+    path.write_bytes(content)
+    main([str(ensemble_path)])
+
+    manifest = Manifest.load(path.parent)
+    parts = manifest.read(path, {"chr2"})
+
+    # views into the memory-mapped file, the last line getting a newline
+    assert all(isinstance(part, memoryview) for part in parts)
+    lines = [line for line in content.split(b"\n") if line.startswith(b"chr2\t")]
+    assert b"".join(parts) == b"\n".join(lines) + b"\n"
+    assert manifest.read(path, {"chr9"}) == []
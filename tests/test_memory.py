@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from episcope.library.io.memory import MemoryCache
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+
+
+class _Entry:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.nbytes = 0
+
+    def load(self) -> None:
+        self.nbytes = self.size
+
+    def unload(self) -> None:
+        self.nbytes = 0
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_bytes=250)
+    entries = {key: _Entry(100) for key in "abc"}
+    for key, entry in entries.items():
+        cache.add(key, entry)
+
+    for key in "abc":
+        cache.use(key, entries[key])
+        entries[key].load()
+        cache.evict(keep=key)
+
+    # 'a' was the least recently used when 'c' was loaded
+    assert [entries[key].nbytes for key in "abc"] == [0, 100, 100]
+    assert cache.nbytes == 200
+
+    cache.use("b", entries["b"])
+    cache.use("a", entries["a"])
+    entries["a"].load()
+    cache.evict(keep="a")
+
+    assert [entries[key].nbytes for key in "abc"] == [100, 100, 0]
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 4,
+        "evictions": 2,
+        "nbytes": 200,
+        "max_bytes": 250,
+    }
+    assert not cache.is_full
+
+    # the object being used is kept even if it does not fit alone
+    entries["c"].size = 1_000
+    cache.use("c", entries["c"])
+    entries["c"].load()
+    cache.evict(keep="c")
+    assert [entries[key].nbytes for key in "abc"] == [0, 0, 1_000]
+    assert cache.is_full
+
+    cache.remove("c")
+    assert cache.nbytes == 0
+
+
+def test_memory_cache_without_budget():
+    cache = MemoryCache()
+    entry = _Entry(100)
+    cache.use("a", entry)
+    entry.load()
+    cache.evict(keep="b")
+
+    assert entry.nbytes == 100
+    assert not cache.is_full
+
+
+def test_provider_stays_under_budget_after_loads(ensemble_path):
+    reference = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+    reference.get_structure_arrays("chr1", "Untr_A", "12hpi")
+    reference.get_peak_track_arrays("chr1", "Untr_A", "12hpi", "ATAC")
+    timestep_bytes = reference.get_memory_stats()["nbytes"]
+
+    max_bytes = timestep_bytes * 3 // 2
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True), max_bytes)
+
+    for experiment in ("Untr_A", "Vacv_A"):
+        for timestep in ("12hpi", "18hpi"):
+            source.get_structure_arrays("chr1", experiment, timestep)
+            source.get_peak_track_arrays("chr1", experiment, timestep, "ATAC")
+            # the previous timestep is unloaded once this one has been loaded
+            assert timestep_bytes <= source.get_memory_stats()["nbytes"] <= max_bytes
+
+    assert source.get_memory_stats()["evictions"] == 3
+
+
+def test_prefetch_never_unloads_other_timesteps(ensemble_path):
+    reference = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+    reference.get_structure_arrays("chr1", "Untr_A", "12hpi")
+    reference.get_peak_track_arrays("chr1", "Untr_A", "12hpi", "ATAC")
+    timestep_bytes = reference.get_memory_stats()["nbytes"]
+
+    max_bytes = timestep_bytes * 3 // 2
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True), max_bytes)
+    source.get_structure_arrays("chr1", "Untr_A", "12hpi")
+    source.get_peak_track_arrays("chr1", "Untr_A", "12hpi", "ATAC")
+    displayed = source._get_timestep("Untr_A", "12hpi")
+    prefetched = source._get_timestep("Untr_A", "18hpi")
+
+    # the whole timestep does not fit, so the prefetch unloads it and stops
+    assert not source.prefetch("chr1", "Untr_A", "18hpi")
+    assert displayed.nbytes == timestep_bytes
+    assert prefetched.nbytes == 0
+    assert source.get_memory_stats()["nbytes"] <= max_bytes
+
+    # without a budget, the whole timestep is prefetched
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=True))
+    source.get_structure_arrays("chr1", "Untr_A", "12hpi")
+    assert source.prefetch("chr1", "Untr_A", "18hpi")
+    assert source._get_timestep("Untr_A", "18hpi").nbytes > timestep_bytes
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import csv
+import itertools
+
+import numpy as np
+import pytest
+
+from episcope.library.io import parser
+from episcope.library.io.parser import ColumnSpec, read_table
+
+PEAK_COLUMNS = {
+    "start": ColumnSpec(1, np.int64),
+    "end": ColumnSpec(2, np.int64),
+    "value": ColumnSpec(4, np.float64),
+    "summit": ColumnSpec(9, np.int64),
+}
+
+POINT_COLUMNS = {
+    "start": ColumnSpec(1, np.int64),
+    "end": ColumnSpec(2, np.int64),
+    "value": ColumnSpec(3, np.float64, skip_invalid=True),
+}
+
+
+def _read_peaks(path, **kwargs):
+    return read_table(
+        path,
+        delimiter="\t",
+        n_columns=10,
+        chromosome_column=0,
+        columns=PEAK_COLUMNS,
+        **kwargs,
+    )
+
+
+def _read_points(path, **kwargs):
+    return read_table(
+        path,
+        delimiter="\t",
+        n_columns=4,
+        chromosome_column=0,
+        columns=POINT_COLUMNS,
+        **kwargs,
+    )
+
+
+def _write_peaks(path, chromosomes, n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    lines = []
+    for i in range(n_rows):
+        chromosome = chromosomes[rng.integers(len(chromosomes))]
+        start = int(rng.integers(0, 1_000_000))
+        # some integers are written in floating point notation
+        end = f"{start + 500}.0" if i % 7 == 0 else str(start + 500)
+        lines.append(
+            f"{chromosome}\t{start}\t{end}\tpeak\t{rng.random():.6f}\t.\t1\t2\t3\t{i % 500}\n"
+        )
+    path.write_text("".join(lines))
+
+
+def _reference_peaks(path, chromosomes=None):
+    """The rows of each chromosome, parsed one at a time in Python."""
+    rows = {}
+    with path.open() as file:
+        for line in csv.reader(file, delimiter="\t"):
+            if chromosomes is not None and line[0] not in chromosomes:
+                continue
+            row = rows.setdefault(line[0], {name: [] for name in PEAK_COLUMNS})
+            for name, spec in PEAK_COLUMNS.items():
+                value = float(line[spec.index])
+                row[name].append(int(value) if spec.dtype.kind == "i" else value)
+
+    return rows
+
+
+def _assert_table_equal(table, reference):
+    assert sorted(table) == sorted(reference)
+    for chromosome, columns in reference.items():
+        for name, values in columns.items():
+            assert table[chromosome][name].dtype == PEAK_COLUMNS[name].dtype
+            assert np.array_equal(table[chromosome][name], values)
+
+
+def test_read_table_matches_reference(tmp_path):
+    path = tmp_path / "track.narrowPeak"
+    # unsorted: the rows of each chromosome are spread over the file
+    _write_peaks(path, ["chr1", "chr2", "chrX"], 2_000)
+
+    table = _read_peaks(path)
+
+    _assert_table_equal(table, _reference_peaks(path))
+    # chromosomes in order of first appearance, rows in file order
+    with path.open() as file:
+        first_seen = list(dict.fromkeys(line.split("\t", 1)[0] for line in file))
+    assert table.chromosomes == first_seen
+
+
+def test_read_table_selects_chromosomes(tmp_path):
+    path = tmp_path / "track.narrowPeak"
+    _write_peaks(path, ["chr1", "chr2", "chr3"], 2_000)
+    sorted_path = tmp_path / "sorted.narrowPeak"
+    sorted_path.write_text("".join(sorted(path.read_text().splitlines(keepends=True))))
+
+    for source in (path, sorted_path):
+        table = _read_peaks(source, chromosomes={"chr2", "chr9"})
+        _assert_table_equal(table, _reference_peaks(source, {"chr2"}))
+
+        # every chromosome of the file, or none of them
+        _assert_table_equal(
+            _read_peaks(source, chromosomes={"chr1", "chr2", "chr3"}),
+            _reference_peaks(source),
+        )
+        assert len(_read_peaks(source, chromosomes=set())) == 0
+
+
+def test_read_table_skips_invalid_values(tmp_path):
+    path = tmp_path / "track.bed"
+    path.write_text("chr1\t0\t10\t0.5\nchr1\t10\t20\tNA\nchr2\t0\t10\t2\n")
+
+    table = _read_points(path)
+
+    assert table["chr1"]["start"].tolist() == [0]
+    assert table["chr1"]["value"].tolist() == [0.5]
+    assert table["chr2"]["value"].tolist() == [2.0]
+
+
+def test_read_table_long_chromosome_names(tmp_path):
+    name = "chr1_KI270706v1_random_with_a_long_name"
+    path = tmp_path / "track.bed"
+    path.write_text(f"{name}\t0\t10\t1\nchr1\t5\t15\t2\n")
+
+    table = _read_points(path)
+
+    assert table.chromosomes == [name, "chr1"]
+    assert table[name]["end"].tolist() == [10]
+
+
+def test_read_table_structure(tmp_path):
+    path = tmp_path / "structure.csv"
+    path.write_text('chromosome,id,x,y,z\n"chr1",0.0,1,2,3\n"chr1",10000.0,4,5,6\n')
+
+    table = read_table(
+        path,
+        delimiter=",",
+        n_columns=5,
+        chromosome_column=0,
+        columns={"index": ColumnSpec(1, np.int64), "x": ColumnSpec(2, np.float64)},
+        skip_header=True,
+        quotechar='"',
+    )
+
+    assert table.chromosomes == ["chr1"]
+    assert table["chr1"]["index"].tolist() == [0, 10_000]
+    assert table["chr1"]["x"].tolist() == [1.0, 4.0]
+
+
+def test_read_table_empty_and_invalid(tmp_path):
+    path = tmp_path / "track.bed"
+    path.write_text("")
+    table = _read_points(path)
+    assert len(table) == 0
+    assert table.columns["value"].dtype == np.float64
+
+    path.write_text("chr1\t0\t10\n")
+    with pytest.raises(ValueError, match="invalid column index"):
+        _read_points(path)
+
+
+@pytest.mark.parametrize("sort", [False, True])
+def test_select_lines_matches_filtering(tmp_path, monkeypatch, sort):
+    path = tmp_path / "track.narrowPeak"
+    _write_peaks(path, ["chr1", "chr2", "chr3", "chr10"], 3_000)
+    if sort:
+        path.write_text("".join(sorted(path.read_text().splitlines(keepends=True))))
+    chromosomes = {"chr1", "chr10"}
+    expected = _reference_peaks(path, chromosomes)
+
+    # scan the file for the lines of the chromosomes
+    monkeypatch.setattr(parser, "SELECT_MAX_FRACTION", 1.1)
+    _assert_table_equal(_read_peaks(path, chromosomes=chromosomes), expected)
+
+    # in small blocks, copying the scattered lines
+    monkeypatch.setattr(parser, "SCAN_BLOCK_SIZE", 4096)
+    monkeypatch.setattr(parser, "SELECT_MAX_RUNS", 4)
+    _assert_table_equal(_read_peaks(path, chromosomes=chromosomes), expected)
+
+    # parse every line, then drop the rows of the other chromosomes
+    monkeypatch.setattr(parser, "SELECT_MAX_FRACTION", 0.0)
+    _assert_table_equal(_read_peaks(path, chromosomes=chromosomes), expected)
+
+
+def test_select_lines_views(tmp_path, monkeypatch):
+    path = tmp_path / "track.bed"
+    path.write_text(
+        "header\nchr1\t0\t1\t1\nchr1\t1\t2\t2\n\nchr2\t0\t1\t3\nchr12\t0\t1\t4\nchr1\t5\t6\t5"
+    )
+    monkeypatch.setattr(parser, "SCAN_BLOCK_SIZE", 8)
+
+    parts = parser._select_lines(path, "\t", {"chr1"}, skip_header=True)
+
+    # runs spanning several blocks are merged, and the last line has no newline
+    assert [part.tobytes() for part in parts] == [
+        b"chr1\t0\t1\t1\nchr1\t1\t2\t2\n",
+        b"chr1\t5\t6\t5",
+    ]
+    assert parser._select_lines(path, "\t", set(), skip_header=True) == []
+
+    table = _read_points(parts)
+    assert table["chr1"]["value"].tolist() == [1.0, 2.0, 5.0]
+
+
+def test_selected_fraction(tmp_path):
+    path = tmp_path / "track.narrowPeak"
+    _write_peaks(path, ["chr1", "chr2", "chr3", "chr4"], 4_000)
+
+    assert (
+        parser._selected_fraction(path, "\t", {"chr1", "chr2", "chr3", "chr4"}, False)
+        == 1.0
+    )
+    assert parser._selected_fraction(path, "\t", {"chr5"}, False) == 0.0
+    assert 0.1 < parser._selected_fraction(path, "\t", {"chr1"}, False) < 0.4
+
+
+def test_map_file(tmp_path):
+    path = tmp_path / "empty.bed"
+    path.write_bytes(b"")
+    assert len(parser.map_file(path)) == 0
+
+    path = tmp_path / "track.bed"
+    path.write_bytes(b"chr1\t0\t1\t1\nchr2\t0\t1\t2\n")
+    part = parser.map_file(path)[11:]
+
+    # the mapping stays open while a slice of it is referenced
+    assert part.tobytes() == b"chr2\t0\t1\t2\n"
+    assert part.readonly
+
+
+def _reference_runs(content, skip_header):
+    """The runs of lines of the same chromosome, found one line at a time."""
+    runs = []
+    offset = 0
+    for i, line in enumerate(content.splitlines(keepends=True)):
+        if (i > 0 or not skip_header) and b"\t" in line:
+            name = line.split(b"\t", 1)[0].decode()
+            if runs and runs[-1][0] == name and sum(runs[-1][1:]) == offset:
+                runs[-1] = (name, runs[-1][1], runs[-1][2] + len(line))
+            else:
+                runs.append((name, offset, len(line)))
+        offset += len(line)
+
+    return runs
+
+
+@pytest.mark.parametrize("block_size", [16, 4096, 16 * 1024**2])
+def test_scan_chromosome_blocks_matches_lines(tmp_path, monkeypatch, block_size):
+    rng = np.random.default_rng(0)
+    lines = [b"chromosome\tstart\n"]
+    for _ in range(300):
+        # runs of various lengths, with a few lines without any field
+        chromosome = str(rng.choice(["chr1", "chr2", "chr10", "chrX"]))
+        for _ in range(int(rng.integers(1, 30))):
+            lines.append(f"{chromosome}\t{rng.integers(0, 1_000_000)}\n".encode())
+        if rng.random() < 0.1:
+            lines.append(b"\n")
+    # the last line has no newline
+    lines[-1] = lines[-1].rstrip(b"\n")
+    content = b"".join(lines)
+    path = tmp_path / "track.bed"
+    path.write_bytes(content)
+    monkeypatch.setattr(parser, "SCAN_BLOCK_SIZE", block_size)
+
+    for skip_header in (False, True):
+        assert parser.scan_chromosome_blocks(
+            path, "\t", skip_header
+        ) == _reference_runs(content, skip_header)
+
+
+def test_read_table_from_parts(tmp_path):
+    path = tmp_path / "track.narrowPeak"
+    _write_peaks(path, ["chr1", "chr2"], 500)
+    content = parser.map_file(path)
+
+    # parts of every size, including empty ones and parts splitting lines
+    rng = np.random.default_rng(0)
+    ends = np.sort(rng.integers(0, len(content), 200))
+    bounds = [0, *ends.tolist(), len(content)]
+    parts = [content[start:end] for start, end in itertools.pairwise(bounds)]
+
+    assert parser._open(parts).read() == content.tobytes()
+    _assert_table_equal(_read_peaks(parts), _reference_peaks(path))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+import numpy as np
+
+from episcope.library.io.columnar import ChromosomeTable
+from episcope.library.io.pyramid import MIN_BIN_SHIFT, TrackPyramid
+
+
+def _track(rng):
+    groups = {}
+    for chromosome, n_rows in (("chr1", 300), ("chr2", 50), ("chr3", 0)):
+        starts = rng.integers(0, 2_000_000, n_rows)
+        ends = starts + np.where(
+            rng.random(n_rows) < 0.05,
+            rng.integers(0, 100_000, n_rows),
+            rng.integers(0, 5_000, n_rows),
+        )
+        groups[chromosome] = {
+            "start": starts,
+            "end": ends,
+            "value": rng.normal(size=n_rows),
+        }
+
+    return ChromosomeTable.from_groups(
+        groups, {"start": np.int64, "end": np.int64, "value": np.float64}
+    )
+
+
+def _brute_force(table, chromosome, shift):
+    """Summarize the intervals of a chromosome in bins of 2**shift base pairs."""
+    bins = defaultdict(list)
+    rows = table[chromosome]
+    # empty intervals cover their start
+    ends = np.maximum(rows["end"], rows["start"] + 1)
+    for start, end, value in zip(rows["start"], ends, rows["value"], strict=True):
+        for b in range(start >> shift, ((end - 1) >> shift) + 1):
+            covered = min(end, (b + 1) << shift) - max(start, b << shift)
+            bins[b].append((value, covered))
+
+    summary = defaultdict(list)
+    for b in sorted(bins):
+        values = [value for value, _ in bins[b]]
+        covered = sum(covered for _, covered in bins[b])
+        summary["start"].append(b << shift)
+        summary["end"].append((b + 1) << shift)
+        summary["min"].append(min(values))
+        summary["max"].append(max(values))
+        summary["mean"].append(sum(v * c for v, c in bins[b]) / covered)
+        summary["covered"].append(covered)
+
+    return summary
+
+
+def test_pyramid_matches_brute_force():
+    table = _track(np.random.default_rng(0))
+    pyramid = TrackPyramid.build(table)
+
+    shifts = list(pyramid.levels)
+    assert shifts[0] >= MIN_BIN_SHIFT
+    assert shifts == list(range(shifts[0], shifts[-1] + 1))
+    # the coarsest level holds each chromosome in a single bin
+    assert len(pyramid.levels[shifts[-1]].columns["start"]) == 2
+
+    for shift in shifts:
+        for chromosome in ("chr1", "chr2"):
+            summary = pyramid.summary(chromosome, 1 << shift)
+            expected = _brute_force(table, chromosome, shift)
+            for name in ("start", "end", "covered"):
+                assert summary[name].tolist() == expected[name]
+            for name in ("min", "max", "mean"):
+                assert np.allclose(summary[name], expected[name])
+
+        assert len(pyramid.summary("chr3", 1 << shift)["start"]) == 0
+
+
+def test_pyramid_level_for():
+    pyramid = TrackPyramid.build(_track(np.random.default_rng(1)))
+    finest, coarsest = min(pyramid.levels), max(pyramid.levels)
+
+    assert pyramid.level_for(1) == finest
+    assert pyramid.level_for((1 << finest) + 1) == finest + 1
+    assert pyramid.level_for(1 << 50) == coarsest
+    assert pyramid.bin_sizes == [1 << shift for shift in range(finest, coarsest + 1)]
+
+
+def test_empty_pyramid():
+    table = ChromosomeTable.from_groups(
+        {}, {"start": np.int64, "end": np.int64, "value": np.float64}
+    )
+    pyramid = TrackPyramid.build(table)
+
+    assert pyramid.levels == {}
+    assert pyramid.level_for(1_000) is None
+    summary = pyramid.summary("chr1", 1_000)
+    assert summary["mean"].dtype == np.float64
+    assert len(summary["start"]) == 0
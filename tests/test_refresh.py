@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import shutil
+import threading
+
+import numpy as np
+import pytest
+
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+from episcope.library.io.v1_2.timestep import Timestep
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_refresh_detects_changes(ensemble_path, lazy):
+    experiments_path = ensemble_path / "experiments"
+    source = SourceProvider(Ensemble(ensemble_path, "", lazy=lazy))
+    unchanged = source._get_timestep("Untr_A", "12hpi")
+
+    shutil.copytree(
+        experiments_path / "Untr_A" / "12hpi", experiments_path / "Untr_A" / "24hpi"
+    )
+    # a timestep still being written, without a structure file
+    (experiments_path / "Untr_A" / "36hpi").mkdir()
+    shutil.copy(
+        experiments_path / "Untr_A" / "12hpi" / "labels.csv",
+        experiments_path / "Untr_A" / "36hpi",
+    )
+    shutil.rmtree(experiments_path / "Vacv_A" / "12hpi")
+    path = experiments_path / "Vacv_A" / "18hpi" / "ATAC.narrowPeak"
+    path.write_text("".join(path.read_text().splitlines(keepends=True)[::20]))
+    shutil.copytree(
+        experiments_path / "Untr_A",
+        experiments_path / "Vacv_B",
+        ignore=shutil.ignore_patterns("36hpi"),
+    )
+
+    assert source.refresh() == {
+        "added": [
+            ("Untr_A", "24hpi"),
+            ("Vacv_B", "12hpi"),
+            ("Vacv_B", "18hpi"),
+            ("Vacv_B", "24hpi"),
+        ],
+        "modified": [("Vacv_A", "18hpi")],
+        "removed": [("Vacv_A", "12hpi")],
+    }
+    assert source.refresh() == {"added": [], "modified": [], "removed": []}
+
+    assert source._get_timestep("Untr_A", "12hpi") is unchanged
+    assert source.get_experiments() == {"Untr_A", "Vacv_A", "Vacv_B"}
+    assert source.get_timesteps(experiment="Untr_A") == {"12hpi", "18hpi", "24hpi"}
+    assert source.get_timesteps(experiment="Vacv_A") == {"18hpi"}
+    assert source.get_chromosomes("Vacv_B", "24hpi") == {"chr1", "chr2"}
+
+    # the refreshed provider matches one loaded from scratch
+    shutil.rmtree(experiments_path / "Untr_A" / "36hpi")
+    expected = SourceProvider(Ensemble(ensemble_path, ""))
+    for experiment, timestep in (("Untr_A", "24hpi"), ("Vacv_A", "18hpi")):
+        for chromosome in ("chr1", "chr2"):
+            key = (chromosome, experiment, timestep)
+            arrays = source.get_peak_track_arrays(*key, "ATAC")
+            for name, array in expected.get_peak_track_arrays(*key, "ATAC").items():
+                assert np.array_equal(arrays[name], array)
+    assert (
+        len(source.get_peak_track_arrays("chr1", "Vacv_A", "18hpi", "ATAC")["start"])
+        == 10
+    )
+
+
+def test_refresh_loads_outside_of_the_lock(ensemble_path, monkeypatch):
+    experiments_path = ensemble_path / "experiments"
+    source = SourceProvider(Ensemble(ensemble_path, ""))
+
+    loading = threading.Event()
+    loaded = threading.Event()
+    read_structure = Timestep._read_structure
+
+    def blocked(self, path):
+        if path.parent.name == "24hpi":
+            loading.set()
+            assert loaded.wait(10)
+        return read_structure(self, path)
+
+    monkeypatch.setattr(Timestep, "_read_structure", blocked)
+    shutil.copytree(
+        experiments_path / "Untr_A" / "12hpi", experiments_path / "Untr_A" / "24hpi"
+    )
+
+    changes = {}
+    refresh = threading.Thread(target=lambda: changes.update(source.refresh()))
+    refresh.start()
+    try:
+        assert loading.wait(10)
+
+        # other requests are served while the new timestep is parsed
+        arrays = source.get_structure_arrays("chr1", "Untr_A", "18hpi")
+        assert len(arrays["position"]) > 0
+        assert source.get_timesteps(experiment="Untr_A") == {"12hpi", "18hpi"}
+    finally:
+        loaded.set()
+        refresh.join(10)
+
+    assert changes["added"] == [("Untr_A", "24hpi")]
+    assert source.get_timesteps(experiment="Untr_A") == {"12hpi", "18hpi", "24hpi"}
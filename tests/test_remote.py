@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import io
+import re
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from episcope.library.io.container import ContainerSourceProvider, pack
+from episcope.library.io.remote import RemoteContainerSourceProvider, is_remote
+
+
+class _RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files like a static file server, with support for single Range requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_head(self):
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if match is None:
+            return super().send_head()
+
+        path = Path(self.translate_path(self.path))
+        content = path.read_bytes()
+        size = len(content)
+        start, end = int(match[1]), min(int(match[2]), size - 1)
+
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Last-Modified", self.date_time_string(path.stat().st_mtime))
+        self.end_headers()
+
+        return io.BytesIO(content[start : end + 1])
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def container_url(ensemble_path, tmp_path):
+    served_path = tmp_path / "served"
+    served_path.mkdir()
+    pack(ensemble_path, served_path / "ensemble.episcope")
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        partial(_RangeRequestHandler, directory=str(served_path)),
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}/ensemble.episcope"
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_container_matches_local(container_url, tmp_path, assert_arrays_equal):
+    assert is_remote(container_url)
+    assert not is_remote(tmp_path)
+
+    expected = ContainerSourceProvider(tmp_path / "served" / "ensemble.episcope")
+    actual = RemoteContainerSourceProvider(container_url, block_size=4096)
+
+    # the catalogue is read from the header
+    n_requests = actual.requests
+    assert actual.get_experiments() == expected.get_experiments()
+    assert actual.get_timesteps() == expected.get_timesteps()
+    assert actual.get_chromosomes() == expected.get_chromosomes()
+    assert actual.requests == n_requests
+
+    for experiment in expected.get_experiments():
+        for timestep in expected.get_timesteps(experiment=experiment):
+            for chromosome in expected.get_chromosomes(experiment, timestep):
+                key = (chromosome, experiment, timestep)
+
+                assert_arrays_equal(
+                    expected.get_structure_arrays(*key),
+                    actual.get_structure_arrays(*key),
+                )
+                assert actual.get_labels(*key) == expected.get_labels(*key)
+                assert actual.prefetch(*key)
+
+                for kind in ("peak", "point"):
+                    tracks = getattr(expected, f"get_{kind}_tracks")(*key)
+                    assert getattr(actual, f"get_{kind}_tracks")(*key) == tracks
+
+                    for track in tracks:
+                        count = getattr(expected, f"get_{kind}_track_count")(
+                            *key, track
+                        )
+                        assert (
+                            getattr(actual, f"get_{kind}_track_count")(*key, track)
+                            == count
+                        )
+                        for method, args in (
+                            (f"get_{kind}_track_arrays", ()),
+                            (f"get_{kind}_track_range", (100_000, 400_000)),
+                            (f"get_{kind}_track_summary", (50_000,)),
+                        ):
+                            assert_arrays_equal(
+                                getattr(expected, method)(*key, track, *args),
+                                getattr(actual, method)(*key, track, *args),
+                            )
+
+    assert actual.refresh() == {"added": [], "modified": [], "removed": []}
+    actual.close()
+
+
+def test_remote_blocks_are_cached(container_url, tmp_path, assert_arrays_equal):
+    cache_dir = tmp_path / "blocks"
+
+    source = RemoteContainerSourceProvider(container_url, cache_dir=cache_dir)
+    # the size of the file, then its first block holding the header
+    assert source.requests == 2
+
+    experiment = min(source.get_experiments())
+    timestep = min(source.get_timesteps(experiment=experiment))
+    key = ("chr1", experiment, timestep)
+
+    structure = source.get_structure_arrays(*key)
+    n_requests = source.requests
+    assert_arrays_equal(structure, source.get_structure_arrays(*key))
+    assert source.requests == n_requests
+
+    # the rows of a track are counted from the offsets in the header
+    assert source.get_peak_track_count(*key, "ATAC") == 200
+    assert source.requests == n_requests
+    source.close()
+
+    # a later run reads the blocks from the cache directory
+    source = RemoteContainerSourceProvider(container_url, cache_dir=cache_dir)
+    assert_arrays_equal(structure, source.get_structure_arrays(*key))
+    assert source.requests == 2
+    source.close()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import numpy as np
+
+from episcope.library.viz.common import CardinalSplines
+from episcope.library.viz.sampling import (
+    adaptive_samples,
+    resample_intervals,
+    resample_profiles,
+)
+
+
+def _resample_loop(starts, ends, spacing, include_end):
+    indices, offsets = [], [0]
+    for start, end in zip(starts, ends, strict=True):
+        index = start
+        while index < end:
+            indices.append(index)
+            index += spacing
+        if include_end:
+            indices.append(end)
+        offsets.append(len(indices))
+
+    return indices, offsets
+
+
+def test_resample_intervals_matches_loop():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 100_000, 1_000)
+    # including empty and reversed intervals
+    ends = starts + rng.integers(-1_000, 5_000, 1_000)
+
+    for spacing in (7, 1_000, 50_000):
+        for include_end in (False, True):
+            indices, offsets = resample_intervals(starts, ends, spacing, include_end)
+            expected_indices, expected_offsets = _resample_loop(
+                starts.tolist(), ends.tolist(), spacing, include_end
+            )
+
+            assert indices.tolist() == expected_indices
+            assert offsets.tolist() == expected_offsets
+
+
+def test_resample_no_intervals():
+    indices, offsets = resample_intervals([], [], 10, include_end=True)
+
+    assert len(indices) == 0
+    assert offsets.tolist() == [0]
+
+
+def test_resample_profiles_matches_loop():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 100_000, 1_000)
+    summits = starts + rng.integers(0, 2_000, 1_000)
+    ends = summits + rng.integers(0, 2_000, 1_000)
+    heights = rng.random(1_000) * 100
+
+    keys = np.column_stack([starts, summits, ends])
+    values = np.zeros(keys.shape)
+    values[:, 1] = heights
+
+    for spacing in (7, 100, 5_000):
+        indices, samples, offsets = resample_profiles(keys, values, spacing)
+
+        expected_indices, expected_values, expected_offsets = [], [], [0]
+        for start, summit, end, height in zip(
+            starts.tolist(),
+            summits.tolist(),
+            ends.tolist(),
+            heights.tolist(),
+            strict=True,
+        ):
+            for a, b, va, vb in ((start, summit, 0, height), (summit, end, height, 0)):
+                index = a
+                while index == a or index < b:
+                    expected_indices.append(index)
+                    expected_values.append(va + (vb - va) * (index - a) / (b - a or 1))
+                    index += spacing
+            expected_indices.append(end)
+            expected_values.append(0)
+            expected_offsets.append(len(expected_indices))
+
+        assert indices.tolist() == expected_indices
+        assert np.allclose(samples, expected_values)
+        assert offsets.tolist() == expected_offsets
+
+    # wider than the peaks: only the start, summit and end remain
+    indices, samples, offsets = resample_profiles(keys, values, 10_000)
+    assert np.array_equal(indices, keys.ravel())
+    assert np.array_equal(samples, values.ravel())
+    assert np.array_equal(offsets, np.arange(0, 3_001, 3))
+
+
+def test_resample_no_profiles():
+    indices, samples, offsets = resample_profiles(
+        np.zeros((0, 3)), np.zeros((0, 3)), 10
+    )
+
+    assert len(indices) == 0
+    assert len(samples) == 0
+    assert offsets.tolist() == [0]
+
+
+def _chord_error(splines, samples, queries):
+    curve = splines.evaluate(queries)
+    points = splines.evaluate(samples)
+
+    k = np.clip(
+        np.searchsorted(samples, queries, side="right") - 1, 0, len(samples) - 2
+    )
+    t = ((queries - samples[k]) / (samples[k + 1] - samples[k]))[:, np.newaxis]
+    polyline = points[k] + t * (points[k + 1] - points[k])
+
+    return np.linalg.norm(curve - polyline, axis=1).max()
+
+
+def test_adaptive_samples_within_tolerance():
+    rng = np.random.default_rng(0)
+    indices = np.cumsum(rng.integers(1_000, 50_000, 200))
+    positions = np.cumsum(rng.normal(size=(200, 3)), axis=0)
+    # a straight stretch in the middle
+    lengths = (indices[80:120] - indices[80])[:, np.newaxis]
+    positions[80:120] = positions[80] + lengths * [1e-5, 2e-5, 0.0]
+
+    splines = CardinalSplines()
+    splines.set_points(indices, positions)
+    queries = np.linspace(indices[0], indices[-1], 200_000)
+
+    for tolerance in (1e-1, 1e-2):
+        samples = adaptive_samples(
+            splines.knots, splines.second_derivative_bounds(), tolerance
+        )
+
+        assert samples[0] == indices[0]
+        assert samples[-1] == indices[-1]
+        assert np.all(np.diff(samples) > 0)
+        assert _chord_error(splines, samples, queries) <= tolerance
+
+        # fewer samples where the structure is straight
+        straight = (samples > indices[82]) & (samples < indices[117])
+        assert np.count_nonzero(straight) < 35
+
+    budget = adaptive_samples(
+        splines.knots, splines.second_derivative_bounds(), 1e-4, max_points=300
+    )
+    assert len(budget) == 300
+
+
+def test_adaptive_samples_straight_line():
+    indices = np.array([0, 10, 30, 60])
+    splines = CardinalSplines()
+    splines.set_points(indices, indices[:, np.newaxis] * [1.0, 2.0, 3.0])
+    bounds = splines.second_derivative_bounds()
+
+    # the zero end slopes bend the spline, but a constant one is straight
+    splines.set_points(indices, np.ones((4, 3)))
+    assert adaptive_samples(
+        splines.knots, splines.second_derivative_bounds(), 1e-3
+    ).tolist() == [0, 60]
+
+    assert len(adaptive_samples(splines.knots, bounds, max_points=10)) == 10
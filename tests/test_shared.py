@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import pytest
+
+from episcope.library.io.pyramid import TrackPyramid
+from episcope.library.io.shared import attach, publish
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+from episcope.library.io.v1_2.timestep import Timestep
+from episcope.publish import main
+
+
+def _assert_sources_equal(expected, actual, assert_arrays_equal):
+    for experiment in expected.get_experiments():
+        for timestep in expected.get_timesteps(experiment=experiment):
+            chromosomes = expected.get_chromosomes(experiment, timestep)
+            assert actual.get_chromosomes(experiment, timestep) == chromosomes
+
+            for chromosome in chromosomes:
+                key = (chromosome, experiment, timestep)
+                for method, args in (
+                    ("get_structure_arrays", ()),
+                    ("get_peak_track_arrays", ("ATAC",)),
+                    ("get_point_track_arrays", ("compartment",)),
+                    ("get_peak_track_summary", ("ATAC", 50_000)),
+                    ("get_point_track_summary", ("compartment", 50_000)),
+                ):
+                    assert_arrays_equal(
+                        getattr(expected, method)(*key, *args),
+                        getattr(actual, method)(*key, *args),
+                    )
+                assert actual.get_labels(*key) == expected.get_labels(*key)
+
+
+def _fail(*_args, **_kwargs):
+    pytest.fail("An attached ensemble parsed a published file.")
+
+
+def test_attached_ensemble_reads_published_arrays(
+    ensemble_path, tmp_path_factory, monkeypatch, assert_arrays_equal
+):
+    shared = tmp_path_factory.mktemp("shared")
+    # the published ensemble has parsed everything, zoom levels included
+    reference = SourceProvider(publish(ensemble_path, shared))
+    published = sorted(shared.iterdir())
+    assert published
+
+    for name in (
+        "_read_structure",
+        "_read_labels",
+        "_read_peak_track",
+        "_read_point_track",
+        "_scan_structure_chromosomes",
+    ):
+        monkeypatch.setattr(Timestep, name, _fail)
+    monkeypatch.setattr(TrackPyramid, "build", _fail)
+
+    source = SourceProvider(
+        Ensemble(ensemble_path, "", lazy=True, cache=attach(shared))
+    )
+    _assert_sources_equal(reference, source, assert_arrays_equal)
+
+    # attached processes never write to the shared directory
+    assert sorted(shared.iterdir()) == published
+
+
+def test_attached_ensemble_parses_changed_files(
+    ensemble_path, tmp_path_factory, assert_arrays_equal
+):
+    shared = tmp_path_factory.mktemp("shared")
+    main(["--data", str(ensemble_path), "--shared", str(shared)])
+    published = sorted(shared.iterdir())
+
+    path = ensemble_path / "experiments" / "Vacv_A" / "18hpi" / "ATAC.narrowPeak"
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[::2]))
+
+    source = SourceProvider(
+        Ensemble(ensemble_path, "", lazy=True, cache=attach(shared))
+    )
+    reference = SourceProvider(Ensemble(ensemble_path, ""))
+    _assert_sources_equal(reference, source, assert_arrays_equal)
+
+    assert (
+        len(source.get_peak_track_arrays("chr1", "Vacv_A", "18hpi", "ATAC")["start"])
+        == 100
+    )
+    assert sorted(shared.iterdir()) == published
+
+
+def test_attach_missing_directory(tmp_path):
+    with pytest.raises(FileNotFoundError, match="does not exist"):
+        attach(tmp_path / "missing")
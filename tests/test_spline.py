@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from episcope.library.viz.common import CardinalSplines
+
+
+def _structure(n_points=500, seed=0):
+    rng = np.random.default_rng(seed)
+    indices = np.cumsum(rng.integers(1_000, 50_000, n_points))
+    positions = np.cumsum(rng.normal(size=(n_points, 3)), axis=0)
+
+    return indices, positions
+
+
+def test_splines_interpolate_structure():
+    indices, positions = _structure()
+
+    splines = CardinalSplines()
+    splines.set_points(indices, positions)
+
+    assert np.allclose(splines.evaluate(indices), positions)
+
+    # clamped to the ends of the structure, with a zero slope there
+    before = splines.evaluate([indices[0] - 1_000, indices[0], indices[0] + 1e-3])
+    assert np.allclose(before, positions[0], atol=1e-9)
+    after = splines.evaluate([indices[-1] - 1e-3, indices[-1], indices[-1] + 1_000])
+    assert np.allclose(after, positions[-1], atol=1e-9)
+
+    # the same curve, whatever the batch
+    queries = np.linspace(indices[0], indices[-1], 10_000)
+    batch = splines.evaluate(queries)
+    assert np.array_equal(batch[1234], splines.evaluate([queries[1234]])[0])
+
+    # continuous first derivative at the knots
+    h = 1e-2
+    left = (splines.evaluate(indices[1:-1]) - splines.evaluate(indices[1:-1] - h)) / h
+    right = (splines.evaluate(indices[1:-1] + h) - splines.evaluate(indices[1:-1])) / h
+    assert np.allclose(left, right, atol=1e-4)
+
+
+def test_splines_duplicate_and_missing_points():
+    splines = CardinalSplines()
+    assert np.array_equal(splines.evaluate([0, 10]), np.zeros((2, 3)))
+
+    splines.set_points([20, 0, 10, 10], [[2, 2, 2], [0, 0, 0], [5, 5, 5], [1, 1, 1]])
+    assert np.allclose(splines.evaluate([0, 10, 20]), [[0] * 3, [1] * 3, [2] * 3])
+
+
+def test_splines_match_vtk():
+    vtk_geometry = pytest.importorskip("vtkmodules.vtkCommonComputationalGeometry")
+
+    indices, positions = _structure()
+
+    splines = CardinalSplines()
+    splines.set_points(indices, positions)
+
+    queries = np.linspace(indices[0] - 5_000, indices[-1] + 5_000, 2_000)
+    actual = splines.evaluate(queries)
+
+    for i in range(3):
+        vtk_spline = vtk_geometry.vtkCardinalSpline()
+        for index, value in zip(
+            indices.tolist(), positions[:, i].tolist(), strict=True
+        ):
+            vtk_spline.AddPoint(index, value)
+        vtk_spline.Compute()
+
+        expected = [vtk_spline.Evaluate(t) for t in queries.tolist()]
+        assert np.allclose(actual[:, i], expected, rtol=1e-9, atol=1e-9)
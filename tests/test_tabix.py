@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import gzip
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from episcope.library.io.tabix import TabixFile
+from episcope.library.io.v1_2 import Ensemble, SourceProvider
+from episcope.library.io.v1_2.timestep import Timestep
+
+# Lines per BGZF block, kept small so that the file has many blocks.
+LINES_PER_BLOCK = 20
+
+
+def _bgzf_block(content: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    data = compressor.compress(content) + compressor.flush()
+    header = struct.pack("<4BI2BH2BHH", 31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, 0)
+    block_size = len(header) + len(data) + 8
+    header = header[:-2] + struct.pack("<H", block_size - 1)
+
+    return header + data + struct.pack("<II", zlib.crc32(content), len(content))
+
+
+def _region_bin(start: int, end: int) -> int:
+    end -= 1
+    for shift, first_bin in ((14, 4681), (17, 585), (20, 73), (23, 9), (26, 1)):
+        if start >> shift == end >> shift:
+            return first_bin + (start >> shift)
+
+    return 0
+
+
+def _write_tabix(path, lines):
+    """Write BED-like lines, sorted by chromosome and start, with bgzip and tabix."""
+    blocks = []
+    offsets = []
+    block_offset = 0
+    for first in range(0, len(lines), LINES_PER_BLOCK):
+        within = 0
+        for line in lines[first : first + LINES_PER_BLOCK]:
+            offsets.append((block_offset << 16) | within)
+            within += len(line)
+        block = _bgzf_block(b"".join(lines[first : first + LINES_PER_BLOCK]))
+        blocks.append(block)
+        block_offset += len(block)
+    offsets.append(block_offset << 16)
+    path.write_bytes(b"".join(blocks) + _bgzf_block(b""))
+
+    chromosomes: dict[bytes, tuple[dict, dict]] = {}
+    for i, line in enumerate(lines):
+        chromosome, start, end = line.split(b"\t")[:3]
+        start, end = int(start), int(end)
+        bins, linear = chromosomes.setdefault(chromosome, ({}, {}))
+        chunks = bins.setdefault(_region_bin(start, end), [])
+        if chunks and chunks[-1][1] == offsets[i]:
+            chunks[-1] = (chunks[-1][0], offsets[i + 1])
+        else:
+            chunks.append((offsets[i], offsets[i + 1]))
+        for window in range(start >> 14, ((end - 1) >> 14) + 1):
+            linear.setdefault(window, offsets[i])
+
+    names = b"".join(name + b"\0" for name in chromosomes)
+    # zero-based, half-open coordinates in columns 1 to 3, '#' comments
+    index = [
+        struct.pack(
+            "<4s8i", b"TBI\x01", len(chromosomes), 0x10000, 1, 2, 3, 35, 0, len(names)
+        ),
+        names,
+    ]
+    for bins, linear in chromosomes.values():
+        index.append(struct.pack("<i", len(bins)))
+        for bin_number, chunks in bins.items():
+            index.append(struct.pack("<Ii", bin_number, len(chunks)))
+            for begin, end in chunks:
+                index.append(struct.pack("<QQ", begin, end))
+        n_windows = max(linear) + 1
+        index.append(struct.pack("<i", n_windows))
+        index.append(
+            struct.pack(f"<{n_windows}Q", *(linear.get(w, 0) for w in range(n_windows)))
+        )
+
+    path.with_name(f"{path.name}.tbi").write_bytes(gzip.compress(b"".join(index)))
+
+
+def _peak_lines(rng, chromosomes):
+    lines = []
+    for chromosome in chromosomes:
+        starts = np.sort(rng.integers(0, 1_000_000, 300))
+        # a few long peaks, stored in the larger bins
+        lengths = np.where(
+            rng.random(300) < 0.05,
+            rng.integers(0, 300_000, 300),
+            rng.integers(1, 2_000, 300),
+        )
+        for start, length in zip(starts, lengths, strict=True):
+            lines.append(
+                f"{chromosome}\t{start}\t{start + length}\tpeak\t{rng.integers(0, 1000)}"
+                f"\t.\t{rng.random()}\t0\t0\t{length // 2}\n".encode()
+            )
+
+    return lines
+
+
+def _overlapping(lines, chromosome, start, end):
+    rows = []
+    for line in lines:
+        fields = line.split(b"\t")
+        if (
+            fields[0].decode() == chromosome
+            and int(fields[1]) < end
+            and int(fields[2]) > start
+        ):
+            rows.append(line)
+
+    return rows
+
+
+def test_fetch_regions(tmp_path):
+    rng = np.random.default_rng(0)
+    lines = _peak_lines(rng, ["chr1", "chr2"])
+    path = tmp_path / "track.narrowPeak.gz"
+    _write_tabix(path, lines)
+
+    tabix_file = TabixFile(path)
+
+    assert tabix_file.chromosomes == ["chr1", "chr2"]
+    assert tabix_file.fetch("chr2") == b"".join(
+        line for line in lines if line.startswith(b"chr2\t")
+    )
+    assert tabix_file.fetch("chr9") == b""
+
+    for _ in range(200):
+        chromosome = str(rng.choice(["chr1", "chr2"]))
+        start = int(rng.integers(0, 1_100_000))
+        end = start + int(rng.choice([1, 1_000, 50_000, 400_000]))
+        assert tabix_file.fetch(chromosome, start, end) == b"".join(
+            _overlapping(lines, chromosome, start, end)
+        )
+
+
+@pytest.fixture
+def tabix_ensemble_path(ensemble_path):
+    """Add a compressed copy of a track to every timestep of the ensemble."""
+    rng = np.random.default_rng(1)
+    for path in ensemble_path.glob("experiments/*/*"):
+        if not path.is_dir():
+            continue
+        lines = _peak_lines(rng, ["chr1", "chr2", "chrM"])
+        (path / "CTCF.narrowPeak").write_bytes(b"".join(lines))
+        _write_tabix(path / "CTCF_gz.narrowPeak.gz", lines)
+
+    return ensemble_path
+
+
+def test_range_queries_read_regions(tabix_ensemble_path, monkeypatch):
+    source = SourceProvider(Ensemble(tabix_ensemble_path, "", lazy=True))
+    reference = SourceProvider(Ensemble(tabix_ensemble_path, "", lazy=True))
+
+    fetched = []
+    fetch = TabixFile.fetch
+
+    def recorded(self, chromosome, start=None, end=None):
+        fetched.append((chromosome, start, end))
+        return fetch(self, chromosome, start, end)
+
+    monkeypatch.setattr(TabixFile, "fetch", recorded)
+
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        chromosome = str(rng.choice(["chr1", "chr2", "chrM"]))
+        start = int(rng.integers(0, 1_000_000))
+        end = start + int(rng.choice([1_000, 100_000]))
+        key = (chromosome, "Untr_A", "12hpi")
+
+        actual = source.get_peak_track_range(*key, "CTCF_gz", start, end)
+        if chromosome == "chrM":
+            # chrM has no structure, so its rows are never loaded
+            assert len(actual["start"]) == 0
+            continue
+
+        expected = reference.get_peak_track_range(*key, "CTCF", start, end)
+        for name, column in expected.items():
+            assert actual[name].dtype == column.dtype
+            assert np.array_equal(actual[name], column)
+
+    # only regions were fetched, and the track was not loaded whole
+    assert fetched
+    assert all(start is not None for _, start, _ in fetched)
+    timestep = source._ensemble._experiments["Untr_A"]._timesteps["12hpi"]
+    assert "CTCF_gz" not in timestep._peak_tracks
+
+    # once loaded whole, the track answers from its interval index
+    arrays = source.get_peak_track_arrays("chr1", "Untr_A", "12hpi", "CTCF_gz")
+    expected = reference.get_peak_track_arrays("chr1", "Untr_A", "12hpi", "CTCF")
+    for name, column in expected.items():
+        assert np.array_equal(arrays[name], column)
+
+    fetched.clear()
+    source.get_peak_track_range("chr1", "Untr_A", "12hpi", "CTCF_gz", 0, 10_000)
+    assert fetched == []
+
+
+def test_compressed_track_without_index_is_skipped(ensemble_path):
+    path = ensemble_path / "experiments" / "Untr_A" / "12hpi"
+    (path / "other.bed.gz").write_bytes(gzip.compress(b"chr1\t0\t10\t1\n"))
+
+    with pytest.warns(RuntimeWarning, match="No tabix index"):
+        timestep = Timestep(path, lazy=True)
+
+    assert timestep.point_track_names == {"compartment"}